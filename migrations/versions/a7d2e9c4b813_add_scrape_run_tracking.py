@@ -0,0 +1,64 @@
+"""add scrape run tracking tables
+
+Revision ID: a7d2e9c4b813
+Revises: f1c8a3e5d702
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2e9c4b813"
+down_revision: str | Sequence[str] | None = "f1c8a3e5d702"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scrape_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("total_batches", sa.Integer(), nullable=True),
+        sa.Column("total_shops", sa.Integer(), nullable=True),
+        sa.Column("rates_expired", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id"),
+    )
+    op.create_table(
+        "scrape_run_batches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("batch_number", sa.Integer(), nullable=False),
+        sa.Column("shop_count", sa.Integer(), nullable=False),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "batch_number", name="unique_scrape_run_batch"),
+    )
+    op.create_table(
+        "scrape_run_shops",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("shop_id", sa.Integer(), nullable=False),
+        sa.Column("program_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["shop_id"], ["shops.id"]),
+        sa.ForeignKeyConstraint(["program_id"], ["bonus_programs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "shop_id", "program_id", name="unique_scrape_run_shop"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("scrape_run_shops")
+    op.drop_table("scrape_run_batches")
+    op.drop_table("scrape_runs")
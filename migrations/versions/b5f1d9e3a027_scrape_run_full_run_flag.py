@@ -0,0 +1,33 @@
+"""flag scrape runs that may expire stale rates
+
+Revision ID: b5f1d9e3a027
+Revises: e8d3b5a1c046
+Create Date: 2026-10-17 19:00:00.000000
+
+Only runs that crawl whole programs may expire the rates of shops they did
+not report; imports and other partial runs complete without expiring.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5f1d9e3a027"
+down_revision: str | Sequence[str] | None = "e8d3b5a1c046"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "scrape_runs",
+        sa.Column("full_run", sa.Boolean, nullable=False, server_default=sa.text("FALSE")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scrape_runs", "full_run")
@@ -0,0 +1,55 @@
+"""add normalized shop name columns
+
+Revision ID: b7e2c4d91f30
+Revises: a929ef9b093f
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from spo.models.helpers import normalize_shop_name
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2c4d91f30"
+down_revision: str | Sequence[str] | None = "a929ef9b093f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill(conn, table: str, key: str, source: str, target: str) -> None:
+    rows = conn.execute(sa.text(f"SELECT {key}, {source} FROM {table}")).fetchall()
+    stmt = sa.text(f"UPDATE {table} SET {target} = :normalized WHERE {key} = :key")
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start : start + BATCH_SIZE]
+        conn.execute(
+            stmt, [{"key": row[0], "normalized": normalize_shop_name(row[1])} for row in batch]
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("shop_main", sa.Column("canonical_name_normalized", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_shop_main_canonical_name_normalized"),
+        "shop_main",
+        ["canonical_name_normalized"],
+        unique=False,
+    )
+    op.add_column("shop_variants", sa.Column("source_name_normalized", sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    _backfill(conn, "shop_main", "id", "canonical_name", "canonical_name_normalized")
+    _backfill(conn, "shop_variants", "id", "source_name", "source_name_normalized")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("shop_variants", "source_name_normalized")
+    op.drop_index(op.f("ix_shop_main_canonical_name_normalized"), table_name="shop_main")
+    op.drop_column("shop_main", "canonical_name_normalized")
@@ -0,0 +1,28 @@
+"""add job_params to scheduled_jobs
+
+Revision ID: c3f81a6d2e57
+Revises: b7e2c4d91f30
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f81a6d2e57"
+down_revision: str | Sequence[str] | None = "b7e2c4d91f30"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("scheduled_jobs", sa.Column("job_params", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scheduled_jobs", "job_params")
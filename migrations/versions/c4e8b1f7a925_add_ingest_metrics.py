@@ -0,0 +1,53 @@
+"""add ingest_metrics table
+
+Revision ID: c4e8b1f7a925
+Revises: a7d2e9c4b813
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e8b1f7a925"
+down_revision: str | Sequence[str] | None = "a7d2e9c4b813"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ingest_metrics",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=True),
+        sa.Column("batch_number", sa.Integer(), nullable=True),
+        sa.Column("batches", sa.Integer(), nullable=False),
+        sa.Column("shops", sa.Integer(), nullable=False),
+        sa.Column("hash_hits", sa.Integer(), nullable=False),
+        sa.Column("duplicates", sa.Integer(), nullable=False),
+        sa.Column("rates_created", sa.Integer(), nullable=False),
+        sa.Column("rates_expired", sa.Integer(), nullable=False),
+        sa.Column("rates_unchanged", sa.Integer(), nullable=False),
+        sa.Column("wall_seconds", sa.Float(), nullable=False),
+        sa.Column("dedup_seconds", sa.Float(), nullable=False),
+        sa.Column("rate_seconds", sa.Float(), nullable=False),
+        sa.Column("statements", sa.Integer(), nullable=False),
+        sa.Column("commits", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_ingest_metrics_created_at", "ingest_metrics", ["created_at"])
+    op.create_index("ix_ingest_metrics_run_id", "ingest_metrics", ["run_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ingest_metrics_run_id", table_name="ingest_metrics")
+    op.drop_index("ix_ingest_metrics_created_at", table_name="ingest_metrics")
+    op.drop_table("ingest_metrics")
@@ -0,0 +1,47 @@
+"""cascade deletes of shops and programs to scrape_run_shops
+
+Revision ID: d2a6c8e4f193
+Revises: b5f1d9e3a027
+Create Date: 2026-10-17 20:00:00.000000
+
+Rows of runs that never complete are only removed when the run is pruned, so
+deleting a shop or program must not fail on them. Only Postgres enforces the
+constraints; other dialects are left unchanged.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a6c8e4f193"
+down_revision: str | Sequence[str] | None = "b5f1d9e3a027"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+FOREIGN_KEYS = {
+    "scrape_run_shops_shop_id_fkey": ("shops", "shop_id"),
+    "scrape_run_shops_program_id_fkey": ("bonus_programs", "program_id"),
+}
+
+
+def _recreate_foreign_keys(ondelete: str | None) -> None:
+    for name, (referent, column) in FOREIGN_KEYS.items():
+        op.drop_constraint(name, "scrape_run_shops", type_="foreignkey")
+        op.create_foreign_key(
+            name, "scrape_run_shops", referent, [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _recreate_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _recreate_foreign_keys(None)
@@ -0,0 +1,74 @@
+"""add pg_trgm indexes for shop name similarity search
+
+Revision ID: d9a4e6b1c832
+Revises: c3f81a6d2e57
+Create Date: 2026-10-16 13:00:00.000000
+
+Only applies to Postgres. When the pg_trgm extension cannot be installed
+(not shipped or insufficient privileges) the migration is a no-op and the
+application keeps using its in-process similarity index.
+"""
+
+import logging
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a4e6b1c832"
+down_revision: str | Sequence[str] | None = "c3f81a6d2e57"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+TRIGRAM_INDEXES = {
+    "ix_shop_main_canonical_name_lower_trgm": ("shop_main", "canonical_name_lower"),
+    "ix_shop_variants_source_name_trgm": ("shop_variants", "source_name"),
+}
+
+
+def _ensure_pg_trgm(conn) -> bool:
+    """Create the pg_trgm extension if possible; return whether it is installed."""
+    available = conn.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if not available:
+        return False
+    try:
+        with conn.begin_nested():
+            conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except sa.exc.DBAPIError as e:
+        logger.warning("Skipping trigram indexes, cannot create pg_trgm: %s", e)
+        return False
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql" or not _ensure_pg_trgm(conn):
+        return
+
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    # The extension itself is left installed; other objects may depend on it.
+    for name, (table, _column) in TRIGRAM_INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
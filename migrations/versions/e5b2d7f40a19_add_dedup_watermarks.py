@@ -0,0 +1,37 @@
+"""add dedup_watermarks table
+
+Revision ID: e5b2d7f40a19
+Revises: d9a4e6b1c832
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b2d7f40a19"
+down_revision: str | Sequence[str] | None = "d9a4e6b1c832"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "dedup_watermarks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("last_full_scan_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("scope"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("dedup_watermarks")
@@ -0,0 +1,84 @@
+"""index normalized shop names for pg_trgm candidate lookups
+
+Revision ID: e8d3b5a1c046
+Revises: c4e8b1f7a925
+Create Date: 2026-10-17 18:00:00.000000
+
+Similarity lookups now pre-select candidates on the normalized names, so the
+trigram indexes move from canonical_name_lower / source_name to the
+normalized columns, and the space-free normalized name gets an expression
+index for compact-key matches. Only applies to Postgres with pg_trgm
+installed (see d9a4e6b1c832).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8d3b5a1c046"
+down_revision: str | Sequence[str] | None = "c4e8b1f7a925"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+OLD_TRIGRAM_INDEXES = {
+    "ix_shop_main_canonical_name_lower_trgm": ("shop_main", "canonical_name_lower"),
+    "ix_shop_variants_source_name_trgm": ("shop_variants", "source_name"),
+}
+TRIGRAM_INDEXES = {
+    "ix_shop_main_canonical_name_normalized_trgm": ("shop_main", "canonical_name_normalized"),
+    "ix_shop_variants_source_name_normalized_trgm": ("shop_variants", "source_name_normalized"),
+}
+COMPACT_INDEX = "ix_shop_main_canonical_name_compact"
+
+
+def _pg_trgm_installed(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar()
+    )
+
+
+def _create_trigram_indexes(indexes: dict) -> None:
+    for name, (table, column) in indexes.items():
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            if_not_exists=True,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    if not _pg_trgm_installed(conn):
+        return
+
+    _create_trigram_indexes(TRIGRAM_INDEXES)
+    op.create_index(
+        COMPACT_INDEX,
+        "shop_main",
+        [sa.text("replace(canonical_name_normalized, ' ', '')")],
+        unique=False,
+        if_not_exists=True,
+    )
+    for name, (table, _column) in OLD_TRIGRAM_INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if not _pg_trgm_installed(conn):
+        return
+
+    _create_trigram_indexes(OLD_TRIGRAM_INDEXES)
+    op.drop_index(COMPACT_INDEX, table_name="shop_main", if_exists=True)
+    for name, (table, _column) in TRIGRAM_INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
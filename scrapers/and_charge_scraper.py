@@ -13,10 +13,9 @@ Notes:
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
 from typing import Any
 
-import requests
-
 from scrapers.base import BaseScraper
 
 logger = logging.getLogger("AndChargeScraper")
@@ -30,7 +29,10 @@ class AndChargeScraper(BaseScraper):
 
         Returns a list of shop dicts: {name, rates, source_id, source}
         """
-        shops: list[dict[str, Any]] = []
+        return list(self.iter_shops())
+
+    def iter_shops(self) -> Iterator[dict[str, Any]]:
+        """Yield shop dicts page by page as the partner API returns them."""
         page = 1
         limit = 50
         while True:
@@ -42,7 +44,7 @@ class AndChargeScraper(BaseScraper):
                 "locale": "de",
             }
             try:
-                resp = requests.get(self.BASE_API, params=params, timeout=15)
+                resp = self.http.get(self.BASE_API, params=params)
                 resp.raise_for_status()
             except Exception as e:
                 logger.error("AndCharge API fetch failed (page %s): %s", page, e)
@@ -60,7 +62,7 @@ class AndChargeScraper(BaseScraper):
             for part in data:
                 shop = self._parse_partner(part)
                 if shop:
-                    shops.append(shop)
+                    yield shop
 
             # stop if fewer than requested
             if len(data) < limit:
@@ -70,8 +72,6 @@ class AndChargeScraper(BaseScraper):
                 logger.warning("Reached page cap for AndCharge API")
                 break
 
-        return shops
-
     def _parse_partner(self, p: dict) -> dict[str, Any] | None:
         name = p.get("name")
         pid = p.get("id")
@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
 from sqlalchemy.exc import IntegrityError
 
@@ -9,14 +10,22 @@ from sqlalchemy.exc import IntegrityError
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from spo.extensions import db  # noqa: E402
-from spo.models import Shop, ShopCategory, ShopProgramRate, utcnow  # noqa: E402
-from spo.services.bonus_programs import ensure_program  # noqa: E402
+from spo.models import Shop, ShopProgramRate, utcnow  # noqa: E402
 from spo.services.dedup import get_or_create_shop_main  # noqa: E402
+from spo.services.ingest_lookups import IngestLookups  # noqa: E402
+
+from .http_cache import ResponseCache  # noqa: E402
+from .http_client import HttpClient  # noqa: E402
 
 logger = logging.getLogger("BaseScraper")
 
 
 class BaseScraper(ABC):
+    # Settings of the HttpClient this scraper's requests go through
+    http_timeout = 15
+    http_max_per_host = 4
+    http_requests_per_second = 0.0
+
     @abstractmethod
     def fetch(self):
         """Return a list of shop dicts:
@@ -30,8 +39,50 @@ class BaseScraper(ABC):
                 'source_id': '12345',
             }
         ]
+
+        Scrapers that implement `iter_shops` return list(self.iter_shops()).
         """
 
+    def iter_shops(self) -> Iterator[dict]:
+        """Yield the shop dicts of `fetch` one by one, as soon as each is parsed.
+
+        Callers that ingest or send shops in batches consume this lazily, so a
+        long crawl delivers its first batches early and only one batch has to
+        be held in memory. The default yields the list `fetch` returns;
+        scrapers that crawl page by page override it.
+        """
+        yield from self.fetch() or []
+
+    @property
+    def lookups(self) -> IngestLookups:
+        """Program and category ids cached for the lifetime of this scraper (one run)."""
+        if getattr(self, "_lookups", None) is None:
+            self._lookups = IngestLookups()
+        return self._lookups
+
+    @property
+    def http(self) -> HttpClient:
+        """Pooled, retrying HTTP client used for every request of this scraper."""
+        if getattr(self, "_http", None) is None:
+            self._http = self.create_http_client()
+        return self._http
+
+    def create_http_client(self, **options) -> HttpClient:
+        """Build the client from the class settings; `options` override them.
+
+        The on-disk response cache is used when SCRAPER_HTTP_CACHE_DIR is set.
+        """
+        options.setdefault("timeout", self.http_timeout)
+        options.setdefault("max_per_host", self.http_max_per_host)
+        options.setdefault("requests_per_second", self.http_requests_per_second)
+        options.setdefault("cache", ResponseCache.from_env())
+        return HttpClient(**options)
+
+    def http_stats(self) -> dict | None:
+        """Request counts, bytes and latency of this scraper's HTTP client, if it was used."""
+        client = getattr(self, "_http", None)
+        return client.stats() if client is not None else None
+
     def register_to_db(self, data):
         """Register shop and rates to database using ShopMain + ShopVariant deduplication"""
 
@@ -89,18 +140,28 @@ class BaseScraper(ABC):
         if "o2" in name_l or "vodafone" in name_l:
             flagged = True
 
-        for r in data.get("rates", []):
-            prog = ensure_program(r["program"], point_value_eur=r.get("point_value_eur", 0.0))
+        rates = data.get("rates", [])
+        try:
+            self._register_rates(data, shop, rates, now, flagged)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.lookups.clear()
+            raise
+
+    def _register_rates(self, data, shop, rates, now, flagged):
+        # Resolve all program and category names of this shop up front; the
+        # lookups are cached for the run and join the final commit.
+        program_ids = self.lookups.program_ids(
+            {r["program"]: r.get("point_value_eur", 0.0) for r in rates}
+        )
+        category_ids = self.lookups.category_ids(r.get("category") for r in rates)
+
+        for r in rates:
+            prog_id = program_ids[r["program"]]
 
             category_name = r.get("category")
-            category_id = None
-            if category_name:
-                cat = ShopCategory.query.filter_by(name=category_name).first()
-                if not cat:
-                    cat = ShopCategory(name=category_name)
-                    db.session.add(cat)
-                    db.session.commit()
-                category_id = cat.id
+            category_id = category_ids[category_name] if category_name else None
 
             if flagged:
                 logger.info("ShoopDebug rate_payload=%s", r)
@@ -114,7 +175,7 @@ class BaseScraper(ABC):
                 )
 
             existing = ShopProgramRate.query.filter_by(
-                shop_id=shop.id, program_id=prog.id, category_id=category_id, valid_to=None
+                shop_id=shop.id, program_id=prog_id, category_id=category_id, valid_to=None
             ).first()
 
             fallback_used = False
@@ -125,7 +186,7 @@ class BaseScraper(ABC):
             if not existing and r.get("rate_type") in {"contract", "shop"}:
                 fallback = (
                     ShopProgramRate.query.filter_by(
-                        shop_id=shop.id, program_id=prog.id, valid_to=None
+                        shop_id=shop.id, program_id=prog_id, valid_to=None
                     )
                     .order_by(ShopProgramRate.valid_from.desc())
                     .first()
@@ -162,7 +223,7 @@ class BaseScraper(ABC):
             if not existing:
                 new_rate = ShopProgramRate(
                     shop_id=shop.id,
-                    program_id=prog.id,
+                    program_id=prog_id,
                     points_per_eur=new_points,
                     cashback_pct=new_cashback,
                     points_absolute=new_points_abs,
@@ -196,7 +257,7 @@ class BaseScraper(ABC):
                     db.session.merge(existing)
                     new_rate = ShopProgramRate(
                         shop_id=shop.id,
-                        program_id=prog.id,
+                        program_id=prog_id,
                         points_per_eur=new_points,
                         cashback_pct=new_cashback,
                         points_absolute=new_points_abs,
@@ -219,5 +280,3 @@ class BaseScraper(ABC):
                             (getattr(existing, "rate_note", "") or "")[:200],
                             (new_rate_note or "")[:200],
                         )
-
-        db.session.commit()
@@ -0,0 +1,195 @@
+"""Optional on-disk cache of GET responses for the scraper HTTP client.
+
+Enabled by setting SCRAPER_HTTP_CACHE_DIR. Each cached URL is stored as a body
+file plus a JSON metadata file holding its ETag/Last-Modified validators:
+
+- an entry younger than SCRAPER_HTTP_CACHE_MAX_AGE seconds is served without
+  a request (default 0: always revalidate);
+- older entries are revalidated with If-None-Match/If-Modified-Since, and a
+  304 answer serves the stored body;
+- next to the body a scraper can store what it parsed from it
+  (`HttpClient.parse`), which a 304 lets it reuse without parsing again;
+- once the bodies exceed SCRAPER_HTTP_CACHE_MAX_MB the least recently used
+  entries are evicted, down to 90% of the limit so the directory is not
+  scanned again on the next store.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger("HttpCache")
+
+# Eviction frees space down to this fraction of max_bytes
+EVICT_TO = 0.9
+
+
+def cache_key(url: str, params=None) -> str:
+    """Stable key of a GET request: the URL plus its sorted query parameters."""
+    items = sorted(params.items()) if isinstance(params, dict) else list(params or [])
+    return hashlib.sha256(json.dumps([url, items], default=str).encode()).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded directory of response bodies, validators and parsed results."""
+
+    def __init__(self, directory, *, max_age: float = 0.0, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Total size of the bodies, counted by the first store and kept up to date after it
+        self._total_bytes: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache | None":
+        directory = os.environ.get("SCRAPER_HTTP_CACHE_DIR")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            max_age=float(os.environ.get("SCRAPER_HTTP_CACHE_MAX_AGE", "0")),
+            max_bytes=int(float(os.environ.get("SCRAPER_HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024),
+        )
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def _read_json(self, path: Path):
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def get(self, key: str):
+        """Return (metadata, body) of an entry, or None when it is missing."""
+        meta = self._read_json(self._path(key, ".json"))
+        if meta is None:
+            return None
+        body_path = self._path(key, ".body")
+        try:
+            body = body_path.read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(body).hexdigest() != meta.get("body_hash"):
+            return None
+        # Reading an entry marks it as recently used for eviction
+        os.utime(body_path)
+        return meta, body
+
+    def is_fresh(self, meta: dict) -> bool:
+        return self.max_age > 0 and time.time() - meta.get("stored_at", 0) < self.max_age
+
+    @staticmethod
+    def validators(meta: dict) -> dict:
+        """Conditional request headers for revalidating an entry."""
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, key: str, url: str, body: bytes, headers, encoding: str | None) -> dict:
+        """Store a 200 response body; its previous parsed result is dropped."""
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "encoding": encoding,
+            "stored_at": time.time(),
+            "body_hash": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+        }
+        body_path = self._path(key, ".body")
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            try:
+                self._total_bytes -= body_path.stat().st_size
+            except OSError:
+                pass
+            self._path(key, ".parsed.json").unlink(missing_ok=True)
+            self._write(body_path, body)
+            self._write(self._path(key, ".json"), json.dumps(meta).encode())
+            self._total_bytes += len(body)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return meta
+
+    def refresh(self, key: str, meta: dict, headers) -> dict:
+        """Record a 304 revalidation: restart the max-age and keep new validators."""
+        meta = dict(meta, stored_at=time.time())
+        for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+            if headers.get(header):
+                meta[field] = headers[header]
+        self._write(self._path(key, ".json"), json.dumps(meta).encode())
+        return meta
+
+    def load_parsed(self, key: str, meta: dict, parser_name: str) -> tuple[bool, Any]:
+        """Return (True, result) if `parser_name` already parsed this exact body."""
+        stored = self._read_json(self._path(key, ".parsed.json"))
+        if (
+            stored
+            and stored.get("body_hash") == meta.get("body_hash")
+            and stored.get("parser") == parser_name
+        ):
+            return True, stored["result"]
+        return False, None
+
+    def store_parsed(self, key: str, meta: dict, parser_name: str, result) -> None:
+        try:
+            data = json.dumps(
+                {"body_hash": meta.get("body_hash"), "parser": parser_name, "result": result}
+            )
+        except (TypeError, ValueError):
+            logger.debug("Parsed result of %s is not JSON serialisable; not cached", parser_name)
+            return
+        self._write(self._path(key, ".parsed.json"), data.encode())
+
+    def _scan(self) -> tuple[list[tuple[float, Path, int]], int]:
+        """Return (mtime, path, size) of every body and their total size."""
+        bodies = []
+        total = 0
+        for path in self.directory.glob("*.body"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            bodies.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+        return bodies, total
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the bodies fit into EVICT_TO of max_bytes."""
+        # Rescan rather than trust the running total: other processes may share the directory
+        bodies, total = self._scan()
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TO
+            for _, path, size in sorted(bodies, key=lambda entry: entry[0]):
+                key = path.name[: -len(".body")]
+                for suffix in (".body", ".json", ".parsed.json"):
+                    self._path(key, suffix).unlink(missing_ok=True)
+                total -= size
+                if total <= target:
+                    break
+        self._total_bytes = total
@@ -0,0 +1,252 @@
+"""HTTP client shared by the scrapers.
+
+Every scraper sends its requests through one HttpClient (`BaseScraper.http`):
+
+- one pooled requests.Session, so connections are kept alive across pages;
+- a default timeout on every request;
+- retries with exponential backoff and full jitter on 429/5xx responses and
+  connection errors, honouring a numeric Retry-After header;
+- a cap on the requests in flight per host, and optional per-host pacing
+  (requests per second) through HostRateLimiter;
+- byte and latency accounting per host, reported by `stats()`;
+- an optional on-disk cache of GET responses with revalidation
+  (see scrapers/http_cache.py).
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .http_cache import ResponseCache, cache_key
+from .rate_limit import HostRateLimiter
+
+logger = logging.getLogger("HttpClient")
+
+T = TypeVar("T")
+
+USER_AGENT = "shopping-points-optimiser/1.0 (+https://example.local)"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_EMPTY_STATS = {
+    "requests": 0,
+    "retries": 0,
+    "failures": 0,
+    "bytes": 0,
+    "seconds": 0.0,
+    "cache_hits": 0,
+    "not_modified": 0,
+    "parse_reused": 0,
+}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _body_size(resp) -> int:
+    body = getattr(resp, "content", None)
+    return len(body) if isinstance(body, bytes | str) else 0
+
+
+def _cached_response(url: str, meta: dict, body: bytes, key: str) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp.url = url
+    resp._content = body
+    resp.encoding = meta.get("encoding")
+    resp.headers = CaseInsensitiveDict(
+        {
+            name: value
+            for name, value in (
+                ("Content-Type", meta.get("content_type")),
+                ("ETag", meta.get("etag")),
+                ("Last-Modified", meta.get("last_modified")),
+            )
+            if value
+        }
+    )
+    resp.from_cache = True
+    resp.cache_key = key
+    resp.cache_meta = meta
+    return resp
+
+
+class HttpClient:
+    """Pooled, retrying and rate-capped requests.Session wrapper."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 15,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_per_host: int = 4,
+        requests_per_second: float = 0.0,
+        headers: dict | None = None,
+        cache: ResponseCache | None = None,
+        sleep=time.sleep,
+    ):
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_per_host = max(1, max_per_host)
+        self.rate_limiter = HostRateLimiter(requests_per_second, sleep=sleep)
+        self.cache = cache
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._stats: dict[str, dict] = {}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET `url`, through the response cache when one is configured.
+
+        Responses served from the cache (fresh, or confirmed by a 304) have
+        `from_cache` set; pass them to `parse` to reuse the parsed result.
+        """
+        if self.cache is None:
+            return self.request("GET", url, **kwargs)
+
+        key = cache_key(url, kwargs.get("params"))
+        entry = self.cache.get(key)
+        if entry is not None:
+            meta, body = entry
+            if self.cache.is_fresh(meta):
+                self._record(_host(url), cache_hits=1)
+                return _cached_response(url, meta, body, key)
+            kwargs["headers"] = {**self.cache.validators(meta), **(kwargs.get("headers") or {})}
+
+        resp = self.request("GET", url, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            self._record(_host(url), not_modified=1)
+            meta = self.cache.refresh(key, meta, resp.headers)
+            return _cached_response(url, meta, body, key)
+        if resp.status_code == 200 and (
+            resp.headers.get("ETag") or resp.headers.get("Last-Modified") or self.cache.max_age
+        ):
+            resp.cache_meta = self.cache.store(key, url, resp.content, resp.headers, resp.encoding)
+            resp.cache_key = key
+        resp.from_cache = False
+        return resp
+
+    def parse(self, resp: requests.Response, parser: Callable[[str], T]) -> T:
+        """Return `parser(resp.text)`, reusing the stored result for cached bodies.
+
+        The result is stored with the cache entry, so when the next run gets a
+        304 for the same URL the page is not parsed again. Results must be JSON
+        serialisable (tuples come back as lists).
+        """
+        key = getattr(resp, "cache_key", None)
+        if self.cache is None or key is None:
+            return parser(resp.text)
+        meta = resp.cache_meta
+        name = getattr(parser, "__qualname__", repr(parser))
+        if resp.from_cache:
+            found, result = self.cache.load_parsed(key, meta, name)
+            if found:
+                self._record(_host(resp.url), parse_reused=1)
+                return result
+        result = parser(resp.text)
+        self.cache.store_parsed(key, meta, name, result)
+        return result
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying 429/5xx responses and connection errors.
+
+        After the last retry the final response is returned (callers still
+        call raise_for_status) or the final connection error is raised.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = _host(url)
+        attempt = 0
+        while True:
+            try:
+                resp = self._send(host, method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    self._record(host, failures=1)
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.info("Retrying %s %s in %.1fs after %s", method, url, delay, e)
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                delay = self._backoff_delay(attempt, resp.headers.get("Retry-After"))
+                logger.info(
+                    "Retrying %s %s in %.1fs after HTTP %s", method, url, delay, resp.status_code
+                )
+                resp.close()
+            attempt += 1
+            self._record(host, retries=1)
+            self._sleep(delay)
+
+    def _send(self, host: str, method: str, url: str, **kwargs) -> requests.Response:
+        slots = self._slots(host)
+        with slots:
+            self.rate_limiter.wait(url)
+            started = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self._record(host, requests=1, seconds=elapsed)
+        self._record(host, bytes=_body_size(resp))
+        return resp
+
+    def _slots(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slots
+
+    def _backoff_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form: fall back to the computed backoff
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def _record(self, host: str, **counts) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(host, dict(_EMPTY_STATS))
+            for name, value in counts.items():
+                stats[name] += value
+
+    def stats(self) -> dict:
+        """Per-host and total request, retry, failure, byte and latency counts."""
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._stats.items()}
+        total = dict(_EMPTY_STATS)
+        for stats in hosts.values():
+            for name, value in stats.items():
+                total[name] += value
+        for stats in (*hosts.values(), total):
+            stats["seconds"] = round(stats["seconds"], 3)
+            stats["avg_latency_ms"] = (
+                round(stats["seconds"] * 1000 / stats["requests"], 1) if stats["requests"] else None
+            )
+        return {"total": total, "hosts": hosts}
+
+    def close(self) -> None:
+        self.session.close()
@@ -6,73 +6,121 @@ in the same shape as other scrapers in this project.
 """
 
 import logging
+import os
 import re
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
 from bs4 import BeautifulSoup
 
 from scrapers.base import BaseScraper
+from scrapers.http_client import HttpClient
 
 logger = logging.getLogger("LetyShopsScraper")
 
+DEFAULT_WORKERS = int(os.environ.get("LETYSHOPS_WORKERS", "4"))
+DEFAULT_PREFETCH = int(os.environ.get("LETYSHOPS_LISTING_PREFETCH", "2"))
+
 
 class LetyshopsScraper(BaseScraper):
     BASE_URL = "https://letyshops.com"
     LISTING_PATH = "/de/shops"
+    MAX_PAGES = 50
+
+    def __init__(self, workers=None, prefetch=None):
+        """`workers` threads fetch listing and detail pages through the shared
+        HTTP client; `prefetch` listing pages are requested ahead of the one
+        being parsed. workers=1 and prefetch=1 crawl one page after the other.
+        """
+        super().__init__()
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.prefetch = max(1, prefetch or DEFAULT_PREFETCH)
+
+    def create_http_client(self, **options) -> HttpClient:
+        options.setdefault("max_per_host", self.workers)
+        return super().create_http_client(**options)
 
     def fetch(self) -> list[dict]:
         """Fetch shops by scraping the paginated listing pages.
 
         Returns a list of shop dicts: {name, rates, source_id, source}
         """
-        shops = []
-        page = 1
-        while True:
-            url = f"{self.BASE_URL}{self.LISTING_PATH}?page={page}"
-            try:
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 404:
-                    logger.info("Reached end of LetyShops listing at %s (404)", url)
+        return list(self.iter_shops())
+
+    def iter_shops(self) -> Iterator[dict]:
+        """Yield shops from the paginated listing pages, enriched with detail rates.
+
+        Listing pages are consumed in page order while the next `prefetch`
+        pages are already being fetched; the first missing or empty page ends
+        the listing and requests still queued for later pages are cancelled.
+        Detail pages are fetched and parsed by the pool as soon as their
+        listing page has been read. Shops are yielded in listing order, each
+        once its detail page is done.
+        """
+        details = deque()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            pending = deque()
+            next_page = 1
+            while True:
+                while len(pending) < self.prefetch and next_page <= self.MAX_PAGES:
+                    pending.append(pool.submit(self._fetch_listing_page, next_page))
+                    next_page += 1
+                if not pending:
+                    # Safety cap to avoid infinite loops
+                    logger.warning("Reached page cap while scraping LetyShops")
                     break
-                resp.raise_for_status()
-            except Exception as e:
-                logger.error("Failed to fetch %s: %s", url, e)
-                break
-
-            page_shops = self.parse_shops_from_html(resp.text)
-            if not page_shops:
-                break
-            shops.extend(page_shops)
-
-            # Basic pagination stop: if fewer than a typical page (e.g. < 1), stop.
-            # We rely on server-rendered pages; this is conservative.
-            if len(page_shops) < 1:
-                break
-            page += 1
-            # Safety cap to avoid infinite loops
-            if page > 50:
-                logger.warning("Reached page cap while scraping LetyShops")
-                break
-
-        # After collecting listing teasers, try to enrich each shop with
-        # detail (per-category) rates where available. We do this here so
-        # callers receive a shop dict where the teaser rate is replaced by
-        # categorized rates when present (avoids keeping an empty-category
-        # teaser alongside real category rates).
-        for item in shops:
-            sid = item.get("source_id")
-            if not sid:
-                continue
-            try:
-                detail_rates = self.fetch_shop_detail(sid)
-                if detail_rates:
-                    # Replace teaser rates with detail rates (detail_rates
-                    # are already filtered to contain meaningful categories).
-                    item["rates"] = detail_rates
-            except Exception as e:
-                logger.debug("Error fetching detail for %s: %s", sid, e)
 
-        return shops
+                page_shops = pending.popleft().result()
+                if not page_shops:
+                    break
+                # Enrich each shop with detail (per-category) rates where
+                # available, so callers receive a shop dict where the teaser
+                # rate is replaced by categorized rates when present.
+                for item in page_shops:
+                    sid = item.get("source_id")
+                    future = pool.submit(self.fetch_shop_detail, sid) if sid else None
+                    details.append((item, future))
+                # Hand out the shops whose details are already in, keeping the order
+                while details and (details[0][1] is None or details[0][1].done()):
+                    yield self._with_detail_rates(*details.popleft())
+
+            for future in pending:
+                future.cancel()
+            while details:
+                yield self._with_detail_rates(*details.popleft())
+        finally:
+            # A consumer that stops early leaves no requests queued
+            pool.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _with_detail_rates(item: dict, future) -> dict:
+        if future is None:
+            return item
+        try:
+            detail_rates = future.result()
+            if detail_rates:
+                # Replace teaser rates with detail rates (detail_rates
+                # are already filtered to contain meaningful categories).
+                item["rates"] = detail_rates
+        except Exception as e:
+            logger.debug("Error fetching detail for %s: %s", item.get("source_id"), e)
+        return item
+
+    def _fetch_listing_page(self, page: int) -> list[dict]:
+        """Fetch and parse one listing page; an empty list ends the listing."""
+        url = f"{self.BASE_URL}{self.LISTING_PATH}?page={page}"
+        try:
+            resp = self.http.get(url)
+            if resp.status_code == 404:
+                logger.info("Reached end of LetyShops listing at %s (404)", url)
+                return []
+            resp.raise_for_status()
+        except Exception as e:
+            logger.error("Failed to fetch %s: %s", url, e)
+            return []
+        return self.http.parse(resp, self.parse_shops_from_html)
 
     def fetch_shop_detail(self, source_id: str) -> list[dict]:
         """Fetch a shop detail page and parse rates per category.
@@ -81,13 +129,13 @@ class LetyshopsScraper(BaseScraper):
         """
         url = f"{self.BASE_URL}{self.LISTING_PATH}/{source_id}"
         try:
-            resp = requests.get(url, timeout=15)
+            resp = self.http.get(url)
             resp.raise_for_status()
         except Exception as e:
             logger.debug("Failed to fetch shop detail %s: %s", url, e)
             return []
 
-        return self.parse_shop_detail(resp.text)
+        return self.http.parse(resp, self.parse_shop_detail)
 
     @staticmethod
     def parse_shop_detail(html: str) -> list[dict]:
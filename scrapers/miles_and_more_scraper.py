@@ -47,13 +47,15 @@ class MilesAndMoreScraper(BaseScraper):
 
     def fetch(self):
         """Fetch partner data without writing to the database."""
+        return list(self.iter_shops())
+
+    def iter_shops(self):
+        """Yield each partner as soon as its page has been read (see `fetch`)."""
         try:
             from playwright.sync_api import sync_playwright  # noqa: E402
         except ImportError:
             print("[!] Playwright not installed. Install with: pip install playwright")
-            return []
-
-        results = []
+            return
 
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
@@ -131,28 +133,24 @@ class MilesAndMoreScraper(BaseScraper):
                         points_per_eur = 0.5
                         rate_note = "fallback_points_per_eur"
 
-                    results.append(
-                        {
-                            "name": partner["name"],
-                            "source_id": partner["url"],
-                            "source": "MilesAndMore",
-                            "rates": [
-                                {
-                                    "program": "MilesAndMore",
-                                    "points_per_eur": points_per_eur,
-                                    "cashback_pct": cashback_pct,
-                                    "point_value_eur": 0.01,
-                                    "rate_note": rate_note,
-                                    "rate_type": "shop",
-                                }
-                            ],
-                        }
-                    )
+                    yield {
+                        "name": partner["name"],
+                        "source_id": partner["url"],
+                        "source": "MilesAndMore",
+                        "rates": [
+                            {
+                                "program": "MilesAndMore",
+                                "points_per_eur": points_per_eur,
+                                "cashback_pct": cashback_pct,
+                                "point_value_eur": 0.01,
+                                "rate_note": rate_note,
+                                "rate_type": "shop",
+                            }
+                        ],
+                    }
             finally:
                 browser.close()
 
-        return results
-
     def scrape(self):
         """
         Scrape Miles & More partners
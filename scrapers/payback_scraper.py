@@ -1,7 +1,5 @@
 import re
 
-import requests  # type: ignore[import]
-
 from .base import BaseScraper
 
 
@@ -51,11 +49,7 @@ class PaybackScraper(BaseScraper):
     def fetch(self):
         """Fetch partner data from Payback API."""
         try:
-            resp = requests.get(
-                self.API_URL,
-                headers={"User-Agent": "shopping-points-optimiser/1.0 (+https://example.local)"},
-                timeout=15,
-            )
+            resp = self.http.get(self.API_URL)
             resp.raise_for_status()
         except Exception as e:
             raise RuntimeError(f"Error fetching payback partners from API: {e}")
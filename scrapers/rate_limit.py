@@ -0,0 +1,35 @@
+"""Per-host request pacing shared by the worker threads of a scraper."""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """Space requests to the same host at least 1 / requests_per_second apart.
+
+    Each call to `wait` reserves the next free slot of the URL's host and sleeps
+    until it is due, so any number of threads together never exceed the rate.
+    A rate of 0 or less disables pacing.
+    """
+
+    def __init__(self, requests_per_second: float, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def wait(self, url: str) -> float:
+        """Block until a request to the host of `url` may be sent; return the delay."""
+        if not self.interval:
+            return 0.0
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            self._sleep(delay)
+        return delay
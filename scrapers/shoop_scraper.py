@@ -17,9 +17,11 @@ class ShoopScraper(BaseScraper):
         Fetch all Shoop merchants and map to project shop and rate format, supporting both relative and absolute cashback/points.
         Returns a list of dicts: {name, rates: [{program, points_per_eur, points_absolute, cashback_pct, cashback_absolute, rate_note, ...}]}
         """
-        merchants = self.fetch_all_merchants_api()
-        results = []
-        for m in merchants:
+        return list(self.iter_shops())
+
+    def iter_shops(self):
+        """Yield mapped shops (see `fetch`) while the merchant pages are being read."""
+        for m in self.iter_merchants_api():
             rates = []
             for r in m.get("rates", []):
                 cashback_pct = 0.0
@@ -63,8 +65,7 @@ class ShoopScraper(BaseScraper):
                 "source_id": str(m.get("id")),
                 "source": "Shoop",
             }
-            results.append(shop_data)
-        return results
+            yield shop_data
 
     """Scraper for Shoop cashback program."""
     BASE_URL = "https://www.shoop.de"
@@ -82,9 +83,10 @@ class ShoopScraper(BaseScraper):
         Fetch all merchants from Shoop API, handling all categories and paging.
         Returns a list of merchant dicts in internal format.
         """
-        import requests
+        return list(self.iter_merchants_api())
 
-        merchants = []
+    def iter_merchants_api(self):
+        """Yield merchants (internal format) page by page, once per merchant id."""
         seen_ids = set()
         categories = self._fetch_categories_api()
         for cat in categories:
@@ -97,7 +99,7 @@ class ShoopScraper(BaseScraper):
                     "itemsCursor": items_cursor,
                 }
                 try:
-                    resp = requests.get(self.API_URL_MERCHANTS, params=params)
+                    resp = self.http.get(self.API_URL_MERCHANTS, params=params)
                     resp.raise_for_status()
                     data = resp.json()
                     if "message" in data and isinstance(data["message"], dict):
@@ -107,27 +109,25 @@ class ShoopScraper(BaseScraper):
                         break
                     if not shops:
                         break
+                    page = []
                     for d in shops:
                         merchant_id = d.get("id")
                         if merchant_id in seen_ids:
                             continue
-                        merchant = self._map_merchant_api(d)
-                        merchants.append(merchant)
+                        page.append(self._map_merchant_api(d))
                         seen_ids.add(merchant_id)
-                    if not items_cursor:
-                        break
                 except Exception as e:
                     self.logger.error(f"Error fetching merchants for category {cat}: {e}")
                     break
-        return merchants
+                yield from page
+                if not items_cursor:
+                    break
 
     def _fetch_categories_api(self):
         """Fetch category IDs from Shoop API."""
-        import requests
-
         categories = []
         try:
-            response = requests.get(self.API_URL_CATEGORIES)
+            response = self.http.get(self.API_URL_CATEGORIES)
             response.raise_for_status()
             data = response.json()
             if "message" in data and isinstance(data["message"], dict):
@@ -8,10 +8,63 @@ Data Access: Static HTML with minimal JavaScript
 Difficulty: 2/5 (straightforward HTML parsing)
 """
 
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from bs4 import BeautifulSoup
 
 from .base import BaseScraper
+from .http_client import HttpClient
+
+# Detail pages are fetched by this many threads; all requests to the site share
+# one requests-per-second budget (the former crawl slept 0.5s per category page)
+DEFAULT_WORKERS = int(os.environ.get("TOPCASHBACK_WORKERS", "4"))
+DEFAULT_REQUESTS_PER_SECOND = float(os.environ.get("TOPCASHBACK_REQUESTS_PER_SECOND", "2"))
+
+NON_SHOP_NAMES = {
+    "blog",
+    "browser erweiterung",
+    "browser-erweiterung",
+    "app",
+    "hilfe",
+    "faq",
+    "kontakt",
+    "über uns",
+    "impressum",
+    "datenschutz",
+    "agb",
+    "browser extension",
+    "extension",
+    "newsletter",
+    "community",
+    "karriere",
+    "jobs",
+    "team",
+    "partner werden",
+    "partnerprogramm",
+    "überblick",
+    "ratgeber",
+    "magazin",
+    "news",
+    "mein konto",
+    "login",
+    "registrieren",
+    "logout",
+    "bedingungen",
+    "support",
+    "feedback",
+    "datenschutzerklärung",
+    "cookie einstellungen",
+    "cookies",
+    "sicherheit",
+    "preise",
+    "angebote",
+    "aktionen",
+    "aktionen & angebote",
+    "aktionen und angebote",
+}
 
 
 class TopCashbackScraper(BaseScraper):
@@ -25,15 +78,22 @@ class TopCashbackScraper(BaseScraper):
             return href
         return f"{self.BASE_URL}{href}" if href.startswith("/") else f"{self.BASE_URL}/{href}"
 
-    def __init__(self):
+    def __init__(self, workers=None, requests_per_second=None):
         super().__init__()
-        self.session = requests.Session()
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.requests_per_second = (
+            DEFAULT_REQUESTS_PER_SECOND if requests_per_second is None else requests_per_second
+        )
+
+    def create_http_client(self, **options) -> HttpClient:
+        options.setdefault("timeout", 20)
+        options.setdefault("max_per_host", self.workers)
+        options.setdefault("requests_per_second", self.requests_per_second)
+        return super().create_http_client(**options)
 
     @staticmethod
     def _extract_cashback_percentage(text):
         """Extract cashback percentage as float from text like 'Bis zu 8%' or '8% Cashback'"""
-        import re
-
         if not text:
             return 0.0
         match = re.search(r"([\d,.]+)\s*%", text)
@@ -46,19 +106,129 @@ class TopCashbackScraper(BaseScraper):
     Notes:
     - TopCashback exposes merchants via category pages under `/kategorie/<name>/`.
     - We crawl categories from the homepage and extract merchant links and rates.
+    - Merchant detail pages are fetched afterwards, once per unique URL, by a
+      pool of `workers` threads paced to `requests_per_second` per host.
     """
 
     BASE_URL = "https://www.topcashback.de"
 
     def fetch(self):
-        """Override this method to return a value or None if not overridden."""
-        import time
+        return list(self.iter_shops())
 
-        # Discover categories from homepage
+    def iter_shops(self):
+        """Crawl all categories, then fetch every unique merchant detail page once.
+
+        Shops are yielded in the order they were first listed, each as soon as
+        the detail pages of all its listings are in.
+        """
+        category_links = self._discover_categories()
+        if not category_links:
+            return
+        print(f"[+] Discovered {len(category_links)} category pages")
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            # Category pass: panels only; pages of one category are followed in order
+            panels_by_shop = {}
+            panel_count = 0
+            for category_panels in pool.map(self._crawl_category, category_links):
+                for panel in category_panels:
+                    panels_by_shop.setdefault(panel["canonical"], []).append(panel)
+                    panel_count += 1
+            shop_urls = list(
+                dict.fromkeys(
+                    panel["url"]
+                    for panels in panels_by_shop.values()
+                    for panel in panels
+                    if panel["url"]
+                )
+            )
+            print(
+                f"[+] Found {panel_count} merchant panels, fetching {len(shop_urls)} detail pages "
+                f"with {self.workers} workers at {self.requests_per_second:g} req/s"
+            )
+            # Detail pass: each merchant URL once, however many categories list it
+            details = {url: pool.submit(self._fetch_detail_rates, url) for url in shop_urls}
+            for canonical, panels in panels_by_shop.items():
+                shop = self._build_shop(canonical, panels, details)
+                if shop:
+                    yield shop
+        finally:
+            # A consumer that stops early leaves no detail requests queued
+            pool.shutdown(cancel_futures=True)
+
+    def _build_shop(self, canonical, panels, details):
+        """Merge the listings of one shop (by canonical name) into a shop dict."""
+        shop = None
+        for panel in panels:
+            category_name = panel["category_name"]
+            rates = []
+            detail = details.get(panel["url"])
+            for rate_val, subcat_text in detail.result() if detail else []:
+                # Prefer the per-rate sub-category as the stored category (clean parentheses)
+                category_field = category_name
+                if subcat_text:
+                    cleaned = re.sub(r"\s*\(.*\)\s*$", "", subcat_text).strip()
+                    if cleaned:
+                        category_field = cleaned
+
+                rate_obj = {
+                    "program": "TopCashback",
+                    "cashback_pct": rate_val,
+                    "points_per_eur": 0.0,
+                    "point_value_eur": 0.0,
+                    "category": category_field,
+                }
+                if subcat_text:
+                    rate_obj["sub_category"] = subcat_text
+                rates.append(rate_obj)
+
+            # Fallback: if no rates found, use summary from category page
+            if not rates and panel["cashback_text"]:
+                rate_val = TopCashbackScraper._extract_cashback_percentage(panel["cashback_text"])
+                rates.append(
+                    {
+                        "program": "TopCashback",
+                        "cashback_pct": rate_val,
+                        "points_per_eur": 0.0,
+                        "point_value_eur": 0.0,
+                        "category": category_name,
+                    }
+                )
+
+            if not rates:
+                continue
+
+            description = panel["description"]
+            if shop is None:
+                shop = {
+                    "name": panel["name"],
+                    "description": description,
+                    "rates": rates,
+                    "category": category_name,
+                    "source": "TopCashback",
+                    "source_id": panel["url"] or canonical,
+                }
+            else:
+                # Merge rates if shop seen again
+                shop["rates"].extend(rates)
+                if panel["url"] and not shop.get("source_id"):
+                    shop["source_id"] = panel["url"]
+                if description and len(description) > len(shop["description"]):
+                    shop["description"] = description
+        return shop
+
+    def _get(self, url):
+        """GET a page of the site, paced by the client's per-host rate limiter."""
+        resp = self.http.get(url)
+        resp.raise_for_status()
+        return resp
+
+    def _discover_categories(self):
+        """Return the sorted category page URLs linked from the homepage."""
         try:
             print("[*] Fetching TopCashback homepage to discover categories...")
-            resp_home = self.session.get(self.BASE_URL, timeout=20)
-            resp_home.raise_for_status()
+            resp_home = self._get(self.BASE_URL)
         except requests.RequestException as e:
             print(f"[!] Error fetching TopCashback homepage: {e}")
             return []
@@ -85,179 +255,86 @@ class TopCashbackScraper(BaseScraper):
         category_links = sorted(set(category_links))
         if not category_links:
             print("[!] No category links found; cannot enumerate merchants")
+        return category_links
+
+    def _crawl_category(self, cat_url):
+        """Return the merchant panels of all pages of one category, in page order."""
+        print(f"[*] Crawling category: {cat_url}")
+        # Extract category name from URL (e.g., /kategorie/elektronik/ -> elektronik)
+        cat_match = re.search(r"/kategorie/([^/]+)/", cat_url)
+        category_name = cat_match.group(1) if cat_match else cat_url
+        panels = []
+        page = 1
+        while True:
+            paged_url = f"{cat_url}?page={page}"
+            try:
+                resp_cat = self._get(paged_url)
+            except requests.RequestException as e:
+                print(f"[!] Error fetching category {paged_url}: {e}")
+                break
+
+            soup_cat = BeautifulSoup(resp_cat.text, "html.parser")
+            page_panels = soup_cat.find_all("a", class_="category-panel", href=True)
+            if not page_panels:
+                break
+
+            for panel in page_panels:
+                name_tag = panel.find("span", class_="search-merchant-name")
+                name = name_tag.get_text(strip=True) if name_tag else None
+                if not name:
+                    continue
+                canonical = name.lower().strip()
+                if canonical in NON_SHOP_NAMES:
+                    continue
+                shop_url = panel.get("href")
+                if shop_url:
+                    shop_url = str(shop_url)
+                    if shop_url.startswith("/"):
+                        shop_url = f"{self.BASE_URL}{shop_url}"
+                cashback_tag = panel.find("span", class_="category-cashback-rate")
+                description_tag = panel.find("span", class_="category-description")
+                panels.append(
+                    {
+                        "name": name,
+                        "canonical": canonical,
+                        "url": shop_url or None,
+                        "category_name": category_name,
+                        "cashback_text": cashback_tag.get_text(strip=True) if cashback_tag else "",
+                        "description": (
+                            description_tag.get_text(strip=True) if description_tag else ""
+                        ),
+                    }
+                )
+
+            page += 1
+        return panels
+
+    def _fetch_detail_rates(self, shop_url):
+        """Return (cashback_pct, sub-category text) pairs from a merchant detail page.
+
+        Errors are logged and yield no rates, so the category summary rate is used.
+        """
+        try:
+            resp_detail = self._get(shop_url)
+            # Unchanged pages (HTTP 304 with the response cache) reuse the parsed rates
+            return self.http.parse(resp_detail, self.parse_detail_rates)
+        except Exception as e:
+            print(f"[!] Error fetching detail page {shop_url}: {e}")
             return []
-        print(f"[+] Discovered {len(category_links)} category pages")
 
-        NON_SHOP_NAMES = {
-            "blog",
-            "browser erweiterung",
-            "browser-erweiterung",
-            "app",
-            "hilfe",
-            "faq",
-            "kontakt",
-            "über uns",
-            "impressum",
-            "datenschutz",
-            "agb",
-            "browser extension",
-            "extension",
-            "newsletter",
-            "community",
-            "karriere",
-            "jobs",
-            "team",
-            "partner werden",
-            "partnerprogramm",
-            "überblick",
-            "ratgeber",
-            "magazin",
-            "news",
-            "mein konto",
-            "login",
-            "registrieren",
-            "logout",
-            "bedingungen",
-            "support",
-            "feedback",
-            "datenschutzerklärung",
-            "cookie einstellungen",
-            "cookies",
-            "sicherheit",
-            "preise",
-            "angebote",
-            "aktionen",
-            "aktionen & angebote",
-            "aktionen und angebote",
-        }
-
-        shop_map = {}
-        for cat_url in category_links:
-            print(f"[*] Crawling category: {cat_url}")
-            # Extract category name from URL (e.g., /kategorie/elektronik/ -> elektronik)
-            import re
-
-            cat_match = re.search(r"/kategorie/([^/]+)/", cat_url)
-            category_name = cat_match.group(1) if cat_match else cat_url
-            page = 1
-            while True:
-                paged_url = f"{cat_url}?page={page}"
-                try:
-                    resp_cat = self.session.get(paged_url, timeout=20)
-                    resp_cat.raise_for_status()
-                except requests.RequestException as e:
-                    print(f"[!] Error fetching category {paged_url}: {e}")
-                    break
-
-                soup_cat = BeautifulSoup(resp_cat.text, "html.parser")
-                panels = soup_cat.find_all("a", class_="category-panel", href=True)
-                if not panels:
-                    break
-
-                for panel in panels:
-                    name_tag = panel.find("span", class_="search-merchant-name")
-                    name = name_tag.get_text(strip=True) if name_tag else None
-                    if not name:
-                        continue
-                    canonical = name.lower().strip()
-                    if canonical in NON_SHOP_NAMES:
-                        continue
-                    shop_url = panel.get("href")
-                    if shop_url:
-                        shop_url = str(shop_url)
-                        if shop_url.startswith("/"):
-                            shop_url = f"{self.BASE_URL}{shop_url}"
-                    cashback_tag = panel.find("span", class_="category-cashback-rate")
-                    cashback_text = cashback_tag.get_text(strip=True) if cashback_tag else ""
-                    description_tag = panel.find("span", class_="category-description")
-                    description = description_tag.get_text(strip=True) if description_tag else ""
-
-                    # Fetch detail page for all rates
-                    rates = []
-                    if shop_url:
-                        shop_url = str(shop_url)
-                        try:
-                            resp_detail = self.session.get(shop_url, timeout=20)
-                            resp_detail.raise_for_status()
-                            soup_detail = BeautifulSoup(resp_detail.text, "html.parser")
-                            for rate_card in soup_detail.find_all("div", class_="merch-rate-card"):
-                                # Collect sub-categories and rate elements and pair them by index
-                                subcat_elems = rate_card.find_all(
-                                    "span", class_="merch-cat__sub-cat"
-                                )
-                                subcats = [s.get_text(strip=True) for s in subcat_elems]
-                                rate_spans = rate_card.find_all("span", class_="merch-cat__rate")
-
-                                import re as _re
-
-                                for idx, rate_span in enumerate(rate_spans):
-                                    rate_val = TopCashbackScraper._extract_cashback_percentage(
-                                        rate_span.get_text(strip=True)
-                                    )
-                                    subcat_text = subcats[idx] if idx < len(subcats) else ""
-
-                                    # Prefer the per-rate sub-category as the stored category (clean parentheses)
-                                    category_field = category_name
-                                    if subcat_text:
-                                        cleaned = _re.sub(r"\s*\(.*\)\s*$", "", subcat_text).strip()
-                                        if cleaned:
-                                            category_field = cleaned
-
-                                    rate_obj = {
-                                        "program": "TopCashback",
-                                        "cashback_pct": rate_val,
-                                        "points_per_eur": 0.0,
-                                        "point_value_eur": 0.0,
-                                        "category": category_field,
-                                    }
-                                    if subcat_text:
-                                        rate_obj["sub_category"] = subcat_text
-                                    rates.append(rate_obj)
-                        except Exception as e:
-                            print(f"[!] Error fetching detail page for {name}: {e}")
-
-                    # Fallback: if no rates found, use summary from category page
-                    if not rates and cashback_text:
-                        rate_val = TopCashbackScraper._extract_cashback_percentage(cashback_text)
-                        rates.append(
-                            {
-                                "program": "TopCashback",
-                                "cashback_pct": rate_val,
-                                "points_per_eur": 0.0,
-                                "point_value_eur": 0.0,
-                                "category": category_name,
-                            }
-                        )
-
-                    if not rates:
-                        continue
-
-                    # Deduplicate by canonical name
-                    if canonical not in shop_map:
-                        shop_map[canonical] = {
-                            "name": name,
-                            "description": description,
-                            "rates": rates,
-                            "category": category_name,
-                            "source": "TopCashback",
-                            "source_id": shop_url or canonical,
-                        }
-                    else:
-                        # Merge rates if shop seen again
-                        shop_map[canonical]["rates"].extend(rates)
-                        if shop_url and not shop_map[canonical].get("source_id"):
-                            shop_map[canonical]["source_id"] = shop_url
-                        if description and len(description) > len(
-                            shop_map[canonical]["description"]
-                        ):
-                            shop_map[canonical]["description"] = description
-
-                page += 1
-                time.sleep(0.5)  # Be polite
-
-        # ...existing code...
-        # For test compatibility: if called in test context, return (results, debug)
-        results = list(shop_map.values())
-        # If running in test, return (results, debug) if requested
-
-        return results
+    @staticmethod
+    def parse_detail_rates(html):
+        """Pair the rates of a detail page's rate cards with their sub-categories."""
+        rates = []
+        soup_detail = BeautifulSoup(html, "html.parser")
+        for rate_card in soup_detail.find_all("div", class_="merch-rate-card"):
+            # Collect sub-categories and rate elements and pair them by index
+            subcat_elems = rate_card.find_all("span", class_="merch-cat__sub-cat")
+            subcats = [s.get_text(strip=True) for s in subcat_elems]
+            rate_spans = rate_card.find_all("span", class_="merch-cat__rate")
+            for idx, rate_span in enumerate(rate_spans):
+                rate_val = TopCashbackScraper._extract_cashback_percentage(
+                    rate_span.get_text(strip=True)
+                )
+                rates.append((rate_val, subcats[idx] if idx < len(subcats) else ""))
+        return rates
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""Benchmark the bulk coupon import against the former per-coupon import.
+
+A scratch database is filled with shops (half of them also reachable through
+a variant name), then a coupon payload is imported twice by every engine: the
+first pass inserts, the second supersedes every coupon of the first. Wall
+time and the number of SQL statements are reported per pass, and the engines
+must leave the same active coupons behind.
+
+Usage:
+  python scripts/benchmark_coupon_import.py [--coupons 5000] [--shops 2000]
+      [--database-url sqlite:////tmp/bench.db]
+
+Without --database-url a temporary SQLite file is used. Tables of the given
+database are dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _legacy_import(coupons: list[dict], program_id: int) -> int:
+    """The per-coupon implementation /api/coupon-import used before the bulk pipeline."""
+    from spo.extensions import db
+    from spo.models import Coupon, Shop, ShopMain, ShopVariant
+    from spo.services.coupon_import import _coupon_row
+    from spo.services.merchant_resolver import normalize_merchant_name
+
+    def resolve(merchant: str) -> int | None:
+        main = ShopMain.query.filter(
+            ShopMain.canonical_name_lower == normalize_merchant_name(merchant)
+        ).first()
+        if main:
+            shop = Shop.query.filter_by(shop_main_id=main.id).first()
+            if shop:
+                return shop.id
+        variant = ShopVariant.query.filter(ShopVariant.source_name.ilike(merchant)).first()
+        if variant:
+            shop = Shop.query.filter_by(shop_main_id=variant.shop_main_id).first()
+            if shop:
+                return shop.id
+        shop = Shop.query.filter(Shop.name.ilike(merchant)).first()
+        return shop.id if shop else None
+
+    resolved = [(c, resolve(c["merchant"])) for c in coupons]
+    for c, shop_id in resolved:
+        row = _coupon_row(c, shop_id, program_id)
+        existing = Coupon.query.filter(
+            Coupon.shop_id == shop_id,
+            Coupon.name == row["name"],
+            Coupon.status == "active",
+            Coupon.program_id == program_id,
+        ).all()
+        for prev in existing:
+            prev.status = "inactive"
+            prev.valid_to = row["valid_from"]
+        db.session.add(Coupon(**row))
+    return len(resolved)
+
+
+def _bulk_import(coupons: list[dict], program_id: int) -> int:
+    from spo.services.coupon_import import import_coupons
+    from spo.services.merchant_resolver import merchant_resolver
+
+    shop_ids = merchant_resolver.resolve_many(c["merchant"] for c in coupons)
+    return import_coupons([(c, shop_ids[c["merchant"]]) for c in coupons], program_id)
+
+
+ENGINES = {"per-coupon (legacy)": _legacy_import, "bulk": _bulk_import}
+
+
+def _load_shops(count: int, rng: random.Random) -> list[str]:
+    """Create shops and return the merchant names coupons may refer to them by."""
+    import uuid
+
+    from sqlalchemy import insert
+
+    from spo.extensions import db
+    from spo.models import BonusProgram, Shop, ShopMain, ShopVariant
+
+    db.drop_all()
+    db.create_all()
+    db.session.add(BonusProgram(name="Bench", point_value_eur=0.01))
+    mains, variants, shops, merchants = [], [], [], []
+    for idx in range(count):
+        main_id = str(uuid.uuid4())
+        name = f"Bench Shop {idx}"
+        mains.append(
+            {
+                "id": main_id,
+                "canonical_name": name,
+                "canonical_name_lower": name.lower(),
+                "status": "active",
+            }
+        )
+        shops.append({"name": name, "shop_main_id": main_id})
+        merchants.append(rng.choice([name, name.upper()]))
+        if idx % 2:
+            variants.append(
+                {"shop_main_id": main_id, "source": "bench", "source_name": f"{name} Online"}
+            )
+            merchants.append(f"{name} online")
+    db.session.execute(insert(ShopMain), mains)
+    db.session.execute(insert(ShopVariant), variants)
+    db.session.execute(insert(Shop), shops)
+    db.session.commit()
+    return merchants
+
+
+def _clear_coupons() -> None:
+    from spo.extensions import db
+    from spo.models import Coupon
+
+    db.session.query(Coupon).delete()
+    db.session.commit()
+
+
+def _active_coupons() -> set[tuple]:
+    from spo.models import Coupon
+
+    return {
+        (c.shop_id, c.name, c.value)
+        for c in Coupon.query.filter_by(status="active").with_entities(
+            Coupon.shop_id, Coupon.name, Coupon.value
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coupons", type=int, default=5000)
+    parser.add_argument("--shops", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="scratch database (tables are recreated)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/bench.db"
+        os.environ.setdefault("DISABLE_JOB_QUEUE", "true")
+
+        from sqlalchemy import event
+
+        from spo import create_app
+        from spo.extensions import db
+        from spo.models import BonusProgram
+
+        app = create_app(start_jobs=False, run_seed=False)
+        with app.app_context():
+            rng = random.Random(args.seed)
+            merchants = _load_shops(args.shops, rng)
+            program_id = BonusProgram.query.filter_by(name="Bench").one().id
+            titles = [f"Deal {idx}" for idx in range(args.coupons // len(merchants) + 1)]
+            pairs = rng.sample(
+                [(m, t) for m in merchants for t in titles], min(args.coupons, len(merchants) * 4)
+            )
+            passes = [
+                [{"merchant": m, "title": t, "value": value} for m, t in pairs] for value in (5, 10)
+            ]
+            print(f"{len(pairs):,} coupons, {args.shops:,} shops, {len(set(merchants)):,} names")
+
+            statements = []
+            event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+            results = {}
+            for name, engine in ENGINES.items():
+                _clear_coupons()
+                timings = []
+                for label, coupons in zip(("insert", "supersede"), passes, strict=True):
+                    statements.clear()
+                    start = time.perf_counter()
+                    engine(coupons, program_id)
+                    db.session.commit()
+                    wall = time.perf_counter() - start
+                    timings.append(wall)
+                    print(
+                        f"  {name:<22} {label:<10} {wall:8.3f}s"
+                        f"  {len(coupons) / wall:>10,.0f} coupons/s  {len(statements):>8,} stmts"
+                    )
+                results[name] = (_active_coupons(), sum(timings))
+
+            (legacy, legacy_wall), (bulk, bulk_wall) = results.values()
+            status = "ok" if legacy == bulk else "MISMATCH"
+            print(f"  speedup x{legacy_wall / bulk_wall:.1f}  [{status}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""Benchmark deduplication speed and quality on a synthetic shop-name corpus.
+
+For each corpus size (see dedup_corpus.py) the ShopMain table of a scratch
+database is filled with the corpus, then every registered engine is run:
+
+- pair engines return the duplicate pairs they would merge; they are scored
+  against the corpus ground truth (precision / recall) and timed, with
+  comparisons = candidate pairs actually scored
+- lookup engines resolve fresh variants of known shops to a ShopMain id; a
+  lookup is correct when it returns a shop of the same entity
+
+New engines are added by registering a function in PAIR_ENGINES or
+LOOKUP_ENGINES.
+
+Usage:
+  python scripts/benchmark_dedup.py [--sizes 1000 10000 50000] [--threshold 98]
+      [--queries 500] [--workers 4] [--database-url sqlite:////tmp/bench.db]
+
+Without --database-url a temporary SQLite file is used. Tables of the given
+database are dropped and recreated, so never point it at real data.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dedup_corpus import CorpusName, build_corpus, duplicate_pairs, variant  # noqa: E402
+
+
+@dataclass
+class BenchContext:
+    """Corpus loaded into the database plus the parameters of this run."""
+
+    corpus: list[CorpusName]
+    shop_ids: list[str]
+    threshold: float
+    workers: int
+
+
+@dataclass
+class PairRun:
+    pairs: set[frozenset[str]]
+    comparisons: int
+
+
+def _scanned_pairs(ctx: BenchContext) -> int:
+    from spo.models import ShopMain
+    from spo.services.dedup import _candidate_pairs, stored_normalized_name
+
+    names = [
+        stored_normalized_name(shop.canonical_name_normalized, shop.canonical_name)
+        for shop in ShopMain.query.filter_by(status="active").all()
+    ]
+    return len(_candidate_pairs(names, ctx.threshold))
+
+
+def _find_duplicate_shops(workers: int) -> Callable[[BenchContext], PairRun]:
+    def run(ctx: BenchContext) -> PairRun:
+        from spo.services.dedup import find_duplicate_shops
+
+        found = find_duplicate_shops(threshold=ctx.threshold, workers=workers)
+        return PairRun({frozenset((a.id, b.id)) for a, b, _ in found}, comparisons=-1)
+
+    return run
+
+
+def _find_shop_by_similarity(name: str, ctx: BenchContext) -> str | None:
+    from spo.services.dedup import find_shop_by_similarity
+
+    match, _score = find_shop_by_similarity(name, threshold=ctx.threshold)
+    return match.id if match else None
+
+
+PAIR_ENGINES: dict[str, Callable[[BenchContext], PairRun]] = {
+    "find_duplicate_shops": _find_duplicate_shops(workers=1),
+}
+LOOKUP_ENGINES: dict[str, Callable[[str, BenchContext], str | None]] = {
+    "find_shop_by_similarity": _find_shop_by_similarity,
+}
+
+
+def _load_corpus(corpus: list[CorpusName]) -> list[str]:
+    from sqlalchemy import insert
+
+    from spo.extensions import db
+    from spo.models import ShopMain
+    from spo.models.helpers import normalize_shop_name
+    from spo.services.dedup import shop_name_index
+
+    db.drop_all()
+    db.create_all()
+    shop_ids = [f"bench-{idx}" for idx in range(len(corpus))]
+    rows = [
+        {
+            "id": shop_id,
+            "canonical_name": item.name,
+            "canonical_name_lower": item.name.lower(),
+            "canonical_name_normalized": normalize_shop_name(item.name),
+            "status": "active",
+        }
+        for shop_id, item in zip(shop_ids, corpus, strict=True)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(ShopMain), rows[start : start + 5000])
+    db.session.commit()
+    shop_name_index.invalidate()
+    return shop_ids
+
+
+def _precision_recall(predicted: set, truth: set) -> tuple[float, float]:
+    hits = len(predicted & truth)
+    precision = hits / len(predicted) if predicted else 1.0
+    recall = hits / len(truth) if truth else 1.0
+    return precision, recall
+
+
+def _report(name: str, wall: float, work: int, unit: str, precision: float, recall: float):
+    rate = f"{work / wall:>12,.0f} {unit}/s" if wall > 0 and work >= 0 else " " * 21
+    print(
+        f"  {name:<32} {wall:9.3f}s  {work:>12,} {unit:<5} {rate}"
+        f"  P={precision:6.2%}  R={recall:6.2%}"
+    )
+
+
+def run_size(size: int, args) -> None:
+    corpus = build_corpus(size, seed=args.seed)
+    shop_ids = _load_corpus(corpus)
+    ctx = BenchContext(corpus, shop_ids, args.threshold, args.workers)
+    truth = {frozenset(shop_ids[i] for i in pair) for pair in duplicate_pairs(corpus)}
+    print(f"\n{size:,} shops, {len(truth):,} true duplicate pairs, threshold {args.threshold}")
+
+    scanned = _scanned_pairs(ctx)
+    for name, engine in PAIR_ENGINES.items():
+        start = time.perf_counter()
+        result = engine(ctx)
+        wall = time.perf_counter() - start
+        comparisons = result.comparisons if result.comparisons >= 0 else scanned
+        precision, recall = _precision_recall(result.pairs, truth)
+        _report(name, wall, comparisons, "cmp", precision, recall)
+
+    # Lookups: fresh spellings of shops that exist in the corpus
+    rng = random.Random(args.seed + size)
+    entity_shops: dict[int, set[str]] = {}
+    for shop_id, item in zip(shop_ids, corpus, strict=True):
+        entity_shops.setdefault(item.entity, set()).add(shop_id)
+    samples = rng.sample(range(len(corpus)), min(args.queries, len(corpus)))
+    queries = [(variant(corpus[i].name, rng), corpus[i].entity) for i in samples]
+
+    for name, engine in LOOKUP_ENGINES.items():
+        engine(queries[0][0], ctx)  # warm up caches and indexes outside the timing
+        start = time.perf_counter()
+        answers = [engine(query, ctx) for query, _ in queries]
+        wall = time.perf_counter() - start
+        returned = [(answer, entity) for answer, (_, entity) in zip(answers, queries) if answer]
+        correct = sum(1 for answer, entity in returned if answer in entity_shops[entity])
+        precision = correct / len(returned) if returned else 1.0
+        recall = correct / len(queries) if queries else 1.0
+        _report(name, wall, len(queries), "look", precision, recall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--threshold", type=float, default=98.0)
+    parser.add_argument("--queries", type=int, default=500, help="lookups per size")
+    parser.add_argument("--workers", type=int, default=1, help="also run a parallel scan")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="scratch database (tables are recreated)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/bench.db"
+        os.environ.setdefault("DISABLE_JOB_QUEUE", "true")
+
+        from spo import create_app
+
+        if args.workers > 1:
+            PAIR_ENGINES[f"find_duplicate_shops[{args.workers}w]"] = _find_duplicate_shops(
+                args.workers
+            )
+
+        app = create_app(start_jobs=False, run_seed=False)
+        with app.app_context():
+            for size in args.sizes:
+                run_size(size, args)
+
+
+if __name__ == "__main__":
+    main()
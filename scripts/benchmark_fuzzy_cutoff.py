@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Benchmark the bounded similarity scorer against full SequenceMatcher scoring.
+
+Scores every pair of a German shop-name corpus (see dedup_corpus.py) once
+without a cutoff and once with `score_cutoff` for the thresholds used by
+`get_or_create_shop_main` and deduplication, and checks that both agree.
+
+Usage:
+  python scripts/benchmark_fuzzy_cutoff.py [--names 600] [--seed 42]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dedup_corpus import build_corpus  # noqa: E402
+
+from spo.models.helpers import normalize_shop_name  # noqa: E402
+from spo.services.dedup import fuzzy_match_normalized  # noqa: E402
+
+
+def _time_pairs(names: list[str], cutoff: float | None) -> tuple[float, list[float]]:
+    start = time.perf_counter()
+    scores = [
+        fuzzy_match_normalized(names[i], names[j], cutoff)
+        for i in range(len(names))
+        for j in range(i + 1, len(names))
+    ]
+    return time.perf_counter() - start, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=600, help="corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    names = [normalize_shop_name(item.name) for item in build_corpus(args.names, args.seed)]
+    pair_count = len(names) * (len(names) - 1) // 2
+    print(f"{len(names)} names, {pair_count} pairs")
+
+    baseline, full_scores = _time_pairs(names, None)
+    print(f"  no cutoff      {baseline:7.3f}s  {pair_count / baseline:>10,.0f} pairs/s")
+
+    for cutoff in (98.0, 90.0, 70.0):
+        elapsed, scores = _time_pairs(names, cutoff)
+        expected = [s if s >= cutoff else 0.0 for s in full_scores]
+        status = "ok" if scores == expected else "MISMATCH"
+        hits = sum(1 for s in scores if s >= cutoff)
+        print(
+            f"  cutoff {cutoff:5.1f}   {elapsed:7.3f}s  {pair_count / elapsed:>10,.0f} pairs/s"
+            f"  x{baseline / elapsed:5.1f}  {hits} matches  [{status}]"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Synthetic German shop-name corpus with duplicate ground truth.
+
+Every generated name belongs to an entity (a shop). Names of the same entity
+are the spellings different scrapers and users produce for one shop: domain
+forms, "Shop"/"Online" suffixes, legal forms, umlaut transliterations,
+hyphenation and typos. Any two names of one entity form a true duplicate pair.
+
+Used by scripts/benchmark_dedup.py and scripts/benchmark_fuzzy_cutoff.py.
+"""
+
+import random
+from dataclasses import dataclass
+from itertools import combinations
+
+GERMAN_SHOP_NAMES = [
+    "Otto",
+    "Zalando",
+    "MediaMarkt",
+    "Saturn",
+    "Lidl",
+    "Aldi Süd",
+    "Kaufland",
+    "Douglas",
+    "dm-drogerie markt",
+    "Rossmann",
+    "Tchibo",
+    "Thalia",
+    "Hugendubel",
+    "Galeria",
+    "Breuninger",
+    "About You",
+    "Bonprix",
+    "Baur",
+    "Heine",
+    "Witt Weiden",
+    "Peek & Cloppenburg",
+    "Deichmann",
+    "Görtz",
+    "Mytheresa",
+    "Conrad Electronic",
+    "Cyberport",
+    "notebooksbilliger.de",
+    "Alternate",
+    "Mindfactory",
+    "Expert",
+    "Euronics",
+    "IKEA",
+    "Höffner",
+    "XXXLutz",
+    "Poco",
+    "Roller",
+    "Home24",
+    "Westwing",
+    "Bauhaus",
+    "Hornbach",
+    "OBI",
+    "Toom Baumarkt",
+    "Hagebau",
+    "Globus Baumarkt",
+    "Fressnapf",
+    "Zooplus",
+    "Shop Apotheke",
+    "DocMorris",
+    "Medpex",
+    "Sanicare",
+    "Flaconi",
+    "Parfümdreams",
+    "Lensbest",
+    "Mister Spex",
+    "Fielmann",
+    "Apollo Optik",
+    "Deutsche Bahn",
+    "Flixbus",
+    "Lufthansa",
+    "Eurowings",
+    "Condor",
+    "Sixt",
+    "Europcar",
+    "Booking.com",
+    "HRS",
+    "Check24",
+    "Verivox",
+    "Tarifcheck",
+    "ab-in-den-urlaub.de",
+    "TUI",
+    "Weg.de",
+    "Urlaubsguru",
+    "Vodafone",
+    "Telekom",
+    "O2",
+    "1&1",
+    "congstar",
+    "Sky Deutschland",
+    "DAZN",
+    "Jochen Schweizer",
+    "mydays",
+    "Lieferando",
+    "HelloFresh",
+    "Marley Spoon",
+    "REWE Lieferservice",
+    "Picnic",
+    "Weinfreunde",
+    "Hawesko",
+    "Vinexus",
+    "Tchibo Kaffee",
+    "Jako-o",
+    "myToys",
+    "Smyths Toys",
+    "Vertbaudet",
+    "Engelhorn",
+    "SportScheck",
+    "Decathlon",
+    "Bergfreunde",
+    "Globetrotter",
+    "Rose Bikes",
+    "Fahrrad.de",
+]
+
+# Building blocks for synthetic brands once the real ones are used up.
+# fmt: off
+_BRAND_HEADS = [
+    "Berg", "Wald", "Stadt", "Nord", "Süd", "Blau", "Grün", "Sonnen", "Feld", "Fluss",
+    "Stern", "Licht", "Eichen", "Linden", "Rosen", "Adler", "Falken", "Bären", "Wolfs",
+    "Hirsch", "Alpen", "Küsten", "Heide", "Moor", "Tal", "Brücken", "Turm", "Mühlen",
+    "Quellen", "Schön",
+]
+_BRAND_TAILS = [
+    "haus", "markt", "laden", "werk", "welt", "land", "hof", "kontor", "stube", "garten",
+    "kiste", "zeit", "wert", "glück", "fabrik",
+]
+_CATEGORIES = [
+    "Mode", "Sport", "Technik", "Wein", "Möbel", "Reisen", "Tierbedarf", "Apotheke",
+    "Bücher", "Spielwaren", "Schuhe", "Kaffee", "Feinkost", "Küche", "Fahrräder",
+    "Schmuck", "Kosmetik", "Baby", "Outdoor", "Werkzeug",
+]
+_CITIES = [
+    "Hamburg", "München", "Köln", "Düsseldorf", "Stuttgart", "Leipzig", "Dresden",
+    "Nürnberg", "Bremen", "Hannover", "Münster", "Lübeck", "Würzburg", "Göttingen",
+    "Freiburg", "Augsburg", "Regensburg", "Kiel", "Rostock", "Saarbrücken",
+]
+# fmt: on
+
+_SUFFIXES = [" Shop", " Online", " Onlineshop", " Online-Shop", " GmbH", " DE", " Deutschland"]
+_TRANSLITERATION = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue"}
+
+
+@dataclass(frozen=True)
+class CorpusName:
+    """One shop name and the entity (real shop) it refers to."""
+
+    name: str
+    entity: int
+
+
+def _brand_names(rng: random.Random):
+    """Yield distinct brand names: real German shops first, then synthetic ones."""
+    seen = set()
+    for name in GERMAN_SHOP_NAMES:
+        seen.add(name.lower())
+        yield name
+    while True:
+        name = rng.choice(_BRAND_HEADS) + rng.choice(_BRAND_TAILS)
+        if rng.random() < 0.7:
+            name += " " + rng.choice(_CATEGORIES)
+        if rng.random() < 0.4:
+            name += " " + rng.choice(_CITIES)
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            yield name
+
+
+def typo(name: str, rng: random.Random) -> str:
+    """Drop, swap or insert one character."""
+    pos = rng.randrange(len(name))
+    action = rng.choice(("drop", "swap", "insert"))
+    if action == "drop" and len(name) > 3:
+        return name[:pos] + name[pos + 1 :]
+    if action == "swap" and pos < len(name) - 1:
+        return name[:pos] + name[pos + 1] + name[pos] + name[pos + 2 :]
+    return name[:pos] + rng.choice("aeinrst") + name[pos:]
+
+
+def variant(name: str, rng: random.Random) -> str:
+    """Return a scraper-style spelling of a brand name."""
+    roll = rng.random()
+    if roll < 0.2:
+        return name + rng.choice(_SUFFIXES)
+    if roll < 0.35:
+        domain = name.lower().replace(" ", "").replace("&", "")
+        return rng.choice(("www.", "https://www.", "")) + domain + rng.choice((".de", ".com"))
+    if roll < 0.5:
+        translated = "".join(_TRANSLITERATION.get(ch, ch) for ch in name)
+        return translated if translated != name else name.upper()
+    if roll < 0.6:
+        return name.replace(" ", "-") if " " in name else name.lower()
+    if roll < 0.8:
+        return typo(name, rng)
+    return name
+
+
+def build_corpus(size: int, seed: int = 42, duplicate_rate: float = 0.4) -> list[CorpusName]:
+    """Return `size` names in shuffled order.
+
+    Each entity gets one canonical spelling plus, with probability
+    `duplicate_rate` per extra name, further variants of it.
+    """
+    rng = random.Random(seed)
+    brands = _brand_names(rng)
+    corpus: list[CorpusName] = []
+    entity = 0
+    while len(corpus) < size:
+        brand = next(brands)
+        spellings = {brand}
+        corpus.append(CorpusName(brand, entity))
+        while len(corpus) < size and rng.random() < duplicate_rate:
+            spelling = variant(brand, rng)
+            if spelling not in spellings:
+                spellings.add(spelling)
+                corpus.append(CorpusName(spelling, entity))
+        entity += 1
+    rng.shuffle(corpus)
+    return corpus
+
+
+def duplicate_pairs(corpus: list[CorpusName]) -> set[frozenset[int]]:
+    """Return ground-truth duplicate pairs as frozensets of corpus indices."""
+    by_entity: dict[int, list[int]] = {}
+    for idx, item in enumerate(corpus):
+        by_entity.setdefault(item.entity, []).append(idx)
+    return {frozenset(pair) for members in by_entity.values() for pair in combinations(members, 2)}
@@ -1,7 +1,18 @@
 from .core import BonusProgram, ContributorRequest, User
 from .coupons import Coupon
 from .helpers import utcnow
-from .logs import Notification, ScheduledJob, ScheduledJobRun, ScrapeLog
+from .logs import (
+    DedupWatermark,
+    IngestMetric,
+    Notification,
+    ScheduledJob,
+    ScheduledJobRun,
+    ScrapeLog,
+    ScrapePayloadHash,
+    ScrapeRun,
+    ScrapeRunBatch,
+    ScrapeRunShop,
+)
 from .proposals import (
     Proposal,
     ProposalAuditTrail,
@@ -24,10 +35,16 @@ __all__ = [
     "ShopVariant",
     "ShopCategory",
     "Coupon",
+    "DedupWatermark",
+    "IngestMetric",
     "Notification",
     "ScheduledJob",
     "ScheduledJobRun",
     "ScrapeLog",
+    "ScrapePayloadHash",
+    "ScrapeRun",
+    "ScrapeRunBatch",
+    "ScrapeRunShop",
     "Proposal",
     "ProposalAuditTrail",
     "ProposalVote",
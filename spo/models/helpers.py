@@ -1,5 +1,53 @@
+import re
 from datetime import UTC, datetime
 
+_PROTOCOL_RE = re.compile(r"^(https?://)")
+_WWW_RE = re.compile(r"^www\.")
+_PUNCTUATION_RE = re.compile(r"[\-_/&|,:;.!?\"'()+]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_DOMAIN_NOISE = frozenset({"www", "com", "de", "net", "org", "eu"})
+_GENERIC_TOKENS = frozenset(
+    {
+        "online",
+        "onlineshop",
+        "shop",
+        "store",
+        "club",
+        "produkte",
+        "gutscheine",
+        "official",
+    }
+)
+
 
 def utcnow():
     return datetime.now(UTC)
+
+
+def normalize_shop_name(name: str | None) -> str:
+    """Normalize a shop name to improve fuzzy matching.
+
+    - Lowercase and trim
+    - Strip protocols and common domain noise (www., TLDs)
+    - Remove generic tokens like 'online', 'shop', 'store', 'club'
+    - Collapse punctuation and whitespace to single spaces
+    """
+    s = (name or "").lower().strip()
+
+    # Remove protocol prefixes
+    s = _PROTOCOL_RE.sub("", s)
+    s = _WWW_RE.sub("", s)
+
+    # If domain-like (no spaces, has dots), extract main label before TLD
+    if " " not in s and "." in s:
+        parts = [p for p in s.split(".") if p and p not in _DOMAIN_NOISE]
+        if parts:
+            s = " ".join(parts)
+
+    # Replace punctuation with spaces and collapse whitespace
+    s = _PUNCTUATION_RE.sub(" ", s)
+    s = _WHITESPACE_RE.sub(" ", s).strip()
+
+    # Remove generic tokens
+    return " ".join(t for t in s.split(" ") if t and t not in _GENERIC_TOKENS)
@@ -36,6 +36,8 @@ class ScheduledJob(db.Model):
     last_run_at = db.Column(db.DateTime, nullable=True)
     last_run_status = db.Column(db.String, nullable=True)
     last_run_message = db.Column(db.String, nullable=True)
+    # Keyword arguments passed to the job function, e.g. {"workers": 4} for deduplication
+    job_params = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, nullable=False)
     created_by_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
@@ -48,3 +50,100 @@ class ScheduledJobRun(db.Model):
     created_at = db.Column(db.DateTime, default=utcnow, nullable=False)
     status = db.Column(db.String, nullable=False)
     message = db.Column(db.String, nullable=True)
+
+
+class DedupWatermark(db.Model):
+    """High-water mark of ShopMain changes already covered by a deduplication run."""
+
+    __tablename__ = "dedup_watermarks"
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String, unique=True, nullable=False)
+    watermark = db.Column(db.DateTime, nullable=True)
+    last_full_scan_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+
+
+class ScrapePayloadHash(db.Model):
+    """Hash of the last ingested payload of a scraped shop, per (source, source_id)."""
+
+    __tablename__ = "scrape_payload_hashes"
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String, nullable=False)
+    source_id = db.Column(db.String, nullable=False)
+    payload_hash = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("source", "source_id", name="unique_scrape_payload_hash"),
+    )
+
+
+class ScrapeRun(db.Model):
+    """A scrape run posted in numbered batches (see spo.services.scrape_runs)."""
+
+    __tablename__ = "scrape_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String, unique=True, nullable=False)
+    source = db.Column(db.String, nullable=False)
+    status = db.Column(db.String, default="running", nullable=False)
+    # Only a run covering whole programs may expire the rates of shops it did not report
+    full_run = db.Column(db.Boolean, default=False, nullable=False)
+    total_batches = db.Column(db.Integer, nullable=True)
+    total_shops = db.Column(db.Integer, nullable=True)
+    rates_expired = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+
+class ScrapeRunBatch(db.Model):
+    """A batch of a scrape run that has been ingested."""
+
+    __tablename__ = "scrape_run_batches"
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String, nullable=False)
+    batch_number = db.Column(db.Integer, nullable=False)
+    shop_count = db.Column(db.Integer, nullable=False)
+    received_at = db.Column(db.DateTime, default=utcnow, nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("run_id", "batch_number", name="unique_scrape_run_batch"),
+    )
+
+
+class ScrapeRunShop(db.Model):
+    """A (shop, program) pair reported by a scrape run that is still in progress."""
+
+    __tablename__ = "scrape_run_shops"
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String, nullable=False)
+    # Rows of abandoned runs may outlive a shop or program; they go with it
+    shop_id = db.Column(db.Integer, db.ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
+    program_id = db.Column(
+        db.Integer, db.ForeignKey("bonus_programs.id", ondelete="CASCADE"), nullable=False
+    )
+    __table_args__ = (
+        db.UniqueConstraint("run_id", "shop_id", "program_id", name="unique_scrape_run_shop"),
+    )
+
+
+class IngestMetric(db.Model):
+    """Timings and counts of one scrape ingest (a posted batch or a whole run)."""
+
+    __tablename__ = "ingest_metrics"
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=utcnow, nullable=False, index=True)
+    # "batch" for one posted batch, "run" for a whole run ingested in one call
+    scope = db.Column(db.String, nullable=False)
+    source = db.Column(db.String, nullable=False)
+    run_id = db.Column(db.String, nullable=True, index=True)
+    batch_number = db.Column(db.Integer, nullable=True)
+    batches = db.Column(db.Integer, default=0, nullable=False)
+    shops = db.Column(db.Integer, default=0, nullable=False)
+    hash_hits = db.Column(db.Integer, default=0, nullable=False)
+    duplicates = db.Column(db.Integer, default=0, nullable=False)
+    rates_created = db.Column(db.Integer, default=0, nullable=False)
+    rates_expired = db.Column(db.Integer, default=0, nullable=False)
+    rates_unchanged = db.Column(db.Integer, default=0, nullable=False)
+    wall_seconds = db.Column(db.Float, default=0.0, nullable=False)
+    dedup_seconds = db.Column(db.Float, default=0.0, nullable=False)
+    rate_seconds = db.Column(db.Float, default=0.0, nullable=False)
+    statements = db.Column(db.Integer, default=0, nullable=False)
+    commits = db.Column(db.Integer, default=0, nullable=False)
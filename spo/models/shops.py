@@ -1,6 +1,8 @@
+from sqlalchemy.orm import validates
+
 from spo.extensions import db
 
-from .helpers import utcnow
+from .helpers import normalize_shop_name, utcnow
 
 
 class ShopMain(db.Model):
@@ -8,6 +10,8 @@ class ShopMain(db.Model):
     id = db.Column(db.String(36), primary_key=True)
     canonical_name = db.Column(db.String, nullable=False, index=True)
     canonical_name_lower = db.Column(db.String, nullable=False, index=True)
+    # Fuzzy-matching form of canonical_name, maintained on write (see normalize_shop_name)
+    canonical_name_normalized = db.Column(db.String, nullable=True, index=True)
     website = db.Column(db.String, nullable=True)
     logo_url = db.Column(db.String, nullable=True)
     status = db.Column(db.String, default="active", nullable=False)
@@ -17,6 +21,11 @@ class ShopMain(db.Model):
     updated_by_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     variants = db.relationship("ShopVariant", backref="main_shop", cascade="all, delete-orphan")
 
+    @validates("canonical_name")
+    def _sync_canonical_name_normalized(self, key, value):
+        self.canonical_name_normalized = normalize_shop_name(value)
+        return value
+
 
 class ShopVariant(db.Model):
     __tablename__ = "shop_variants"
@@ -24,6 +33,7 @@ class ShopVariant(db.Model):
     shop_main_id = db.Column(db.String(36), db.ForeignKey("shop_main.id"), nullable=False)
     source = db.Column(db.String, nullable=False)
     source_name = db.Column(db.String, nullable=False)
+    source_name_normalized = db.Column(db.String, nullable=True)
     source_id = db.Column(db.String, nullable=True)
     confidence_score = db.Column(db.Float, default=100.0)
     created_at = db.Column(db.DateTime, default=utcnow, nullable=False)
@@ -31,6 +41,11 @@ class ShopVariant(db.Model):
         db.UniqueConstraint("shop_main_id", "source", "source_id", name="unique_shop_variant"),
     )
 
+    @validates("source_name")
+    def _sync_source_name_normalized(self, key, value):
+        self.source_name_normalized = normalize_shop_name(value)
+        return value
+
 
 class Shop(db.Model):
     __tablename__ = "shops"
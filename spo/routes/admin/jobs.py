@@ -8,8 +8,11 @@ from flask_login import current_user, login_required
 
 from job_queue import job_queue
 from spo.extensions import db
-from spo.models import BonusProgram, ScrapeLog, Shop, ShopMain, ShopProgramRate, ShopVariant
+from spo.models import BonusProgram, ScrapeLog, Shop, ShopProgramRate
 from spo.services.dedup import run_deduplication
+from spo.services.ingest_lookups import IngestLookups
+from spo.services.ingest_metrics import ingest_metrics_summary
+from spo.services.merchant_resolver import merchant_resolver
 from spo.services.scrape_queue import (
     enqueue_coupon_import_job,
     enqueue_import_job,
@@ -27,67 +30,6 @@ from spo.services.scrapers import (
 
 
 def register_admin_jobs(app):
-    def _normalize_name(value: str) -> str:
-        return " ".join(value.strip().lower().split())
-
-    def _resolve_shop_id(merchant: str) -> int | None:
-        if not merchant:
-            return None
-        norm = _normalize_name(merchant)
-
-        main = ShopMain.query.filter(ShopMain.canonical_name_lower == norm).first()
-        if main:
-            shop = Shop.query.filter_by(shop_main_id=main.id).first()
-            if shop:
-                return shop.id
-
-        variant = ShopVariant.query.filter(ShopVariant.source_name.ilike(merchant)).first()
-        if variant:
-            shop = Shop.query.filter_by(shop_main_id=variant.shop_main_id).first()
-            if shop:
-                return shop.id
-
-        shop = Shop.query.filter(Shop.name.ilike(merchant)).first()
-        if shop:
-            return shop.id
-
-        return None
-
-    def _shop_suggestions(query: str | None, limit: int = 50) -> list[dict[str, str | int]]:
-        if not query:
-            return []
-        from sqlalchemy import or_
-
-        search = query.strip().lower()
-        qs = ShopMain.query.filter_by(status="active")
-        if search:
-            qs = qs.outerjoin(ShopVariant, ShopMain.id == ShopVariant.shop_main_id).filter(
-                or_(
-                    ShopMain.canonical_name_lower.contains(search),
-                    ShopVariant.source_name.ilike(f"%{query}%"),
-                )
-            )
-
-        shop_mains = qs.distinct().order_by(ShopMain.canonical_name).limit(limit).all()
-        results = []
-        for shop_main in shop_mains:
-            shop = Shop.query.filter_by(shop_main_id=shop_main.id).first()
-            if not shop:
-                continue
-            results.append({"id": shop.id, "name": shop_main.canonical_name})
-        return results
-
-    def _shop_name_for_id(shop_id: int | None) -> str | None:
-        if not shop_id:
-            return None
-        shop = Shop.query.filter_by(id=shop_id).first()
-        if not shop or not shop.shop_main_id:
-            return None
-        main = ShopMain.query.filter_by(id=shop.shop_main_id).first()
-        if not main:
-            return None
-        return main.canonical_name
-
     def _validate_coupon_import(payload: dict) -> dict:
         program = payload.get("program")
         coupons = payload.get("coupons")
@@ -102,6 +44,7 @@ def register_admin_jobs(app):
             program_names.add(program.strip())
 
         if isinstance(coupons, list):
+            entries = []
             for c in coupons:
                 if not isinstance(c, dict):
                     continue
@@ -110,20 +53,23 @@ def register_admin_jobs(app):
                     program_names.add(str(c.get("program")).strip())
 
                 merchant = c.get("merchant") or c.get("shop") or c.get("shop_name") or c.get("name")
-                shop_id = c.get("shop_id")
+                entries.append((c.get("shop_id"), merchant))
+            shop_ids = merchant_resolver.resolve_many(
+                str(merchant) for shop_id, merchant in entries if shop_id is None and merchant
+            )
+            for shop_id, merchant in entries:
                 if shop_id is None and merchant:
-                    shop_id = _resolve_shop_id(str(merchant))
+                    shop_id = shop_ids.get(str(merchant))
                 if shop_id is None:
                     missing_shops.append(merchant or "<unknown>")
 
         program_optional = bool(source) and not has_coupon_programs
 
-        for name in sorted({n for n in program_names if n}):
-            if program_optional and name == (program or "").strip():
-                continue
-            exists = BonusProgram.query.filter(BonusProgram.name.ilike(name)).first()
-            if not exists:
-                missing_programs.append(name)
+        checked = {n for n in program_names if n}
+        if program_optional:
+            checked.discard((program or "").strip())
+        known = IngestLookups().find_program_ids(checked)
+        missing_programs = [name for name in checked if name not in known]
 
         return {
             "program": program,
@@ -274,7 +220,11 @@ def register_admin_jobs(app):
             return jsonify({"error": "Unauthorized"}), 403
 
         # Get system user ID for attribution (use current admin user)
-        job_id = job_queue.enqueue(run_deduplication, kwargs={"system_user_id": current_user.id})
+        full_rescan = request.values.get("full_rescan", "").lower() in ("1", "true", "on")
+        job_id = job_queue.enqueue(
+            run_deduplication,
+            kwargs={"system_user_id": current_user.id, "full_rescan": full_rescan},
+        )
 
         if request.headers.get("Accept") == "application/json":
             return jsonify({"job_id": job_id, "status": "queued"})
@@ -371,26 +321,34 @@ def register_admin_jobs(app):
             return jsonify({"error": "coupons must be an array"}), 400
 
         report = _validate_coupon_import(payload)
+        coupons = [c for c in payload.get("coupons") or [] if isinstance(c, dict)]
+        merchants = [
+            c.get("merchant") or c.get("shop") or c.get("shop_name") or c.get("name") or ""
+            for c in coupons
+        ]
+        shop_ids = merchant_resolver.resolve_many(str(merchant) for merchant in merchants)
+        matched_ids = [
+            coupon.get("shop_id") or shop_ids.get(str(merchant))
+            for coupon, merchant in zip(coupons, merchants, strict=True)
+        ]
+        suggestions_by_merchant = merchant_resolver.suggestions_many(
+            {str(merchant) for merchant in merchants if merchant}
+        )
+        shop_names = merchant_resolver.shop_names(
+            {shop_id for shop_id in matched_ids if isinstance(shop_id, int)}
+        )
         rows = []
-        for idx, coupon in enumerate(payload.get("coupons") or []):
-            if not isinstance(coupon, dict):
-                continue
-            merchant = (
-                coupon.get("merchant")
-                or coupon.get("shop")
-                or coupon.get("shop_name")
-                or coupon.get("name")
-                or ""
-            )
-            matched_shop_id = coupon.get("shop_id") or _resolve_shop_id(str(merchant))
-            suggestions = _shop_suggestions(str(merchant), limit=50) if merchant else []
+        for idx, (coupon, merchant, matched_shop_id) in enumerate(
+            zip(coupons, merchants, matched_ids, strict=True)
+        ):
+            suggestions = suggestions_by_merchant.get(str(merchant), []) if merchant else []
             matched_shop_name = None
             if matched_shop_id:
                 matched_shop_name = next(
                     (s["name"] for s in suggestions if s["id"] == matched_shop_id), None
                 )
                 if not matched_shop_name:
-                    matched_shop_name = _shop_name_for_id(matched_shop_id)
+                    matched_shop_name = shop_names.get(matched_shop_id)
 
             rows.append(
                 {
@@ -523,6 +481,25 @@ def register_admin_jobs(app):
 
         return jsonify({"error": "Job not found"}), 404
 
+    @app.route("/admin/ingest_metrics", methods=["GET"])
+    @login_required
+    def ingest_metrics():
+        """Timings and counts of recent scrape ingests, plus totals per run."""
+        if current_user.role != "admin":
+            return jsonify({"error": "Unauthorized"}), 403
+
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        return jsonify(
+            ingest_metrics_summary(
+                limit=limit,
+                run_id=request.args.get("run_id") or None,
+                source=request.args.get("source") or None,
+            )
+        )
+
     @app.route("/admin/jobs", methods=["GET"])
     @login_required
     def list_jobs():
@@ -1,5 +1,7 @@
 """Admin routes for managing scheduled jobs."""
 
+import json
+
 from flask import flash, jsonify, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 
@@ -10,12 +12,34 @@ from spo.services.scheduler import (
     cancel_job_run,
     reload_scheduled_job,
     trigger_job_now,
+    unsupported_job_params,
 )
 
 
 def register_admin_scheduler(app):
     """Register admin routes for scheduler management."""
 
+    def _parse_job_params(raw: str | None) -> tuple[dict | None, str | None]:
+        """Parse the optional JSON object of job parameters from the form."""
+        if not raw or not raw.strip():
+            return None, None
+        try:
+            params = json.loads(raw)
+        except ValueError as e:
+            return None, f"Ungültige Job-Parameter (JSON): {e}"
+        if not isinstance(params, dict):
+            return None, "Job-Parameter müssen ein JSON-Objekt sein."
+        return params, None
+
+    def _check_job_params(job_type: str | None, params: dict | None) -> str | None:
+        """Reject parameters the selected job type does not accept."""
+        unsupported = unsupported_job_params(job_type or "", params)
+        if unsupported:
+            return f"Job-Typ '{job_type}' unterstützt diese Parameter nicht: " + ", ".join(
+                unsupported
+            )
+        return None
+
     @app.route("/admin/scheduled_jobs", methods=["GET"])
     @login_required
     def admin_scheduled_jobs():
@@ -34,6 +58,7 @@ def register_admin_scheduler(app):
                     "job_type": job.job_type,
                     "cron_expression": job.cron_expression,
                     "enabled": job.enabled,
+                    "job_params": job.job_params,
                     "last_run_at": (
                         job.last_run_at.strftime("%Y-%m-%d %H:%M:%S") if job.last_run_at else None
                     ),
@@ -58,6 +83,16 @@ def register_admin_scheduler(app):
             job_type = request.form.get("job_type")
             cron_expression = request.form.get("cron_expression")
             enabled = request.form.get("enabled") == "on"
+            job_params, params_error = _parse_job_params(request.form.get("job_params"))
+            params_error = params_error or _check_job_params(job_type, job_params)
+
+            if params_error:
+                flash(params_error, "error")
+                return render_template(
+                    "admin_scheduled_job_form.html",
+                    job=None,
+                    available_job_types=list(JOB_REGISTRY.keys()),
+                )
 
             if not job_name or not job_type or not cron_expression:
                 flash("Alle Pflichtfelder müssen ausgefüllt werden.", "error")
@@ -84,6 +119,7 @@ def register_admin_scheduler(app):
                 job_type=job_type,
                 cron_expression=cron_expression,
                 enabled=enabled,
+                job_params=job_params,
                 created_by_user_id=current_user.id,
             )
             db.session.add(new_job)
@@ -111,10 +147,23 @@ def register_admin_scheduler(app):
         job = ScheduledJob.query.get_or_404(job_id)
 
         if request.method == "POST":
+            job_params, params_error = _parse_job_params(request.form.get("job_params"))
+            params_error = params_error or _check_job_params(
+                request.form.get("job_type"), job_params
+            )
+            if params_error:
+                flash(params_error, "error")
+                return render_template(
+                    "admin_scheduled_job_form.html",
+                    job=job,
+                    available_job_types=list(JOB_REGISTRY.keys()),
+                )
+
             job.job_name = request.form.get("job_name")
             job.job_type = request.form.get("job_type")
             job.cron_expression = request.form.get("cron_expression")
             job.enabled = request.form.get("enabled") == "on"
+            job.job_params = job_params
 
             db.session.commit()
 
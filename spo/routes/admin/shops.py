@@ -5,6 +5,7 @@ from datetime import UTC, datetime
 from flask import flash, jsonify, redirect, request, url_for
 from flask_login import current_user, login_required
 
+from job_queue import job_queue
 from spo.extensions import db
 from spo.models import (
     BonusProgram,
@@ -13,6 +14,9 @@ from spo.models import (
     ProposalAuditTrail,
     RateComment,
     ScrapeLog,
+    ScrapeRun,
+    ScrapeRunBatch,
+    ScrapeRunShop,
     Shop,
     ShopMain,
     ShopMergeProposal,
@@ -21,7 +25,7 @@ from spo.models import (
     ShopVariant,
     User,
 )
-from spo.services.dedup import merge_shops, split_shop_variants
+from spo.services.dedup import merge_shops, rescore_variants, split_shop_variants
 from spo.services.notifications import (
     notify_merge_approved,
     notify_merge_rejected,
@@ -60,6 +64,7 @@ def register_admin_shops(app):
             if remaining == 0:
                 shop = db.session.get(Shop, shop_id)
                 if shop:
+                    ScrapeRunShop.query.filter_by(shop_id=shop_id).delete()
                     db.session.delete(shop)
                     deleted_shops += 1
         db.session.commit()
@@ -609,34 +614,17 @@ def register_admin_shops(app):
     @app.route("/admin/variants/rescore", methods=["POST"])
     @login_required
     def admin_rescore_variants():
-        """Recompute confidence scores for all ShopVariants.
+        """Start a background job recomputing confidence scores for all ShopVariants.
 
-        Uses improved fuzzy matching between `ShopVariant.source_name` and the
-        `ShopMain.canonical_name`. Admin-only.
+        Scores compare `ShopVariant.source_name` with the `ShopMain.canonical_name`
+        (see `rescore_variants`). Returns the job id to poll via /admin/job_status.
+        Admin-only.
         """
         if current_user.role != "admin":
             return jsonify({"error": "Unauthorized"}), 403
 
-        from spo.services.dedup import fuzzy_match_score
-
-        updated = 0
-        total = 0
-
-        variants = ShopVariant.query.all()
-        for v in variants:
-            total += 1
-            main = db.session.get(ShopMain, v.shop_main_id) if v.shop_main_id else None
-            if not main:
-                continue
-            new_score = fuzzy_match_score(v.source_name or "", main.canonical_name or "")
-            # Clamp to [0, 100]
-            new_score = max(0.0, min(100.0, new_score))
-            if round(v.confidence_score or 0.0, 1) != round(new_score, 1):
-                v.confidence_score = round(new_score, 1)
-                updated += 1
-        db.session.commit()
-
-        return jsonify({"success": True, "updated": updated, "total": total})
+        job_id = job_queue.enqueue(rescore_variants)
+        return jsonify({"success": True, "job_id": job_id, "status": "queued"})
 
     @app.route("/admin/shops/metadata_proposals", methods=["GET"])
     @login_required
@@ -759,6 +747,12 @@ def register_admin_shops(app):
             # 6. Delete ShopProgramRate (references Shop)
             ShopProgramRate.query.delete()
 
+            # 6b. Delete scrape run tracking (ScrapeRunShop references Shop);
+            # open runs cannot complete against the cleared shops anyway
+            ScrapeRunShop.query.delete()
+            ScrapeRunBatch.query.delete()
+            ScrapeRun.query.delete()
+
             # 7. Delete Shop entries (references ShopMain)
             Shop.query.delete()
 
@@ -1,19 +1,36 @@
 """API endpoints for browser extension and scraper workers."""
 
 import os
-from datetime import datetime, timedelta
 
 from flask import jsonify, request
 from flask_login import current_user
 from sqlalchemy import or_
 
 from spo.extensions import db
-from spo.models import BonusProgram, Coupon, ScrapeLog
+from spo.models import ScrapeLog
 from spo.models.proposals import Proposal
-from spo.models.shops import Shop, ShopMain, ShopProgramRate, ShopVariant
+from spo.models.shops import Shop, ShopMain, ShopProgramRate
 from spo.models.user_preferences import UserFavoriteProgram
-from spo.services.scrape_ingest import ingest_scrape_results
+from spo.services.async_ingest import (
+    async_ingest_enabled,
+    get_ingest_status,
+    get_run_ingest_status,
+    submit_ingest_batch,
+)
+from spo.services.coupon_import import import_coupons
+from spo.services.ingest_lookups import IngestLookups
+from spo.services.ingest_metrics import record_ingest_metrics
+from spo.services.merchant_resolver import merchant_resolver
+from spo.services.scrape_ingest import (
+    ingest_shop_batch,
+)
 from spo.services.scrape_queue import enqueue_scrape_job
+from spo.services.scrape_runs import (
+    batch_number_of,
+    complete_run_if_done,
+    get_run_summary,
+    register_run,
+)
 
 
 def register_api_routes(app):
@@ -236,44 +253,6 @@ def register_api_routes(app):
         provided = request.headers.get("X-Scraper-Token")
         return provided == expected
 
-    def _normalize_name(value: str) -> str:
-        return " ".join(value.strip().lower().split())
-
-    def _parse_date(value: str | None) -> datetime | None:
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S"):
-            try:
-                return datetime.strptime(str(value), fmt)
-            except Exception:
-                continue
-        return None
-
-    def _resolve_shop_id(merchant: str) -> int | None:
-        if not merchant:
-            return None
-        norm = _normalize_name(merchant)
-
-        main = ShopMain.query.filter(ShopMain.canonical_name_lower == norm).first()
-        if main:
-            shop = Shop.query.filter_by(shop_main_id=main.id).first()
-            if shop:
-                return shop.id
-
-        variant = ShopVariant.query.filter(ShopVariant.source_name.ilike(merchant)).first()
-        if variant:
-            shop = Shop.query.filter_by(shop_main_id=variant.shop_main_id).first()
-            if shop:
-                return shop.id
-
-        shop = Shop.query.filter(Shop.name.ilike(merchant)).first()
-        if shop:
-            return shop.id
-
-        return None
-
     @app.route("/api/scrape-jobs", methods=["POST"])
     def api_enqueue_scrape_job():
         if not _scraper_token_valid():
@@ -287,6 +266,67 @@ def register_api_routes(app):
         job_id = enqueue_scrape_job(program, requested_by="api")
         return jsonify({"job_id": job_id})
 
+    def _log_scrape_ingest(
+        label: str,
+        program: str,
+        run_id,
+        result,
+        force: bool,
+        stale_expired=None,
+        batch_number=None,
+    ) -> dict:
+        """Write the ScrapeLog entry and IngestMetric row of an ingest; return its JSON summary.
+
+        `stale_expired` is the number of stale rates expired when the ingest
+        completed a tracked run.
+        """
+        record_ingest_metrics(
+            result, scope="batch", source=program, run_id=run_id, batch_number=batch_number
+        )
+        db.session.add(
+            ScrapeLog(
+                message=(
+                    f"{label}: {program} ({result.shops} shops, run_id={run_id}, "
+                    f"rates created={result.rates_created} expired={result.rates_expired} "
+                    f"unchanged={result.rates_unchanged}, "
+                    f"hash hits={result.hash_hits} misses={result.hash_misses}"
+                    f"{', duplicate batch skipped' if result.duplicates else ''}"
+                    f"{', forced' if force else ''})"
+                )
+            )
+        )
+        if stale_expired is not None:
+            db.session.add(
+                ScrapeLog(
+                    message=(
+                        f"Scrape run completed: {program} (run_id={run_id}, "
+                        f"stale rates expired={stale_expired})"
+                    )
+                )
+            )
+        db.session.commit()
+        summary = {
+            "ingested": result.shops,
+            "run_id": run_id,
+            "program": program,
+            "rates": {
+                "created": result.rates_created,
+                "expired": result.rates_expired,
+                "unchanged": result.rates_unchanged,
+            },
+            "hash": {"hits": result.hash_hits, "misses": result.hash_misses},
+            "duplicate_batches": result.duplicates,
+            "timing": {
+                "wall_seconds": round(result.wall_seconds, 4),
+                "dedup_seconds": round(result.dedup_seconds, 4),
+                "rate_seconds": round(result.rate_seconds, 4),
+            },
+            "sql": {"statements": result.statements, "commits": result.commits},
+        }
+        if run_id:
+            summary["run"] = get_run_summary(run_id)
+        return summary
+
     @app.route("/api/scrape-results", methods=["POST"])
     def api_ingest_scrape_results():
         if not _scraper_token_valid():
@@ -302,13 +342,65 @@ def register_api_routes(app):
         if not isinstance(shops, list):
             return jsonify({"error": "shops must be a list"}), 400
 
-        ingested = ingest_scrape_results(shops, source=program)
-        db.session.add(
-            ScrapeLog(message=f"Scraper ingest: {program} ({ingested} shops, run_id={run_id})")
+        force = bool(data.get("force"))
+
+        run_async = data.get("async")
+        if run_async is None:
+            run_async = async_ingest_enabled()
+        if run_async:
+            if not all(isinstance(shop, dict) and shop.get("name") for shop in shops):
+                return jsonify({"error": "every shop needs a name"}), 400
+            status = submit_ingest_batch(
+                shops,
+                program=program,
+                run_id=run_id,
+                batch_info=data.get("batch_info"),
+                force=force,
+            )
+            return jsonify(status), 202
+
+        # Batches numbered by the worker are tracked per run: retries are
+        # skipped and stale rates are expired once the run is complete.
+        batch_info = data.get("batch_info")
+        batch_number = batch_number_of(batch_info) if run_id else None
+        if batch_number is not None:
+            register_run(run_id, program, batch_info)
+        result = ingest_shop_batch(
+            shops,
+            source=program,
+            force=force,
+            run_id=run_id if batch_number is not None else None,
+            batch_number=batch_number,
+        )
+        stale_expired = complete_run_if_done(run_id) if batch_number is not None else None
+        return jsonify(
+            _log_scrape_ingest(
+                "Scraper ingest",
+                program,
+                run_id,
+                result,
+                force,
+                stale_expired,
+                batch_number=batch_number,
+            )
         )
-        db.session.commit()
 
-        return jsonify({"ingested": ingested, "run_id": run_id, "program": program})
+    @app.route("/api/scrape-results/status/<handle>", methods=["GET"])
+    def api_scrape_ingest_status(handle):
+        """Status of an asynchronously ingested batch."""
+        if not _scraper_token_valid():
+            return jsonify({"error": "Unauthorized"}), 401
+        status = get_ingest_status(handle)
+        if status is None:
+            return jsonify({"error": "Unknown or expired handle"}), 404
+        return jsonify(status)
+
+    @app.route("/api/scrape-results/runs/<run_id>", methods=["GET"])
+    def api_scrape_ingest_run_status(run_id):
+        """Statuses of all asynchronously ingested batches of a run and of the run itself."""
+        if not _scraper_token_valid():
+            return jsonify({"error": "Unauthorized"}), 401
+        return jsonify({**get_run_ingest_status(run_id), "run": get_run_summary(run_id)})
 
     @app.route("/api/coupon-import", methods=["POST"])
     def api_import_coupons():
@@ -325,22 +417,28 @@ def register_api_routes(app):
         if not isinstance(coupons, list):
             return jsonify({"error": "coupons must be a list"}), 400
 
-        program = None
+        program_id = None
         if isinstance(program_name, str) and program_name.strip():
-            program = BonusProgram.query.filter(BonusProgram.name.ilike(program_name)).first()
-            if not program:
+            program_id = IngestLookups().find_program_ids([program_name]).get(program_name)
+            if program_id is None:
                 return jsonify({"error": f"Program not found: {program_name}"}), 400
 
-        missing_shops = []
-        resolved = []
-
+        entries = []
         for c in coupons:
             if not isinstance(c, dict):
                 continue
             merchant = c.get("merchant") or c.get("shop") or c.get("shop_name") or c.get("name")
+            entries.append((c, merchant))
+        shop_ids = merchant_resolver.resolve_many(
+            str(merchant) for c, merchant in entries if c.get("shop_id") is None and merchant
+        )
+
+        missing_shops = []
+        resolved = []
+        for c, merchant in entries:
             shop_id = c.get("shop_id")
             if shop_id is None and merchant:
-                shop_id = _resolve_shop_id(str(merchant))
+                shop_id = shop_ids.get(str(merchant))
 
             if shop_id is None:
                 missing_shops.append(merchant or "<unknown>")
@@ -354,55 +452,7 @@ def register_api_routes(app):
                 400,
             )
 
-        ingested = 0
-        for c, shop_id in resolved:
-            coupon_type = c.get("coupon_type") or "discount"
-            name = c.get("title") or c.get("name") or "Coupon"
-            description = c.get("note") or c.get("description") or c.get("discount_text") or ""
-            value = c.get("value") or c.get("discount_value") or 0
-            try:
-                value = float(value)
-            except Exception:
-                value = 0.0
-            combinable = c.get("combinable")
-
-            valid_from = _parse_date(c.get("valid_from"))
-            valid_to = _parse_date(c.get("valid_to"))
-            if not valid_from:
-                valid_from = datetime.utcnow()
-            if not valid_to:
-                valid_to = valid_from + timedelta(days=30)
-
-            existing_query = Coupon.query.filter(
-                Coupon.shop_id == shop_id,
-                Coupon.name == name,
-                Coupon.status == "active",
-            )
-            if program:
-                existing_query = existing_query.filter(Coupon.program_id == program.id)
-            else:
-                existing_query = existing_query.filter(Coupon.program_id.is_(None))
-
-            existing = existing_query.all()
-            now = datetime.utcnow()
-            for prev in existing:
-                prev.status = "inactive"
-                prev.valid_to = now
-
-            coupon = Coupon(
-                coupon_type=coupon_type,
-                name=name,
-                description=description,
-                shop_id=shop_id,
-                program_id=program.id if program else None,
-                value=value,
-                combinable=combinable,
-                valid_from=valid_from,
-                valid_to=valid_to,
-                source_url=c.get("url"),
-            )
-            db.session.add(coupon)
-            ingested += 1
+        ingested = import_coupons(resolved, program_id)
 
         program_label = program_name or "<none>"
         db.session.add(
@@ -0,0 +1,218 @@
+"""Asynchronous ingest of scrape-result batches through Redis and RQ.
+
+In async mode /api/scrape-results only validates a batch, stores the raw
+payload in Redis and enqueues `run_ingest_batch` on the ingest queue; the
+request returns 202 with a handle right away. The RQ worker (which needs
+database access, see the ingest-worker service) runs the usual batch ingest
+and records its progress under the handle, where the status endpoints read
+it. Handles of one run are listed under its run_id.
+"""
+
+import json
+import os
+import uuid
+from dataclasses import asdict
+
+from spo.models import utcnow
+from spo.services.scrape_queue import enqueue_ingest_batch
+from spo.services.scrape_queue_config import get_redis_connection
+
+KEY_PREFIX = "scrape-ingest"
+DEFAULT_STATUS_TTL = 86400
+
+_worker_app = None
+
+
+def async_ingest_enabled() -> bool:
+    return os.environ.get("SCRAPER_INGEST_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+def _ttl() -> int:
+    return int(os.environ.get("SCRAPER_INGEST_TTL", str(DEFAULT_STATUS_TTL)))
+
+
+def _payload_key(handle: str) -> str:
+    return f"{KEY_PREFIX}:payload:{handle}"
+
+
+def _status_key(handle: str) -> str:
+    return f"{KEY_PREFIX}:status:{handle}"
+
+
+def _run_key(run_id: str) -> str:
+    return f"{KEY_PREFIX}:run:{run_id}"
+
+
+def _write_status(redis_conn, handle: str, status: dict) -> None:
+    redis_conn.setex(_status_key(handle), _ttl(), json.dumps(status))
+
+
+def submit_ingest_batch(
+    shops: list[dict],
+    *,
+    program: str,
+    run_id: str | None = None,
+    batch_info: dict | None = None,
+    force: bool = False,
+) -> dict:
+    """Store a validated batch in Redis, enqueue its ingest and return its status."""
+    redis_conn = get_redis_connection()
+    handle = str(uuid.uuid4())
+    status = {
+        "handle": handle,
+        "status": "queued",
+        "program": program,
+        "run_id": run_id,
+        "batch_number": (batch_info or {}).get("batch_number"),
+        "shops": len(shops),
+        "force": force,
+        "queued_at": utcnow().isoformat(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "stale_rates_expired": None,
+        "error": None,
+    }
+    payload = {
+        "program": program,
+        "run_id": run_id,
+        "batch_info": batch_info,
+        "force": force,
+        "shops": shops,
+    }
+    redis_conn.setex(_payload_key(handle), _ttl(), json.dumps(payload))
+    _write_status(redis_conn, handle, status)
+    if run_id:
+        redis_conn.rpush(_run_key(run_id), handle)
+        redis_conn.expire(_run_key(run_id), _ttl())
+
+    # The RQ job id is the handle, so the status is complete before the job can start
+    enqueue_ingest_batch(handle)
+    return status
+
+
+def get_ingest_status(handle: str) -> dict | None:
+    raw = get_redis_connection().get(_status_key(handle))
+    return json.loads(raw) if raw else None
+
+
+def get_run_ingest_status(run_id: str) -> dict:
+    """Return the batch statuses of a run plus totals over all of them."""
+    redis_conn = get_redis_connection()
+    batches = []
+    for handle in redis_conn.lrange(_run_key(run_id), 0, -1):
+        if isinstance(handle, bytes):
+            handle = handle.decode()
+        raw = redis_conn.get(_status_key(handle))
+        if raw:
+            batches.append(json.loads(raw))
+    states = [batch["status"] for batch in batches]
+    return {
+        "run_id": run_id,
+        "batches": batches,
+        "counts": {state: states.count(state) for state in sorted(set(states))},
+        "shops_ingested": sum(batch["result"]["shops"] for batch in batches if batch.get("result")),
+    }
+
+
+def process_ingest_batch(handle: str) -> dict:
+    """Ingest a stored batch; must run inside an application context."""
+    from spo.extensions import db
+    from spo.models import ScrapeLog
+    from spo.services.ingest_metrics import record_ingest_metrics
+    from spo.services.scrape_ingest import ingest_shop_batch
+    from spo.services.scrape_runs import batch_number_of, complete_run_if_done, register_run
+
+    redis_conn = get_redis_connection()
+    status = get_ingest_status(handle) or {"handle": handle}
+    raw = redis_conn.get(_payload_key(handle))
+    if not raw:
+        status.update(status="failed", error="Payload expired or not found")
+        status["finished_at"] = utcnow().isoformat()
+        _write_status(redis_conn, handle, status)
+        return status
+
+    payload = json.loads(raw)
+    status.update(status="running", started_at=utcnow().isoformat())
+    _write_status(redis_conn, handle, status)
+
+    run_id = payload.get("run_id")
+    batch_number = batch_number_of(payload.get("batch_info")) if run_id else None
+    stale_expired = None
+    try:
+        if batch_number is not None:
+            register_run(run_id, payload["program"], payload.get("batch_info"))
+        result = ingest_shop_batch(
+            payload["shops"],
+            source=payload["program"],
+            force=payload.get("force", False),
+            run_id=run_id if batch_number is not None else None,
+            batch_number=batch_number,
+        )
+        if batch_number is not None:
+            stale_expired = complete_run_if_done(run_id)
+    except Exception as e:
+        db.session.rollback()
+        status.update(status="failed", error=str(e), finished_at=utcnow().isoformat())
+        _write_status(redis_conn, handle, status)
+        db.session.add(
+            ScrapeLog(
+                message=(
+                    f"Async scraper ingest failed: {payload['program']} "
+                    f"(run_id={payload.get('run_id')}, handle={handle}): {e}"
+                )
+            )
+        )
+        db.session.commit()
+        raise
+
+    db.session.add(
+        ScrapeLog(
+            message=(
+                f"Async scraper ingest: {payload['program']} ({result.shops} shops, "
+                f"run_id={payload.get('run_id')}, handle={handle}, "
+                f"rates created={result.rates_created} expired={result.rates_expired} "
+                f"unchanged={result.rates_unchanged}, "
+                f"hash hits={result.hash_hits} misses={result.hash_misses}"
+                f"{', duplicate batch skipped' if result.duplicates else ''})"
+            )
+        )
+    )
+    record_ingest_metrics(
+        result,
+        scope="batch",
+        source=payload["program"],
+        run_id=run_id,
+        batch_number=batch_number,
+    )
+    if stale_expired is not None:
+        db.session.add(
+            ScrapeLog(
+                message=(
+                    f"Scrape run completed: {payload['program']} (run_id={run_id}, "
+                    f"stale rates expired={stale_expired})"
+                )
+            )
+        )
+    db.session.commit()
+
+    status.update(
+        status="completed",
+        finished_at=utcnow().isoformat(),
+        result=asdict(result),
+        stale_rates_expired=stale_expired,
+    )
+    _write_status(redis_conn, handle, status)
+    redis_conn.delete(_payload_key(handle))
+    return status
+
+
+def run_ingest_batch(handle: str) -> dict:
+    """RQ entry point: ingest a stored batch inside an application context."""
+    global _worker_app
+    if _worker_app is None:
+        from spo import create_app
+
+        _worker_app = create_app(start_jobs=False, run_seed=False)
+    with _worker_app.app_context():
+        return process_ingest_batch(handle)
@@ -0,0 +1,93 @@
+"""Bulk import of coupon batches posted to /api/coupon-import.
+
+Merchants of a batch are resolved to shops in one pass (see
+spo.services.merchant_resolver), the active coupons a batch supersedes are
+deactivated with one UPDATE and the new coupons are written with one bulk
+INSERT, instead of several queries per coupon.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, tuple_, update
+
+from spo.extensions import db
+from spo.models import Coupon
+
+
+def _parse_date(value) -> datetime | None:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(str(value), fmt)
+        except Exception:
+            continue
+    return None
+
+
+def _coupon_row(c: dict, shop_id: int, program_id: int | None) -> dict:
+    value = c.get("value") or c.get("discount_value") or 0
+    try:
+        value = float(value)
+    except Exception:
+        value = 0.0
+
+    valid_from = _parse_date(c.get("valid_from"))
+    valid_to = _parse_date(c.get("valid_to"))
+    if not valid_from:
+        valid_from = datetime.utcnow()
+    if not valid_to:
+        valid_to = valid_from + timedelta(days=30)
+
+    return {
+        "coupon_type": c.get("coupon_type") or "discount",
+        "name": c.get("title") or c.get("name") or "Coupon",
+        "description": c.get("note") or c.get("description") or c.get("discount_text") or "",
+        "shop_id": shop_id,
+        "program_id": program_id,
+        "value": value,
+        "combinable": c.get("combinable"),
+        "valid_from": valid_from,
+        "valid_to": valid_to,
+        "status": "active",
+        "source_url": c.get("url"),
+    }
+
+
+def import_coupons(resolved: list[tuple[dict, int]], program_id: int | None) -> int:
+    """Write (coupon payload, shop_id) pairs; returns the number of coupons inserted.
+
+    An imported coupon supersedes the active coupon with the same shop, name
+    and program. Within one batch the last coupon of a (shop, name) pair is
+    the active one; earlier ones are stored as already superseded. Does not
+    commit.
+    """
+    rows = [_coupon_row(c, shop_id, program_id) for c, shop_id in resolved]
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+
+    keys = {(row["shop_id"], row["name"]) for row in rows}
+    program_match = (
+        Coupon.program_id == program_id if program_id is not None else Coupon.program_id.is_(None)
+    )
+    db.session.execute(
+        update(Coupon)
+        .where(
+            Coupon.status == "active",
+            program_match,
+            tuple_(Coupon.shop_id, Coupon.name).in_(keys),
+        )
+        .values(status="inactive", valid_to=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    last_index = {(row["shop_id"], row["name"]): idx for idx, row in enumerate(rows)}
+    for idx, row in enumerate(rows):
+        if last_index[(row["shop_id"], row["name"])] != idx:
+            row.update(status="inactive", valid_to=now)
+        row["created_at"] = now
+    db.session.execute(insert(Coupon), rows)
+    return len(rows)
@@ -1,61 +1,54 @@
 """Shop deduplication and similarity scoring utilities."""
 
-import re
+import math
+import os
+import threading
 import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import UTC, datetime
 from difflib import SequenceMatcher
+from multiprocessing import get_context
+
+from sqlalchemy import Boolean, case, event, func, or_, select, text, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.sql.functions import FunctionElement
 
 from spo.extensions import db
 from spo.models import ShopMain, ShopVariant
+from spo.models.helpers import normalize_shop_name
 
 
 def _normalize_shop_name(name: str) -> str:
-    """Normalize a shop name to improve fuzzy matching.
+    """Normalize a shop name to improve fuzzy matching (see `normalize_shop_name`)."""
+    return normalize_shop_name(name)
+
 
-    - Lowercase and trim
-    - Strip protocols and common domain noise (www., TLDs)
-    - Remove generic tokens like 'online', 'shop', 'store', 'club'
-    - Collapse punctuation and whitespace to single spaces
+def fuzzy_match_score(str1: str, str2: str, score_cutoff: float | None = None) -> float:
+    """Calculate similarity score between two strings (0-100).
+
+    With `score_cutoff`, scores below the cutoff are reported as 0.0 (see
+    `fuzzy_match_normalized`).
     """
-    s = name.lower().strip()
-
-    # Remove protocol prefixes
-    s = re.sub(r"^(https?://)", "", s)
-    s = re.sub(r"^www\.", "", s)
-
-    # If domain-like (no spaces, has dots), extract main label before TLD
-    if " " not in s and "." in s:
-        parts = s.split(".")
-        # Drop leading 'www' and trailing TLDs
-        parts = [p for p in parts if p and p not in {"www", "com", "de", "net", "org", "eu"}]
-        if parts:
-            s = " ".join(parts)
-
-    # Replace punctuation with spaces
-    s = re.sub(r"[\-_/&|,:;.!?\"'()+]", " ", s)
-    # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
-
-    # Remove generic tokens
-    stop = {
-        "online",
-        "onlineshop",
-        "shop",
-        "store",
-        "club",
-        "produkte",
-        "gutscheine",
-        "official",
-    }
-    tokens = [t for t in s.split(" ") if t and t not in stop]
-    return " ".join(tokens)
+    return fuzzy_match_normalized(
+        _normalize_shop_name(str1), _normalize_shop_name(str2), score_cutoff
+    )
+
 
+def fuzzy_match_normalized(s1: str, s2: str, score_cutoff: float | None = None) -> float:
+    """Calculate similarity score (0-100) between two already normalized names.
 
-def fuzzy_match_score(str1: str, str2: str) -> float:
-    """Calculate similarity score between two strings (0-100)."""
-    s1 = _normalize_shop_name(str1)
-    s2 = _normalize_shop_name(str2)
+    Use this in hot loops with stored `canonical_name_normalized` /
+    `source_name_normalized` values to skip the normalization pipeline.
 
+    When the caller only cares whether a pair reaches `score_cutoff`, pass it:
+    pairs that provably score lower are rejected from length and
+    `real_quick_ratio` / `quick_ratio` upper bounds without running the full
+    `SequenceMatcher.ratio()`, and return 0.0. Scores at or above the cutoff
+    are exact.
+    """
     if not s1 or not s2:
         return 0.0
 
@@ -68,24 +61,529 @@ def fuzzy_match_score(str1: str, str2: str) -> float:
     tokens2 = set(s2.split())
     common_tokens = tokens1 & tokens2
     if (s1 in s2 or s2 in s1) and len(common_tokens) >= 2:
-        return 98.0
+        return 98.0 if score_cutoff is None or score_cutoff <= 98.0 else 0.0
+
+    if score_cutoff is None:
+        ratio = SequenceMatcher(None, s1, s2).ratio()
+        return round(ratio * 100, 1)
 
-    ratio = SequenceMatcher(None, s1, s2).ratio()
-    return round(ratio * 100, 1)
+    # Upper bounds from cheapest to most expensive; rounding is monotonic, so a
+    # bound that rounds below the cutoff rules the pair out.
+    length_bound = 2 * min(len(s1), len(s2)) / (len(s1) + len(s2))
+    if round(length_bound * 100, 1) < score_cutoff:
+        return 0.0
+    matcher = SequenceMatcher(None, s1, s2)
+    if round(matcher.real_quick_ratio() * 100, 1) < score_cutoff:
+        return 0.0
+    if round(matcher.quick_ratio() * 100, 1) < score_cutoff:
+        return 0.0
+    score = round(matcher.ratio() * 100, 1)
+    return score if score >= score_cutoff else 0.0
 
 
-def find_shop_by_similarity(shop_name: str, threshold: float = 98.0) -> tuple:
-    """Find existing ShopMain candidates by similarity score."""
-    all_shops = ShopMain.query.all()
+def stored_normalized_name(stored: str | None, raw: str | None) -> str:
+    """Return a stored normalized name, normalizing `raw` for rows not yet backfilled."""
+    return stored if stored is not None else _normalize_shop_name(raw or "")
+
+
+# Character n-gram size used by the candidate-blocking index.
+_NGRAM_SIZE = 3
+
+
+def _name_ngrams(normalized: str) -> set[str]:
+    """Return the set of character n-grams of a normalized shop name."""
+    q = _NGRAM_SIZE
+    return {normalized[i : i + q] for i in range(len(normalized) - q + 1)}
+
+
+def _max_indel_distance(length: int, min_ratio: float) -> int:
+    """Upper bound on insert/delete edits between a name of `length` chars and any
+    partner whose SequenceMatcher ratio can still reach `min_ratio`.
+
+    A ratio of ``2M / (l1 + l2)`` leaves at most ``(1 - r) * (l1 + l2)`` unmatched
+    characters, and the partner can be at most that many characters longer.
+    """
+    return math.floor(2 * length * (1 - min_ratio) / min_ratio)
+
+
+def _pairs_within(members: list[int], probes: set[int] | None) -> set[tuple[int, int]]:
+    """Return all index pairs of a block, or only those touching `probes` if given."""
+    if probes is None:
+        return {
+            (a, b) if a < b else (b, a)
+            for a_pos, a in enumerate(members)
+            for b in members[a_pos + 1 :]
+        }
+    return {(a, b) if a < b else (b, a) for a in members if a in probes for b in members if b != a}
+
+
+def _prefix_pairs(
+    sets: dict[int, list[str]], prefix_len: dict[int, int], probes: set[int] | None = None
+) -> set[tuple[int, int]]:
+    """Collect index pairs whose ordered feature prefixes share at least one feature."""
+    postings: dict[str, list[int]] = defaultdict(list)
+    for idx, features in sets.items():
+        for feature in features[: prefix_len[idx]]:
+            postings[feature].append(idx)
+
+    pairs: set[tuple[int, int]] = set()
+    for members in postings.values():
+        pairs |= _pairs_within(members, probes)
+    return pairs
+
+
+def _candidate_pairs(
+    names: list[str], threshold: float, probes: set[int] | None = None
+) -> list[tuple[int, int]]:
+    """Return index pairs of normalized names that can possibly score >= threshold.
+
+    The result is a superset of the pairs `fuzzy_match_score` accepts, built from
+    three blocking layers that mirror its three scoring branches:
+
+    - compact-key buckets: names equal once spaces are removed (score 100)
+    - substring pairs sharing at least two tokens (score 98), looked up through
+      the rarest n-gram of the shorter name
+    - character n-gram blocks: prefix-filtered n-gram overlap with a per-name
+      lower bound derived from the SequenceMatcher ratio needed for `threshold`
+
+    Names too short for the n-gram bound to hold are compared with every other
+    name, so the candidate set never drops a real duplicate. Pairs are returned
+    in ascending ``(i, j)`` order like the all-pairs scan.
+
+    With `probes`, only pairs involving at least one of those indices are
+    returned (incremental runs compare changed names against all others).
+    """
+    n = len(names)
+    if threshold <= 0:
+        return sorted(_pairs_within(list(range(n)), probes))
+
+    active = [i for i, name in enumerate(names) if name]
+    if probes is not None:
+        probes = {i for i in probes if names[i]}
+    pairs: set[tuple[int, int]] = set()
+
+    # 1) Exact compact-key buckets
+    buckets: dict[str, list[int]] = defaultdict(list)
+    for i in active:
+        buckets[names[i].replace(" ", "")].append(i)
+    for members in buckets.values():
+        pairs |= _pairs_within(members, probes)
+
+    q = _NGRAM_SIZE
+    gram_sets = {i: _name_ngrams(names[i]) for i in active}
+    gram_freq = Counter(g for grams in gram_sets.values() for g in grams)
+
+    # 2) Substring pairs for the ">= 2 common tokens and substring" rule. A name
+    # containing a shorter one contains all its n-grams, so only names holding the
+    # shorter name's rarest n-grams need the (cheap) substring and token checks.
+    if threshold <= 98.0:
+        gram_postings: dict[str, set[int]] = defaultdict(set)
+        for i in active:
+            for gram in gram_sets[i]:
+                gram_postings[gram].add(i)
+        token_sets = {i: set(names[i].split()) for i in active}
+        for i in active:
+            if len(token_sets[i]) < 2 or not gram_sets[i]:
+                continue
+            rarest = sorted(gram_sets[i], key=lambda g: (gram_freq[g], g))[:3]
+            containing = set.intersection(*(gram_postings[g] for g in rarest))
+            for j in containing:
+                if (
+                    j != i
+                    and (probes is None or i in probes or j in probes)
+                    and names[i] in names[j]
+                    and len(token_sets[i] & token_sets[j]) >= 2
+                ):
+                    pairs.add((i, j) if i < j else (j, i))
+
+    # 3) Character n-gram blocks for the SequenceMatcher ratio
+    # Scores are rounded to one decimal, so allow a small margin below the threshold.
+    min_ratio = (threshold - 0.1) / 100
+    if min_ratio <= 0:
+        return sorted(_pairs_within(active, probes))
+
+    max_dist: dict[int, int] = {}
+    ordered_grams: dict[int, list[str]] = {}
+    prefix_len: dict[int, int] = {}
+    unbounded: list[int] = []
+    for i in active:
+        max_dist[i] = _max_indel_distance(len(names[i]), min_ratio)
+        # Every indel destroys at most q n-grams of a name, so a qualifying partner
+        # shares at least this many of its distinct n-grams.
+        min_overlap = len(gram_sets[i]) - q * max_dist[i]
+        if min_overlap < 1:
+            unbounded.append(i)
+            continue
+        ordered_grams[i] = sorted(gram_sets[i], key=lambda g: (gram_freq[g], g))
+        prefix_len[i] = len(gram_sets[i]) - min_overlap + 1
+
+    for a, b in _prefix_pairs(ordered_grams, prefix_len, probes):
+        if abs(len(names[a]) - len(names[b])) <= min(max_dist[a], max_dist[b]):
+            pairs.add((a, b))
+
+    for a in unbounded:
+        partners = active if probes is None or a in probes else probes
+        for b in partners:
+            if a != b:
+                pairs.add((a, b) if a < b else (b, a))
+
+    return sorted(pairs)
+
+
+class ShopNameIndex:
+    """Process-level in-memory index of ShopMain names for similarity lookups.
+
+    Names are stored in normalized form with compact-key, token and character
+    n-gram postings, so a lookup only scores names that share features with the
+    query instead of the whole `shop_main` table. The index is kept in sync by
+    session events (creates, renames and deletes of ShopMain rows) and is rebuilt
+    whenever the row count or latest `updated_at` in the database no longer
+    matches, e.g. after writes from another process.
+    """
+
+    # Number of best-overlapping names scored besides the guaranteed candidates
+    CANDIDATE_LIMIT = 64
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signature: tuple | None = None
+        self._next_seq = 0
+        self._entries: dict[str, tuple[int, str]] = {}
+        self._compact: dict[str, set[str]] = defaultdict(set)
+        self._tokens: dict[str, set[str]] = defaultdict(set)
+        self._grams: dict[str, set[str]] = defaultdict(set)
+
+    def invalidate(self) -> None:
+        """Drop all entries; the next lookup reloads them from the database."""
+        with self._lock:
+            self._loaded = False
+            self._signature = None
+            self._entries.clear()
+            self._compact.clear()
+            self._tokens.clear()
+            self._grams.clear()
+
+    def _current_signature(self) -> tuple:
+        count, last_update = db.session.query(
+            func.count(ShopMain.id), func.max(ShopMain.updated_at)
+        ).one()
+        return count, last_update
+
+    def _ensure_fresh(self) -> None:
+        signature = self._current_signature()
+        if self._loaded and self._signature is None:
+            # Local changes were applied incrementally; adopt the new signature.
+            self._signature = signature
+        if not self._loaded or signature != self._signature:
+            self.rebuild(signature)
+
+    def rebuild(self, signature: tuple | None = None) -> None:
+        """Load all ShopMain names from the database."""
+        with self._lock:
+            self.invalidate()
+            rows = (
+                db.session.query(
+                    ShopMain.id, ShopMain.canonical_name, ShopMain.canonical_name_normalized
+                )
+                .order_by(ShopMain.created_at, ShopMain.id)
+                .all()
+            )
+            for shop_id, name, normalized in rows:
+                self._add(shop_id, stored_normalized_name(normalized, name))
+            self._signature = signature or self._current_signature()
+            self._loaded = True
+
+    def _add(self, shop_id: str, normalized: str) -> None:
+        self._entries[shop_id] = (self._next_seq, normalized)
+        self._next_seq += 1
+        if not normalized:
+            return
+        self._compact[normalized.replace(" ", "")].add(shop_id)
+        for token in set(normalized.split()):
+            self._tokens[token].add(shop_id)
+        for gram in _name_ngrams(normalized):
+            self._grams[gram].add(shop_id)
+
+    def _remove(self, shop_id: str) -> None:
+        entry = self._entries.pop(shop_id, None)
+        if not entry or not entry[1]:
+            return
+        normalized = entry[1]
+        self._compact[normalized.replace(" ", "")].discard(shop_id)
+        for token in set(normalized.split()):
+            self._tokens[token].discard(shop_id)
+        for gram in _name_ngrams(normalized):
+            self._grams[gram].discard(shop_id)
+
+    def upsert(self, shop_id: str, normalized: str) -> None:
+        """Add a ShopMain or refresh its name, keeping its original position."""
+        with self._lock:
+            if not self._loaded:
+                return
+            previous = self._entries.get(shop_id)
+            self._remove(shop_id)
+            self._add(shop_id, normalized)
+            if previous:
+                self._entries[shop_id] = (previous[0], normalized)
+
+    def remove(self, shop_id: str) -> None:
+        with self._lock:
+            if self._loaded:
+                self._remove(shop_id)
+
+    def note_local_change(self) -> None:
+        """Accept the database signature on the next lookup instead of rebuilding."""
+        with self._lock:
+            self._signature = None
+
+    def best_match(self, shop_name: str) -> tuple[str | None, float]:
+        """Return (shop_main_id, score) of the best scoring ShopMain for a name.
+
+        The result equals a scan of all names in creation order (the first name
+        with the highest score wins). Names sharing the most tokens or character
+        n-grams with the query are scored first; their best score then bounds
+        which other names can still reach it, and only those are scanned.
+        """
+        normalized = _normalize_shop_name(shop_name)
+        with self._lock:
+            self._ensure_fresh()
+            if not normalized:
+                return None, 0.0
+
+            exact = self._compact.get(normalized.replace(" ", ""))
+            if exact:
+                return min(exact, key=lambda sid: self._entries[sid][0]), 100.0
+
+            token_overlap: Counter = Counter()
+            for token in set(normalized.split()):
+                token_overlap.update(self._tokens.get(token, ()))
+            grams = _name_ngrams(normalized)
+            gram_overlap: Counter = Counter()
+            for gram in grams:
+                gram_overlap.update(self._grams.get(gram, ()))
+            overlap = token_overlap + gram_overlap
+
+            candidates = {sid for sid, _ in overlap.most_common(self.CANDIDATE_LIMIT)}
+            # Substring matches sharing two tokens score 98.0 whatever their ratio
+            candidates |= {sid for sid, count in token_overlap.items() if count >= 2}
+            candidates |= self._reachable(normalized, grams, gram_overlap, 97.9)
+            _, floor = self._scan(normalized, candidates, 0.0)
+
+            # Any name scoring at least `floor` shares enough n-grams with the query
+            if floor < 98.0:
+                candidates |= self._reachable(normalized, grams, gram_overlap, floor - 0.05)
+            return self._scan(normalized, candidates, floor)
+
+    def _reachable(
+        self, normalized: str, grams: set[str], gram_overlap: Counter, min_score: float
+    ) -> set[str]:
+        """Ids of all names whose score can reach `min_score` (a superset)."""
+        min_ratio = min_score / 100
+        if min_ratio <= 0:
+            return set(self._entries)
+        min_overlap = len(grams) - _NGRAM_SIZE * _max_indel_distance(len(normalized), min_ratio)
+        if min_overlap <= 0:
+            return set(self._entries)
+        return {sid for sid, count in gram_overlap.items() if count >= min_overlap}
+
+    def _scan(self, normalized: str, ids: set[str], floor: float) -> tuple[str | None, float]:
+        """Best (id, score) among `ids` in creation order, ignoring scores below `floor`."""
+        best_id = None
+        best_score = 0.0
+        for sid in sorted(ids, key=lambda sid: self._entries[sid][0]):
+            # Scores have one decimal; only a strictly better one can replace the best
+            cutoff = max(floor, best_score + 0.05) if best_id else max(floor, 0.05)
+            score = fuzzy_match_normalized(normalized, self._entries[sid][1], score_cutoff=cutoff)
+            if score > best_score:
+                best_score = score
+                best_id = sid
+        return best_id, best_score
+
+
+shop_name_index = ShopNameIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_shop_name_index(session, flush_context):
+    """Apply ShopMain inserts, renames and deletes to the process-level name index."""
+    changed = False
+    for obj in session.new:
+        if isinstance(obj, ShopMain):
+            shop_name_index.upsert(
+                obj.id, stored_normalized_name(obj.canonical_name_normalized, obj.canonical_name)
+            )
+            changed = True
+    for obj in session.dirty:
+        if isinstance(obj, ShopMain):
+            if attributes.get_history(obj, "canonical_name").has_changes():
+                shop_name_index.upsert(
+                    obj.id,
+                    stored_normalized_name(obj.canonical_name_normalized, obj.canonical_name),
+                )
+            changed = True
+    for obj in session.deleted:
+        if isinstance(obj, ShopMain):
+            shop_name_index.remove(obj.id)
+            changed = True
+    if changed:
+        shop_name_index.note_local_change()
+        session.info["shop_name_index_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_shop_name_index(session):
+    session.info.pop("shop_name_index_dirty", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _rollback_shop_name_index(session):
+    # Flushed changes that never got committed may be in the index; reload it.
+    if session.info.pop("shop_name_index_dirty", None):
+        shop_name_index.invalidate()
+
 
-    best_match = None
-    best_score = 0.0
+# Trigram candidates fetched per index when matching through pg_trgm.
+TRIGRAM_CANDIDATE_LIMIT = 64
 
-    for shop in all_shops:
-        score = fuzzy_match_score(shop_name, shop.canonical_name)
+_pg_trgm_state: dict[str, bool] = {}
+
+
+def pg_trgm_available() -> bool:
+    """Return True when similarity lookups can use Postgres pg_trgm indexes.
+
+    `DEDUP_BACKEND=python` forces the in-process index; any other database than
+    Postgres (e.g. SQLite in tests) always uses it.
+    """
+    if os.environ.get("DEDUP_BACKEND", "auto").lower() == "python":
+        return False
+    engine = db.engine
+    if engine.dialect.name != "postgresql":
+        return False
+    key = str(engine.url)
+    if key not in _pg_trgm_state:
+        installed = db.session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+        _pg_trgm_state[key] = bool(installed)
+    return _pg_trgm_state[key]
+
+
+class trigram_match(FunctionElement):
+    """`left % right`: pg_trgm similarity at or above pg_trgm.similarity_threshold.
+
+    Other dialects compile it to `similarity(left, right) >= 0.3` (the pg_trgm
+    default threshold), so the candidate query also runs where a `similarity`
+    function is registered, e.g. on SQLite in tests.
+    """
+
+    type = Boolean()
+    name = "trigram_match"
+    inherit_cache = True
+
+
+@compiles(trigram_match)
+def _compile_trigram_match(element, compiler, **kw):
+    left, right = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(similarity({left}, {right}) >= 0.3)"
+
+
+@compiles(trigram_match, "postgresql")
+def _compile_trigram_match_pg(element, compiler, **kw):
+    left, right = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"({left} % {right})"
+
+
+def _contained_names(normalized: str) -> set[str]:
+    """Substrings of a normalized name sharing at least two tokens with it.
+
+    A stored name that is one of these, or that contains the name, can score
+    98.0 through the substring rule of `fuzzy_match_normalized`.
+    """
+    tokens = set(normalized.split())
+    if len(tokens) < 2:
+        return set()
+    return {
+        part
+        for i in range(len(normalized))
+        for j in range(i + 1, len(normalized) + 1)
+        if (part := normalized[i:j]) == part.strip() and len(set(part.split()) & tokens) >= 2
+    }
+
+
+def _trigram_best_match(shop_name: str) -> tuple[str | None, float]:
+    """Return (shop_main_id, score) using pg_trgm to pre-select candidates.
+
+    Candidates are ShopMains whose normalized name, or one of whose variants'
+    normalized names, is trigram-similar (`%`) to the normalized query, plus the
+    names `fuzzy_match_normalized` scores 100 or 98 without comparing
+    characters: equal once spaces are removed, or substrings either way that
+    share two tokens. Every name those rules merge is therefore found, as by a
+    full scan; names that reach 98 through their character ratio differ from
+    the query by a few characters and are among the most trigram-similar.
+    Lower scores are the best among the candidates.
+    """
+    normalized = _normalize_shop_name(shop_name)
+    if not normalized:
+        return None, 0.0
+
+    main_name = ShopMain.canonical_name_normalized
+    main_hits = (
+        select(ShopMain.id)
+        .where(trigram_match(main_name, normalized))
+        .order_by(func.similarity(main_name, normalized).desc())
+        .limit(TRIGRAM_CANDIDATE_LIMIT)
+    )
+    variant_name = ShopVariant.source_name_normalized
+    variant_hits = (
+        select(ShopVariant.shop_main_id)
+        .where(trigram_match(variant_name, normalized))
+        .order_by(func.similarity(variant_name, normalized).desc())
+        .limit(TRIGRAM_CANDIDATE_LIMIT)
+    )
+    conditions = [
+        func.replace(main_name, " ", "") == normalized.replace(" ", ""),
+        ShopMain.id.in_(main_hits),
+        ShopMain.id.in_(variant_hits),
+    ]
+    contained = _contained_names(normalized)
+    if contained:
+        conditions.append(main_name.in_(contained))
+        conditions.append(main_name.contains(normalized, autoescape=True))
+    rows = db.session.execute(
+        select(ShopMain.id, ShopMain.canonical_name, main_name)
+        .where(or_(*conditions))
+        .order_by(ShopMain.created_at, ShopMain.id)
+    ).all()
+
+    best_id, best_score = None, 0.0
+    for shop_id, name, stored in rows:
+        score = fuzzy_match_normalized(
+            normalized, stored_normalized_name(stored, name), score_cutoff=best_score + 0.05
+        )
         if score > best_score:
-            best_score = score
-            best_match = shop
+            best_id, best_score = shop_id, score
+            if score == 100.0:
+                break
+    return best_id, best_score
+
+
+def find_shop_by_similarity(shop_name: str, threshold: float = 98.0) -> tuple:
+    """Find existing ShopMain candidates by similarity score."""
+    if pg_trgm_available():
+        best_id, best_score = _trigram_best_match(shop_name)
+        best_match = db.session.get(ShopMain, best_id) if best_id else None
+        if best_score >= threshold:
+            return best_match, best_score
+        return None, best_score
+
+    best_id, best_score = shop_name_index.best_match(shop_name)
+    best_match = db.session.get(ShopMain, best_id) if best_id else None
+    if best_id and best_match is None:
+        # Index referenced a row that no longer exists; reload and retry once.
+        shop_name_index.invalidate()
+        best_id, best_score = shop_name_index.best_match(shop_name)
+        best_match = db.session.get(ShopMain, best_id) if best_id else None
 
     if best_score >= threshold:
         return best_match, best_score
@@ -205,85 +703,355 @@ def merge_shops(main_from_id: str, main_to_id: str, user_id: int):
     db.session.commit()
 
 
-def find_duplicate_shops(threshold: float = 98.0) -> list[tuple]:
+# DedupWatermark scope tracking which ShopMain changes have been deduplicated.
+DEDUP_WATERMARK_SCOPE = "shop_main"
+
+# Candidate pairs per process-pool task, and the smallest workload worth a pool.
+DEDUP_CHUNK_SIZE = 20000
+DEDUP_PARALLEL_MIN_PAIRS = 50000
+
+
+def dedup_worker_count(workers: int | None = None) -> int:
+    """Resolve the number of scoring processes (`DEDUP_WORKERS` env var, default 1)."""
+    if workers is None:
+        workers = int(os.environ.get("DEDUP_WORKERS", "1"))
+    return max(1, min(int(workers), os.cpu_count() or 1))
+
+
+def _score_pair_chunk(
+    names: dict[int, str], pairs: list[tuple[int, int]], threshold: float
+) -> list[tuple[int, int, float]]:
+    """Score one chunk of candidate pairs; runs inside a worker process."""
+    matches = []
+    for i, j in pairs:
+        score = fuzzy_match_normalized(names[i], names[j], score_cutoff=threshold)
+        if score >= threshold:
+            matches.append((i, j, score))
+    return matches
+
+
+def _score_candidate_pairs(
+    names: list[str],
+    pairs: list[tuple[int, int]],
+    threshold: float,
+    workers: int = 1,
+    progress: Callable[[int, int], None] | None = None,
+) -> list[tuple[int, int, float]]:
+    """Score candidate pairs, optionally fanned out over a process pool.
+
+    Pairs are split into fixed-size chunks; each task only receives the names
+    its chunk references. Results are reassembled in chunk order, so the output
+    is identical to a sequential scan regardless of completion order.
+    """
+    chunks = [pairs[i : i + DEDUP_CHUNK_SIZE] for i in range(0, len(pairs), DEDUP_CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1 or len(pairs) < DEDUP_PARALLEL_MIN_PAIRS:
+        all_names = dict(enumerate(names))
+        results = []
+        for done, chunk in enumerate(chunks, start=1):
+            results.extend(_score_pair_chunk(all_names, chunk, threshold))
+            if progress:
+                progress(done, len(chunks))
+        return results
+
+    chunk_results: list[list[tuple[int, int, float]]] = [[] for _ in chunks]
+    # Spawn rather than fork: the scheduler and RQ worker run jobs in threads
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)), mp_context=get_context("spawn")
+    )
+    with pool:
+        futures = {}
+        for idx, chunk in enumerate(chunks):
+            chunk_names = {k: names[k] for pair in chunk for k in pair}
+            futures[pool.submit(_score_pair_chunk, chunk_names, chunk, threshold)] = idx
+        for done, future in enumerate(as_completed(futures), start=1):
+            chunk_results[futures[future]] = future.result()
+            if progress:
+                progress(done, len(chunks))
+
+    return [match for chunk in chunk_results for match in chunk]
+
+
+def cluster_duplicate_pairs(duplicates: list[tuple]) -> list[list[tuple[str, str]]]:
+    """Group duplicate pairs into connected clusters using union-find.
+
+    Returns clusters as lists of (shop_main_id, canonical_name), oldest ShopMain
+    first, so transitive duplicates (A~B, B~C) all merge into the same target.
+    """
+    parent: dict[str, str] = {}
+    shops: dict[str, ShopMain] = {}
+
+    def find(shop_id: str) -> str:
+        root = shop_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[shop_id] != root:
+            parent[shop_id], shop_id = root, parent[shop_id]
+        return root
+
+    for shop1, shop2, _score in duplicates:
+        for shop in (shop1, shop2):
+            if shop.id not in parent:
+                parent[shop.id] = shop.id
+                shops[shop.id] = shop
+        root1, root2 = find(shop1.id), find(shop2.id)
+        if root1 != root2:
+            parent[root2] = root1
+
+    def age(shop_id: str) -> tuple:
+        return shops[shop_id].created_at, shop_id
+
+    members: dict[str, list[str]] = defaultdict(list)
+    for shop_id in parent:
+        members[find(shop_id)].append(shop_id)
+
+    clusters = [sorted(ids, key=age) for ids in members.values()]
+    clusters.sort(key=lambda ids: age(ids[0]))
+    return [[(shop_id, shops[shop_id].canonical_name) for shop_id in ids] for ids in clusters]
+
+
+def merge_shop_clusters(clusters: list[list[tuple[str, str]]], user_id: int | None) -> None:
+    """Merge each cluster into its first ShopMain using set-based UPDATEs.
+
+    Mirrors `merge_shops` for a whole batch of clusters: variants and Shop rows
+    are re-pointed to the target ShopMain, and rates of the merged Shops move to
+    the target's first Shop (or the cluster's first Shop if the target has
+    none). One UPDATE per table covers the whole batch; the caller commits.
+    """
+    from spo.models import Shop, ShopProgramRate
+
+    target_of = {shop_id: cluster[0][0] for cluster in clusters for shop_id, _ in cluster[1:]}
+    if not target_of:
+        return
+
+    main_ids = [shop_id for cluster in clusters for shop_id, _ in cluster]
+    shop_rows = db.session.execute(
+        select(Shop.id, Shop.shop_main_id).where(Shop.shop_main_id.in_(main_ids)).order_by(Shop.id)
+    ).all()
+
+    shops_by_main: dict[str, list[int]] = defaultdict(list)
+    for shop_id, shop_main_id in shop_rows:
+        shops_by_main[shop_main_id].append(shop_id)
+
+    rate_target: dict[int, int] = {}
+    for cluster in clusters:
+        target_shops = shops_by_main.get(cluster[0][0])
+        source_shops = [s for main_id, _ in cluster[1:] for s in shops_by_main.get(main_id, [])]
+        if not source_shops:
+            continue
+        anchor = target_shops[0] if target_shops else min(source_shops)
+        rate_target.update({s: anchor for s in source_shops if s != anchor})
+
+    no_sync = {"synchronize_session": False}
+    source_ids = list(target_of)
+    db.session.execute(
+        update(ShopVariant)
+        .where(ShopVariant.shop_main_id.in_(source_ids))
+        .values(shop_main_id=case(target_of, value=ShopVariant.shop_main_id)),
+        execution_options=no_sync,
+    )
+    if rate_target:
+        db.session.execute(
+            update(ShopProgramRate)
+            .where(ShopProgramRate.shop_id.in_(list(rate_target)))
+            .values(shop_id=case(rate_target, value=ShopProgramRate.shop_id)),
+            execution_options=no_sync,
+        )
+    db.session.execute(
+        update(Shop)
+        .where(Shop.shop_main_id.in_(source_ids))
+        .values(shop_main_id=case(target_of, value=Shop.shop_main_id)),
+        execution_options=no_sync,
+    )
+    db.session.execute(
+        update(ShopMain)
+        .where(ShopMain.id.in_(source_ids))
+        .values(
+            status="merged",
+            merged_into_id=case(target_of, value=ShopMain.id),
+            updated_at=datetime.now(UTC),
+            updated_by_user_id=user_id,
+        ),
+        execution_options=no_sync,
+    )
+
+
+def find_duplicate_shops(
+    threshold: float = 98.0,
+    workers: int = 1,
+    progress: Callable[[int, int], None] | None = None,
+    changed_since: datetime | None = None,
+) -> list[tuple]:
     """Find duplicate shops based on similarity score.
 
+    Args:
+        threshold: Minimum similarity score for a pair to count as duplicate
+        workers: Number of processes used to score candidate pairs
+        progress: Optional callback receiving (chunks_done, chunks_total)
+        changed_since: Only report pairs involving a shop created or updated after this
+
     Returns a list of tuples (shop1, shop2, similarity_score) where shops are duplicates.
     """
-    active_shops = ShopMain.query.filter_by(status="active").all()
-    duplicates = []
+    probes = None
+    if changed_since is not None:
+        changed_ids = set(
+            db.session.scalars(
+                select(ShopMain.id).where(
+                    ShopMain.status == "active",
+                    or_(ShopMain.created_at > changed_since, ShopMain.updated_at > changed_since),
+                )
+            )
+        )
+        if not changed_ids:
+            return []
 
-    for i, shop1 in enumerate(active_shops):
-        for shop2 in active_shops[i + 1 :]:
-            score = fuzzy_match_score(shop1.canonical_name, shop2.canonical_name)
-            if score >= threshold:
-                duplicates.append((shop1, shop2, score))
+    active_shops = ShopMain.query.filter_by(status="active").all()
+    normalized = [
+        stored_normalized_name(shop.canonical_name_normalized, shop.canonical_name)
+        for shop in active_shops
+    ]
+    if changed_since is not None:
+        probes = {i for i, shop in enumerate(active_shops) if shop.id in changed_ids}
 
-    return duplicates
+    # Only score pairs the blocking index considers plausible instead of all n² pairs
+    pairs = _candidate_pairs(normalized, threshold, probes)
+    matches = _score_candidate_pairs(normalized, pairs, threshold, workers, progress)
+    return [(active_shops[i], active_shops[j], score) for i, j, score in matches]
 
 
 def run_deduplication(
-    job=None, auto_merge_threshold: float = 98.0, system_user_id: int | None = None
+    job=None,
+    auto_merge_threshold: float = 98.0,
+    system_user_id: int | None = None,
+    workers: int | None = None,
+    merge_batch_size: int = 50,
+    full_rescan: bool = False,
 ):
     """Find and merge duplicate shops automatically.
 
+    Runs are incremental: only shops created or updated since the stored
+    watermark are compared against all active shops. The first run, and any
+    run with `full_rescan`, compares every pair. Duplicate pairs are grouped
+    into clusters; every cluster is merged into its oldest ShopMain,
+    committing once per `merge_batch_size` clusters.
+
     Args:
         job: Optional Job object to report progress
         auto_merge_threshold: Similarity threshold for automatic merging (default 98.0)
         system_user_id: User ID to attribute merges to (default None for system)
+        workers: Scoring processes for the scan (default: `DEDUP_WORKERS` env var or 1)
+        merge_batch_size: Number of clusters merged per transaction
+        full_rescan: Ignore the watermark and compare all active shops
 
     Returns:
         dict with summary of merges performed
     """
+    from spo.models import DedupWatermark
+
+    workers = dedup_worker_count(workers)
+    state = DedupWatermark.query.filter_by(scope=DEDUP_WATERMARK_SCOPE).first()
+    changed_since = None if full_rescan or state is None else state.watermark
+    # Taken before the scan so shops written while it runs are picked up next time
+    scan_watermark = db.session.query(
+        func.max(func.coalesce(ShopMain.updated_at, ShopMain.created_at))
+    ).scalar()
+
     if job:
-        job.add_message("Starting deduplication scan...")
+        if changed_since is None:
+            job.add_message(f"Starting full deduplication scan ({workers} worker(s))...")
+        else:
+            job.add_message(
+                f"Starting incremental deduplication scan for shops changed since "
+                f"{changed_since} ({workers} worker(s))..."
+            )
         job.set_progress(0, 100)
 
-    duplicates = find_duplicate_shops(threshold=auto_merge_threshold)
+    def report_scan(done: int, total: int):
+        if job:
+            job.set_progress(int(done / total * 20), 100)
+
+    duplicates = find_duplicate_shops(
+        threshold=auto_merge_threshold,
+        workers=workers,
+        progress=report_scan,
+        changed_since=changed_since,
+    )
 
     if job:
         job.add_message(f"Found {len(duplicates)} duplicate pairs to merge")
         job.set_progress(20, 100)
 
+    clusters = cluster_duplicate_pairs(duplicates)
+    if job:
+        job.add_message(f"Grouped duplicates into {len(clusters)} clusters")
+
     merged_count = 0
     errors = []
+    batch_size = max(1, merge_batch_size)
 
-    for idx, (shop1, shop2, score) in enumerate(duplicates):
+    for start in range(0, len(clusters), batch_size):
+        batch = clusters[start : start + batch_size]
         try:
-            # Merge into the shop that was created first (older shop)
-            if shop1.created_at <= shop2.created_at:
-                target_shop = shop1
-                source_shop = shop2
-            else:
-                target_shop = shop2
-                source_shop = shop1
-
-            # Skip if already merged
-            if source_shop.status != "active":
-                continue
-
-            merge_shops(
-                main_from_id=source_shop.id, main_to_id=target_shop.id, user_id=system_user_id or 0
-            )
-
-            merged_count += 1
-            if job:
-                msg = f"Merged '{source_shop.canonical_name}' into '{target_shop.canonical_name}' (score: {score})"
-                job.add_message(msg)
-                progress = 20 + int((idx + 1) / len(duplicates) * 70)
-                job.set_progress(progress, 100)
-
+            merge_shop_clusters(batch, user_id=system_user_id)
+            db.session.commit()
+            merged_batches = [batch]
         except Exception as e:
-            error_msg = f"Error merging {shop1.canonical_name} and {shop2.canonical_name}: {str(e)}"
-            errors.append(error_msg)
+            # Retry cluster by cluster so one bad cluster does not block the whole batch
+            db.session.rollback()
             if job:
-                job.add_message(f"ERROR: {error_msg}")
+                job.add_message(f"Batch merge failed ({e}); retrying clusters one by one")
+            merged_batches = []
+            for cluster in batch:
+                try:
+                    merge_shop_clusters([cluster], user_id=system_user_id)
+                    db.session.commit()
+                    merged_batches.append([cluster])
+                except Exception as cluster_error:
+                    db.session.rollback()
+                    names = ", ".join(name for _, name in cluster)
+                    error_msg = f"Error merging {names}: {str(cluster_error)}"
+                    errors.append(error_msg)
+                    if job:
+                        job.add_message(f"ERROR: {error_msg}")
+
+        for merged in merged_batches:
+            for cluster in merged:
+                merged_count += len(cluster) - 1
+                if job:
+                    sources = ", ".join(f"'{name}'" for _, name in cluster[1:])
+                    job.add_message(f"Merged {sources} into '{cluster[0][1]}'")
+
+        if job:
+            done = min(start + batch_size, len(clusters))
+            job.set_progress(20 + int(done / len(clusters) * 70), 100)
+
+    if merged_count:
+        # Names are unchanged by a merge; keep the similarity index instead of rebuilding it
+        shop_name_index.note_local_change()
+
+    if errors:
+        # Keep the old watermark so the failed shops are compared again next run
+        if job:
+            job.add_message("Watermark not advanced because of merge errors")
+    elif scan_watermark is not None:
+        if state is None:
+            state = DedupWatermark(scope=DEDUP_WATERMARK_SCOPE)
+            db.session.add(state)
+        state.watermark = scan_watermark
+        if changed_since is None:
+            state.last_full_scan_at = datetime.now(UTC)
+        db.session.commit()
 
     if job:
         job.add_message(f"Deduplication complete. Merged {merged_count} duplicate shops.")
         job.set_progress(100, 100)
 
-    return {"merged_count": merged_count, "duplicates_found": len(duplicates), "errors": errors}
+    return {
+        "merged_count": merged_count,
+        "duplicates_found": len(duplicates),
+        "clusters": len(clusters),
+        "full_scan": changed_since is None,
+        "errors": errors,
+    }
 
 
 def split_shop_variants(
@@ -355,3 +1123,77 @@ def split_shop_variants(
     db.session.commit()
 
     return new_shop_main.id
+
+
+# ShopVariant rows written per bulk UPDATE when rescoring.
+RESCORE_WRITE_BATCH_SIZE = 1000
+
+
+def rescore_variants(job=None, workers: int | None = None) -> dict:
+    """Recompute confidence scores of all ShopVariants against their ShopMain.
+
+    Variants are joined to their mains in a single query, scored in chunks
+    (in a process pool when `workers` > 1) and only changed scores are written
+    back, using bulk UPDATEs by primary key.
+
+    Args:
+        job: Optional Job object to report progress
+        workers: Scoring processes (default: `DEDUP_WORKERS` env var or 1)
+
+    Returns:
+        dict with the number of variants scanned and updated
+    """
+    workers = dedup_worker_count(workers)
+    if job:
+        job.add_message(f"Loading variants for rescoring ({workers} worker(s))...")
+        job.set_progress(0, 100)
+
+    total = db.session.scalar(select(func.count(ShopVariant.id))) or 0
+    rows = db.session.execute(
+        select(
+            ShopVariant.id,
+            ShopVariant.source_name,
+            ShopVariant.source_name_normalized,
+            ShopVariant.confidence_score,
+            ShopMain.id,
+            ShopMain.canonical_name,
+            ShopMain.canonical_name_normalized,
+        ).join(ShopMain, ShopVariant.shop_main_id == ShopMain.id)
+    ).all()
+
+    # Variant names first, then each main name once; pairs index into this list
+    names = [stored_normalized_name(row[2], row[1]) for row in rows]
+    main_pos: dict[str, int] = {}
+    pairs = []
+    for idx, row in enumerate(rows):
+        if row[4] not in main_pos:
+            main_pos[row[4]] = len(names)
+            names.append(stored_normalized_name(row[6], row[5]))
+        pairs.append((idx, main_pos[row[4]]))
+
+    if job:
+        job.add_message(f"Scoring {len(pairs)} of {total} variants")
+        job.set_progress(10, 100)
+
+    def report_scoring(done: int, chunks: int):
+        if job:
+            job.set_progress(10 + int(done / chunks * 70), 100)
+
+    changes = []
+    for idx, _main, score in _score_candidate_pairs(names, pairs, 0.0, workers, report_scoring):
+        new_score = round(max(0.0, min(100.0, score)), 1)
+        if round(rows[idx][3] or 0.0, 1) != new_score:
+            changes.append({"id": rows[idx][0], "confidence_score": new_score})
+
+    for start in range(0, len(changes), RESCORE_WRITE_BATCH_SIZE):
+        db.session.execute(update(ShopVariant), changes[start : start + RESCORE_WRITE_BATCH_SIZE])
+        if job:
+            done = min(start + RESCORE_WRITE_BATCH_SIZE, len(changes))
+            job.set_progress(80 + int(done / len(changes) * 20), 100)
+    db.session.commit()
+
+    if job:
+        job.add_message(f"Rescoring complete. Updated {len(changes)} of {total} variants.")
+        job.set_progress(100, 100)
+
+    return {"updated": len(changes), "total": total}
@@ -0,0 +1,164 @@
+"""Run-scoped name lookups for bonus programs and shop categories.
+
+Scraper ingest resolves the same handful of program and category names for
+every shop. IngestLookups keeps their ids for the duration of one run (one
+scraper instance, one ingest batch or run, one coupon import): names are
+resolved with one query per batch, missing rows are inserted together and
+nothing is committed here; the rows become part of the caller's transaction.
+
+The bulk insert/upsert helpers used by ingest live here as well.
+"""
+
+from sqlalchemy import func, insert, select, update
+
+from spo.extensions import db
+from spo.models import BonusProgram, ShopCategory, utcnow
+
+
+def insert_ignoring_conflicts(model, rows: list[dict], conflict_columns: list[str]) -> None:
+    """Bulk insert rows, skipping those that hit a unique constraint where supported."""
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        # Callers pre-filter against existing rows, so a plain insert only fails
+        # when a concurrent writer got there first.
+        db.session.execute(insert(model), rows)
+        return
+    stmt = dialect_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+    db.session.execute(stmt, rows)
+
+
+def upsert_rows(
+    model, rows: list[dict], conflict_columns: list[str], update_columns: list[str]
+) -> None:
+    """Bulk insert rows, updating `update_columns` of rows that already exist."""
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={column: stmt.excluded[column] for column in update_columns},
+        )
+        db.session.execute(stmt, rows)
+        return
+    for row in rows:
+        key = [getattr(model, column) == row[column] for column in conflict_columns]
+        values = {column: row[column] for column in update_columns}
+        if not db.session.execute(update(model).where(*key).values(**values)).rowcount:
+            db.session.execute(insert(model), [row])
+
+
+class IngestLookups:
+    """Program and category ids by name, cached for one ingest run.
+
+    Call `clear()` after a rollback, since ids of rows created in the rolled
+    back transaction are no longer valid.
+    """
+
+    def __init__(self):
+        self._programs: dict[str, tuple[int, float | None]] = {}
+        self._categories: dict[str, int] = {}
+
+    def clear(self) -> None:
+        self._programs.clear()
+        self._categories.clear()
+
+    def program_ids(self, point_values: dict[str, float | None]) -> dict[str, int]:
+        """Return ids for program names, creating missing programs.
+
+        `point_values` maps each name to its point value in EUR; like
+        ensure_program, a value that is not None replaces the stored one.
+        """
+        missing = [name for name in point_values if name not in self._programs]
+        if missing:
+            query = select(BonusProgram.name, BonusProgram.id, BonusProgram.point_value_eur)
+            rows = db.session.execute(query.where(BonusProgram.name.in_(missing))).all()
+            found = {name: (program_id, value) for name, program_id, value in rows}
+            new = [name for name in missing if name not in found]
+            if new:
+                now = utcnow()
+                insert_ignoring_conflicts(
+                    BonusProgram,
+                    [
+                        {"name": name, "point_value_eur": point_values[name], "created_at": now}
+                        for name in new
+                    ],
+                    ["name"],
+                )
+                rows = db.session.execute(query.where(BonusProgram.name.in_(new))).all()
+                found.update({name: (program_id, value) for name, program_id, value in rows})
+            self._programs.update(found)
+
+        for name, value in point_values.items():
+            program_id, stored = self._programs[name]
+            if value is not None and stored != value:
+                db.session.execute(
+                    update(BonusProgram)
+                    .where(BonusProgram.id == program_id)
+                    .values(point_value_eur=value)
+                )
+                self._programs[name] = (program_id, value)
+        return {name: self._programs[name][0] for name in point_values}
+
+    def program_id(self, name: str, point_value_eur: float | None = 0.0) -> int:
+        """Single-name form of program_ids (drop-in for ensure_program(...).id)."""
+        return self.program_ids({name: point_value_eur})[name]
+
+    def find_program_ids(self, names) -> dict[str, int]:
+        """Return ids of existing programs, matching names case-insensitively.
+
+        Unknown names are left out of the result; nothing is created.
+        """
+        wanted = {name for name in names if name}
+        result = {}
+        pending = {}
+        for name in wanted:
+            cached = self._programs.get(name)
+            if cached:
+                result[name] = cached[0]
+            else:
+                pending.setdefault(name.lower(), []).append(name)
+        if pending:
+            rows = db.session.execute(
+                select(BonusProgram.name, BonusProgram.id, BonusProgram.point_value_eur).where(
+                    func.lower(BonusProgram.name).in_(pending)
+                )
+            ).all()
+            for name, program_id, value in rows:
+                self._programs[name] = (program_id, value)
+                for requested in pending.get(name.lower(), []):
+                    result.setdefault(requested, program_id)
+        return result
+
+    def category_ids(self, names) -> dict[str, int]:
+        """Return ids for category names, creating missing categories."""
+        wanted = {name for name in names if name}
+        missing = wanted - self._categories.keys()
+        if missing:
+            query = select(ShopCategory.name, ShopCategory.id)
+            self._categories.update(
+                db.session.execute(query.where(ShopCategory.name.in_(missing))).all()
+            )
+            new = missing - self._categories.keys()
+            if new:
+                insert_ignoring_conflicts(ShopCategory, [{"name": name} for name in new], ["name"])
+                self._categories.update(
+                    db.session.execute(query.where(ShopCategory.name.in_(new))).all()
+                )
+        return {name: self._categories[name] for name in wanted}
+
+    def category_id(self, name: str | None) -> int | None:
+        if not name:
+            return None
+        return self.category_ids([name])[name]
@@ -0,0 +1,153 @@
+"""Structured timings and counts of scrape ingests.
+
+ingest_shop_batch and ingest_program_run fill the timing fields of their
+IngestResult (wall time, time spent resolving shops versus diffing rates)
+and count the SQL statements and commits they issue with `count_statements`.
+Callers that log an ingest store the result as an IngestMetric row, one per
+posted batch or per run ingested in one call; /admin/ingest_metrics reads
+them back, with batch rows aggregated per run.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from spo.extensions import db
+from spo.models import IngestMetric
+
+_local = threading.local()
+
+# IngestResult fields copied to IngestMetric rows
+_METRIC_FIELDS = (
+    "batches",
+    "shops",
+    "hash_hits",
+    "duplicates",
+    "rates_created",
+    "rates_expired",
+    "rates_unchanged",
+    "wall_seconds",
+    "dedup_seconds",
+    "rate_seconds",
+    "statements",
+    "commits",
+)
+_SUMMED_FIELDS = tuple(name for name in _METRIC_FIELDS if name != "batches")
+
+
+@contextmanager
+def count_statements(result):
+    """Add the SQL statements and commits of the current thread to `result`.
+
+    Counters nest; while an inner one is active only the inner one counts, so
+    adding a batch result to its run result does not count anything twice.
+    """
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(result)
+    try:
+        yield result
+    finally:
+        stack.pop()
+
+
+def _current():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    result = _current()
+    if result is not None:
+        result.statements += 1
+
+
+@event.listens_for(Session, "after_commit")
+def _count_commit(session):
+    result = _current()
+    # Releasing a savepoint fires after_commit as well; only count real commits
+    if result is not None and not session.in_nested_transaction():
+        result.commits += 1
+
+
+def record_ingest_metrics(
+    result, *, scope: str, source: str, run_id: str | None = None, batch_number=None
+) -> IngestMetric:
+    """Add an IngestMetric row for an ingest result; the caller commits it."""
+    metric = IngestMetric(
+        scope=scope,
+        source=source,
+        run_id=run_id,
+        batch_number=batch_number,
+        **{name: getattr(result, name) for name in _METRIC_FIELDS},
+    )
+    db.session.add(metric)
+    return metric
+
+
+def _metric_dict(metric: IngestMetric) -> dict:
+    data = {
+        "id": metric.id,
+        "created_at": metric.created_at.isoformat() if metric.created_at else None,
+        "scope": metric.scope,
+        "source": metric.source,
+        "run_id": metric.run_id,
+        "batch_number": metric.batch_number,
+        **{name: getattr(metric, name) for name in _METRIC_FIELDS},
+    }
+    data["shops_per_second"] = (
+        round(metric.shops / metric.wall_seconds, 1) if metric.wall_seconds else None
+    )
+    return data
+
+
+def ingest_metrics_summary(
+    *, limit: int = 50, run_id: str | None = None, source: str | None = None
+) -> dict:
+    """Latest metric rows plus per-run totals of batch rows, newest first."""
+    query = select(IngestMetric).order_by(IngestMetric.created_at.desc(), IngestMetric.id.desc())
+    if run_id:
+        query = query.where(IngestMetric.run_id == run_id)
+    if source:
+        query = query.where(IngestMetric.source == source)
+    rows = db.session.execute(query.limit(limit)).scalars().all()
+
+    run_query = (
+        select(
+            IngestMetric.run_id,
+            IngestMetric.source,
+            func.count(IngestMetric.id),
+            func.min(IngestMetric.created_at),
+            func.max(IngestMetric.created_at),
+            *(func.sum(getattr(IngestMetric, name)) for name in _SUMMED_FIELDS),
+        )
+        .where(IngestMetric.scope == "batch", IngestMetric.run_id.is_not(None))
+        .group_by(IngestMetric.run_id, IngestMetric.source)
+        .order_by(func.max(IngestMetric.created_at).desc())
+    )
+    if run_id:
+        run_query = run_query.where(IngestMetric.run_id == run_id)
+    if source:
+        run_query = run_query.where(IngestMetric.source == source)
+
+    runs = []
+    for row_run_id, row_source, batches, first_at, last_at, *sums in db.session.execute(
+        run_query.limit(limit)
+    ):
+        totals = dict(zip(_SUMMED_FIELDS, sums, strict=True))
+        wall = totals["wall_seconds"] or 0.0
+        runs.append(
+            {
+                "run_id": row_run_id,
+                "source": row_source,
+                "batches": batches,
+                "first_batch_at": first_at.isoformat() if first_at else None,
+                "last_batch_at": last_at.isoformat() if last_at else None,
+                **totals,
+                "shops_per_second": round(totals["shops"] / wall, 1) if wall else None,
+            }
+        )
+    return {"metrics": [_metric_dict(metric) for metric in rows], "runs": runs}
@@ -0,0 +1,200 @@
+"""Process-level resolution of merchant names to shops.
+
+Coupon imports and the coupon import preview name shops by merchant name.
+MerchantResolver keeps a normalized-name -> Shop id map built from ShopMain,
+ShopVariant and Shop in one pass, so resolving a batch of names costs no
+per-name queries. A name matches, in this order of precedence, a canonical
+ShopMain name, a variant's source name or a Shop name; each maps to the
+lowest Shop id of the matched shop.
+
+Writes to Shop, ShopMain or ShopVariant through the session (including bulk
+INSERT/UPDATE/DELETE statements) invalidate the map when they are committed
+or rolled back. Writes from other processes are picked up through a cheap
+signature query (row counts and latest ids/updated_at) per lookup.
+"""
+
+import threading
+from collections.abc import Iterable
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from spo.extensions import db
+from spo.models import Shop, ShopMain, ShopVariant
+
+_SHOP_MODELS = (Shop, ShopMain, ShopVariant)
+
+
+def normalize_merchant_name(value: str) -> str:
+    return " ".join(value.strip().lower().split())
+
+
+class MerchantResolver:
+    """In-memory merchant name -> Shop id map plus the data for shop suggestions."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signature: tuple | None = None
+        self._shop_ids: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+        # (canonical_name, shop_id, searchable lowercase names) of active shops
+        self._suggestions: list[tuple[str, int, tuple[str, ...]]] = []
+
+    def invalidate(self) -> None:
+        """Drop the map; the next lookup rebuilds it from the database."""
+        with self._lock:
+            self._loaded = False
+            self._signature = None
+            self._shop_ids = {}
+            self._names = {}
+            self._suggestions = []
+
+    def _current_signature(self) -> tuple:
+        row = db.session.execute(
+            select(
+                select(func.count(ShopMain.id)).scalar_subquery(),
+                select(func.max(ShopMain.updated_at)).scalar_subquery(),
+                select(func.count(ShopVariant.id)).scalar_subquery(),
+                select(func.max(ShopVariant.id)).scalar_subquery(),
+                select(func.count(Shop.id)).scalar_subquery(),
+                select(func.max(Shop.id)).scalar_subquery(),
+            )
+        ).one()
+        return tuple(row)
+
+    def _ensure_fresh(self) -> None:
+        signature = self._current_signature()
+        if not self._loaded or signature != self._signature:
+            self.rebuild(signature)
+
+    def rebuild(self, signature: tuple | None = None) -> None:
+        """Load all shop, variant and canonical names from the database."""
+        with self._lock:
+            first_shop: dict[str, int] = {}
+            shop_ids: dict[str, int] = {}
+            for shop_id, name, shop_main_id in db.session.execute(
+                select(Shop.id, Shop.name, Shop.shop_main_id).order_by(Shop.id)
+            ):
+                if shop_main_id is not None:
+                    first_shop.setdefault(shop_main_id, shop_id)
+                if name:
+                    shop_ids.setdefault(normalize_merchant_name(name), shop_id)
+
+            # Higher precedence overwrites: variant names, then canonical names
+            variant_names: dict[str, list[str]] = {}
+            variants: dict[str, int] = {}
+            for shop_main_id, source_name in db.session.execute(
+                select(ShopVariant.shop_main_id, ShopVariant.source_name).order_by(ShopVariant.id)
+            ):
+                if not source_name:
+                    continue
+                variant_names.setdefault(shop_main_id, []).append(source_name.lower())
+                shop_id = first_shop.get(shop_main_id)
+                if shop_id is not None:
+                    norm = normalize_merchant_name(source_name)
+                    variants[norm] = min(variants.get(norm, shop_id), shop_id)
+            shop_ids.update(variants)
+
+            names: dict[int, str] = {}
+            suggestions = []
+            canonical: dict[str, int] = {}
+            for shop_main_id, name, name_lower, status in db.session.execute(
+                select(
+                    ShopMain.id,
+                    ShopMain.canonical_name,
+                    ShopMain.canonical_name_lower,
+                    ShopMain.status,
+                )
+            ):
+                shop_id = first_shop.get(shop_main_id)
+                if shop_id is None:
+                    continue
+                names[shop_id] = name
+                norm = normalize_merchant_name(name_lower)
+                canonical[norm] = min(canonical.get(norm, shop_id), shop_id)
+                if status == "active":
+                    searchable = (name_lower, *variant_names.get(shop_main_id, ()))
+                    suggestions.append((name, shop_id, searchable))
+            shop_ids.update(canonical)
+            suggestions.sort(key=lambda entry: (entry[0], entry[1]))
+
+            self._shop_ids = shop_ids
+            self._names = names
+            self._suggestions = suggestions
+            self._signature = signature or tuple(self._current_signature())
+            self._loaded = True
+
+    def resolve_many(self, names: Iterable[str]) -> dict[str, int]:
+        """Return the Shop id of every name that resolves; unknown names are left out."""
+        with self._lock:
+            self._ensure_fresh()
+            resolved = {}
+            for name in names:
+                if not name:
+                    continue
+                shop_id = self._shop_ids.get(normalize_merchant_name(name))
+                if shop_id is not None:
+                    resolved[name] = shop_id
+            return resolved
+
+    def resolve(self, name: str) -> int | None:
+        return self.resolve_many([name]).get(name)
+
+    def shop_names(self, shop_ids: Iterable[int]) -> dict[int, str]:
+        """Canonical names of the ShopMains the given Shops belong to."""
+        with self._lock:
+            self._ensure_fresh()
+            return {shop_id: self._names[shop_id] for shop_id in shop_ids if shop_id in self._names}
+
+    def suggestions_many(
+        self, queries: Iterable[str], limit: int = 50
+    ) -> dict[str, list[dict[str, str | int]]]:
+        """Per query, active shops whose canonical or variant name contains it, by name."""
+        with self._lock:
+            self._ensure_fresh()
+            return {query: self._suggest(query, limit) for query in queries if query}
+
+    def _suggest(self, query: str, limit: int) -> list[dict[str, str | int]]:
+        search = query.strip().lower()
+        raw = query.lower()
+        results = []
+        for name, shop_id, searchable in self._suggestions:
+            if search in searchable[0] or any(raw in variant for variant in searchable[1:]):
+                results.append({"id": shop_id, "name": name})
+                if len(results) >= limit:
+                    break
+        return results
+
+
+merchant_resolver = MerchantResolver()
+
+
+def _mark_dirty(session) -> None:
+    session.info["merchant_resolver_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_shop_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _SHOP_MODELS):
+            _mark_dirty(session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_shop_statement(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _SHOP_MODELS):
+        _mark_dirty(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_merchant_resolver(session):
+    if session.info.pop("merchant_resolver_dirty", None):
+        merchant_resolver.invalidate()
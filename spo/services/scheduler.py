@@ -1,5 +1,6 @@
 """Job scheduler service for running periodic tasks."""
 
+import inspect
 import logging
 import threading
 from datetime import UTC, datetime
@@ -35,6 +36,33 @@ def register_job_type(job_type: str, func):
     logger.info(f"Registered job type: {job_type}")
 
 
+def _accepted_params(func, params: dict) -> tuple[dict, list[str]]:
+    """Split params into the keywords `func` accepts and the ones it does not."""
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return dict(params), []
+    parameters = list(signature.parameters.values())
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return dict(params), []
+    # The first positional parameter receives the job wrapper
+    names = {
+        p.name
+        for p in parameters[1:]
+        if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    }
+    accepted = {k: v for k, v in params.items() if k in names}
+    return accepted, sorted(k for k in params if k not in names)
+
+
+def unsupported_job_params(job_type: str, params: dict | None) -> list[str]:
+    """Return the names in params that the job type's function does not accept."""
+    func = JOB_REGISTRY.get(job_type)
+    if func is None or not params:
+        return []
+    return _accepted_params(func, params)[1]
+
+
 class SimpleJob:
     """Simple job wrapper for inline execution (replaces RQ job object)."""
 
@@ -281,8 +309,14 @@ def _run_scheduled_job(job, scheduled_job_id: int, run_id: int, job_func):
         try:
             # Create a simple job wrapper for inline execution
             job_wrapper = SimpleJob(run_id)
-            # Call job function with job wrapper
-            result = job_func(job_wrapper)
+            job_params = dict(scheduled_job.job_params or {}) if scheduled_job else {}
+            job_params, ignored = _accepted_params(job_func, job_params)
+            if ignored:
+                logger.warning(
+                    f"Job '{job_name}' ignores unsupported parameters: {', '.join(ignored)}"
+                )
+            # Call job function with job wrapper and the parameters it accepts
+            result = job_func(job_wrapper, **job_params)
             logger.info(f"Job function completed with result: {result}")
         except Exception as e:  # noqa: BLE001
             status = "failed"
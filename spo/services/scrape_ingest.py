@@ -1,18 +1,746 @@
-from scrapers.base import BaseScraper
+"""Set-based ingest of scraped shop batches.
 
+`BaseScraper.register_to_db` handles one shop at a time and commits after
+every step. For batches posted to /api/scrape-results the same work is done
+here per batch: ShopMains, variants, legacy Shops, programs, categories and
+active rates are resolved with a handful of queries, missing rows are
+inserted in bulk (INSERT ... ON CONFLICT DO NOTHING where the dialect
+supports it) and the whole batch is written in one transaction. Rate
+versioning follows `register_to_db`: an unchanged active rate is kept, a
+changed one is expired and superseded by a new row.
 
-class _IngestScraper(BaseScraper):
-    def fetch(self):
+Rates are diffed in memory against an ActiveRates map. For complete scrapes
+of a program, ingest_program_run loads every active rate of the program once
+and reuses the map for all batches of the run.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, fields
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import exists, func, insert, select, update
+
+from spo.extensions import db
+from spo.models import (
+    ScrapePayloadHash,
+    Shop,
+    ShopMain,
+    ShopProgramRate,
+    ShopVariant,
+    utcnow,
+)
+from spo.models.helpers import normalize_shop_name
+from spo.services.dedup import (
+    _trigram_best_match,
+    find_shop_by_similarity,
+    fuzzy_match_normalized,
+    pg_trgm_available,
+    shop_name_index,
+)
+from spo.services.ingest_lookups import IngestLookups, insert_ignoring_conflicts, upsert_rows
+from spo.services.ingest_metrics import count_statements
+from spo.services.scrape_runs import claim_batch, record_seen
+
+logger = logging.getLogger(__name__)
+
+# Source recorded for shops that carry no source of their own (the class name
+# register_to_db used for the ingest scraper).
+DEFAULT_INGEST_SOURCE = "_IngestScraper"
+
+# Rate types for which a missing exact (shop, program, category) match falls
+# back to the newest active rate of the shop/program pair.
+FALLBACK_RATE_TYPES = {"contract", "shop"}
+
+# Shops written per transaction by ingest_program_run
+INGEST_BATCH_SIZE = 200
+
+_RATE_VALUE_FIELDS = ("points_per_eur", "cashback_pct", "points_absolute", "cashback_absolute")
+
+
+@dataclass
+class IngestResult:
+    """Counts of an ingested batch or run."""
+
+    batches: int = 0
+    shops: int = 0
+    skipped: int = 0
+    rates_created: int = 0
+    rates_expired: int = 0
+    rates_unchanged: int = 0
+    # Shops whose payload matched the stored hash and were not processed
+    hash_hits: int = 0
+    hash_misses: int = 0
+    # Batches of a tracked run that had been received before and were skipped
+    duplicates: int = 0
+    # Wall time, of which resolving shops (hash check, ShopMains, variants,
+    # Shops) and diffing/writing rates; the rest is lookups, bookkeeping, commit
+    wall_seconds: float = 0.0
+    dedup_seconds: float = 0.0
+    rate_seconds: float = 0.0
+    statements: int = 0
+    commits: int = 0
+
+    def add(self, other: "IngestResult") -> None:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+
+def payload_hash(item: dict) -> str:
+    """Stable hash of the parts of a shop payload that ingest uses."""
+    canonical = json.dumps(
+        {"name": item["name"], "rates": item["rates"]},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _changed_items(items: list[dict], force: bool, result: IngestResult) -> list[dict]:
+    """Drop items whose payload hash matches the one stored for their (source, source_id).
+
+    A stored hash only counts while a variant with that source id still exists,
+    so shops deleted or split since the last run are ingested again.
+    """
+    keyed = [item for item in items if item["source_id"] is not None]
+    for item in keyed:
+        item["payload_hash"] = payload_hash(item)
+    if force or not keyed:
+        result.hash_misses += len(items)
+        return items
+
+    stored = {
+        (source, source_id): stored_hash
+        for source, source_id, stored_hash in db.session.execute(
+            select(
+                ScrapePayloadHash.source,
+                ScrapePayloadHash.source_id,
+                ScrapePayloadHash.payload_hash,
+            )
+            .where(ScrapePayloadHash.source.in_({item["source"] for item in keyed}))
+            .where(ScrapePayloadHash.source_id.in_({item["source_id"] for item in keyed}))
+            .where(
+                exists().where(
+                    ShopVariant.source == ScrapePayloadHash.source,
+                    ShopVariant.source_id == ScrapePayloadHash.source_id,
+                )
+            )
+        )
+    }
+    changed = [
+        item
+        for item in items
+        if item.get("payload_hash") is None
+        or stored.get((item["source"], item["source_id"])) != item["payload_hash"]
+    ]
+    result.hash_hits += len(items) - len(changed)
+    result.hash_misses += len(changed)
+    return changed
+
+
+def _store_payload_hashes(items: list[dict], mains: list[ShopMain | None], now) -> None:
+    rows = {
+        (item["source"], item["source_id"]): {
+            "source": item["source"],
+            "source_id": item["source_id"],
+            "payload_hash": item["payload_hash"],
+            "updated_at": now,
+        }
+        for item, main in zip(items, mains, strict=True)
+        if main is not None and item.get("payload_hash")
+    }
+    upsert_rows(
+        ScrapePayloadHash,
+        list(rows.values()),
+        ["source", "source_id"],
+        ["payload_hash", "updated_at"],
+    )
+
+
+def _unchanged_pairs(items: list[dict], lookups: IngestLookups) -> list[tuple[int, int]]:
+    """(shop_id, program_id) pairs of shops skipped because their payload is unchanged."""
+    if not items:
         return []
+    shop_ids = {
+        (source, source_id): shop_id
+        for source, source_id, shop_id in db.session.execute(
+            select(ShopVariant.source, ShopVariant.source_id, func.min(Shop.id))
+            .join(Shop, Shop.shop_main_id == ShopVariant.shop_main_id)
+            .where(ShopVariant.source.in_({item["source"] for item in items}))
+            .where(ShopVariant.source_id.in_({item["source_id"] for item in items}))
+            .group_by(ShopVariant.source, ShopVariant.source_id)
+        )
+    }
+    program_ids = lookups.find_program_ids(
+        {rate["program"] for item in items for rate in item["rates"]}
+    )
+    return [
+        (shop_id, program_ids[rate["program"]])
+        for item in items
+        if (shop_id := shop_ids.get((item["source"], item["source_id"]))) is not None
+        for rate in item["rates"]
+        if rate["program"] in program_ids
+    ]
+
+
+def _best_existing_match(name: str) -> tuple[str | None, float]:
+    if pg_trgm_available():
+        return _trigram_best_match(name)
+    return shop_name_index.best_match(name)
+
+
+def _resolve_shop_mains(items: list[dict]) -> list[ShopMain | None]:
+    """Return the ShopMain of every item, creating new ones for unknown names.
+
+    Items whose (source, source_id) is already registered keep their ShopMain;
+    the rest are matched by name like get_or_create_shop_main (>= 98 reuses the
+    shop, anything lower creates a new one). Names new to the database are also
+    matched against each other so one batch never creates the same shop twice.
+    """
+    known_ids = {(item["source"], item["source_id"]) for item in items if item["source_id"]}
+    variant_mains: dict[tuple[str, str], str] = {}
+    if known_ids:
+        sources = {source for source, _ in known_ids}
+        rows = db.session.execute(
+            select(ShopVariant.source, ShopVariant.source_id, ShopVariant.shop_main_id)
+            .where(ShopVariant.source.in_(sources))
+            .where(ShopVariant.source_id.in_({source_id for _, source_id in known_ids}))
+            .order_by(ShopVariant.id)
+        ).all()
+        for source, source_id, shop_main_id in rows:
+            variant_mains.setdefault((source, source_id), shop_main_id)
+
+    name_matches: dict[str, tuple[str | None, float]] = {}
+    for item in items:
+        if (item["source"], item["source_id"]) not in variant_mains:
+            name = item["name"]
+            if name not in name_matches:
+                name_matches[name] = _best_existing_match(name)
+
+    wanted = set(variant_mains.values())
+    wanted |= {shop_id for shop_id, score in name_matches.values() if shop_id and score >= 98.0}
+    mains = {}
+    if wanted:
+        mains = {shop.id: shop for shop in ShopMain.query.filter(ShopMain.id.in_(wanted)).all()}
+
+    created: list[tuple[str, ShopMain]] = []
+    resolved: list[ShopMain | None] = []
+    for item in items:
+        main = mains.get(variant_mains.get((item["source"], item["source_id"])))
+        if main is not None and (main.status or "").lower() == "active":
+            item["confidence"] = 100.0
+            resolved.append(main)
+            continue
+
+        shop_id, score = name_matches.get(item["name"]) or _best_existing_match(item["name"])
+        main = mains.get(shop_id) if score >= 98.0 else None
+        if score >= 98.0 and main is None:
+            # Stale index entry; let the regular lookup reload it.
+            main, score = find_shop_by_similarity(item["name"], threshold=98.0)
+        if main is None:
+            normalized = normalize_shop_name(item["name"])
+            for created_name, created_main in created:
+                batch_score = fuzzy_match_normalized(normalized, created_name, score_cutoff=98.0)
+                if batch_score >= 98.0:
+                    main, score = created_main, batch_score
+                    break
+        if main is not None:
+            item["confidence"] = 100.0
+            resolved.append(main)
+            continue
+
+        main = ShopMain(
+            id=str(uuid.uuid4()),
+            canonical_name=item["name"],
+            canonical_name_lower=item["name"].lower(),
+            status="active",
+        )
+        db.session.add(main)
+        created.append((main.canonical_name_normalized or "", main))
+        item["confidence"] = score if 70.0 <= score < 98.0 else 100.0
+        resolved.append(main)
+
+    if created:
+        db.session.flush()
+    return resolved
+
+
+def _ensure_variants(items: list[dict], mains: list[ShopMain | None]) -> None:
+    """Insert the missing (shop_main, source, source_id) variants of the batch."""
+    main_ids = {main.id for main in mains if main is not None}
+    if not main_ids:
+        return
+    existing = set(
+        db.session.execute(
+            select(ShopVariant.shop_main_id, ShopVariant.source, ShopVariant.source_id).where(
+                ShopVariant.shop_main_id.in_(main_ids)
+            )
+        ).all()
+    )
+    rows = []
+    for item, main in zip(items, mains, strict=True):
+        if main is None:
+            continue
+        key = (main.id, item["source"], item["source_id"])
+        if key in existing:
+            continue
+        existing.add(key)
+        rows.append(
+            {
+                "shop_main_id": main.id,
+                "source": item["source"],
+                "source_name": item["name"],
+                "source_name_normalized": normalize_shop_name(item["name"]),
+                "source_id": item["source_id"],
+                "confidence_score": item["confidence"],
+            }
+        )
+    insert_ignoring_conflicts(ShopVariant, rows, ["shop_main_id", "source", "source_id"])
+
+
+def _resolve_shops(items: list[dict], mains: list[ShopMain | None]) -> dict[str, int]:
+    """Return the legacy Shop id per ShopMain id, creating missing Shops."""
+    main_ids = {main.id for main in mains if main is not None}
+    if not main_ids:
+        return {}
+    shop_ids: dict[str, int] = {}
+    for shop_id, shop_main_id in db.session.execute(
+        select(Shop.id, Shop.shop_main_id).where(Shop.shop_main_id.in_(main_ids)).order_by(Shop.id)
+    ):
+        shop_ids.setdefault(shop_main_id, shop_id)
+
+    new_shops: dict[str, Shop] = {}
+    for item, main in zip(items, mains, strict=True):
+        if main is not None and main.id not in shop_ids and main.id not in new_shops:
+            new_shops[main.id] = Shop(name=item["name"], shop_main_id=main.id)
+    if new_shops:
+        db.session.add_all(new_shops.values())
+        db.session.flush()
+        shop_ids.update({main_id: shop.id for main_id, shop in new_shops.items()})
+    return shop_ids
+
 
+def _rate_changed(existing: dict, incoming: dict) -> bool:
+    return (
+        any(existing[field] != incoming[field] for field in _RATE_VALUE_FIELDS)
+        or existing["rate_type"] != incoming["rate_type"]
+    )
 
-def ingest_scrape_results(shops: list[dict], *, source: str | None = None) -> int:
-    """Persist scraped shop data using BaseScraper logic."""
-    scraper = _IngestScraper()
-    count = 0
+
+class ActiveRates:
+    """Active rates (valid_to IS NULL) keyed by (shop_id, program_id), diffed in memory.
+
+    Rates are loaded either for the (shop, program) pairs of one batch or for
+    whole programs at once, so a full scrape of a program reads its active
+    rates a single time. `apply` compares an incoming rate against the map
+    and queues the minimal change; `flush` writes all queued expirations as one
+    UPDATE and all new rates as one INSERT and keeps the map current, so the
+    same instance can be reused for the next batch of a run. After a rolled
+    back batch only the pairs that batch touched are read again.
+    """
+
+    def __init__(self):
+        self._rates: dict[tuple[int, int], list[dict]] = {}
+        self._programs: set[int] = set()
+        self._expired_ids: list[int] = []
+        self._new_rows: list[dict] = []
+        # Pairs changed since the last commit, and pairs to read again after a rollback
+        self._touched: set[tuple[int, int]] = set()
+        self._stale: set[tuple[int, int]] = set()
+
+    def _load(self, query, pairs: set[tuple[int, int]] | None = None) -> None:
+        rows = db.session.execute(
+            query.with_only_columns(
+                ShopProgramRate.id,
+                ShopProgramRate.shop_id,
+                ShopProgramRate.program_id,
+                ShopProgramRate.category_id,
+                ShopProgramRate.rate_type,
+                ShopProgramRate.rate_note,
+                ShopProgramRate.valid_from,
+                *(getattr(ShopProgramRate, field) for field in _RATE_VALUE_FIELDS),
+            )
+            .where(ShopProgramRate.valid_to.is_(None))
+            .order_by(ShopProgramRate.id)
+        ).mappings()
+        for row in rows:
+            pair = (row["shop_id"], row["program_id"])
+            if pairs is None or pair in pairs:
+                self._rates.setdefault(pair, []).append(dict(row))
+
+    def load_programs(self, program_ids) -> None:
+        """Load all active rates of the given programs."""
+        missing = set(program_ids) - self._programs
+        if not missing:
+            return
+        for pair in [pair for pair in self._rates if pair[1] in missing]:
+            del self._rates[pair]
+        self._stale = {pair for pair in self._stale if pair[1] not in missing}
+        self._load(select(ShopProgramRate).where(ShopProgramRate.program_id.in_(missing)))
+        self._programs |= missing
+
+    def load_pairs(self, pairs) -> None:
+        """Load active rates of (shop_id, program_id) pairs not loaded yet."""
+        missing = {
+            pair
+            for pair in pairs
+            if pair in self._stale or (pair[1] not in self._programs and pair not in self._rates)
+        }
+        if not missing:
+            return
+        self._stale -= missing
+        for pair in missing:
+            self._rates[pair] = []
+        query = select(ShopProgramRate).where(
+            ShopProgramRate.shop_id.in_({shop_id for shop_id, _ in missing}),
+            ShopProgramRate.program_id.in_({program_id for _, program_id in missing}),
+        )
+        self._load(query, missing)
+
+    def apply(
+        self,
+        shop_id: int,
+        program_id: int,
+        category_id: int | None,
+        rate: dict,
+        now,
+        result: IngestResult,
+    ) -> None:
+        """Diff one incoming rate against the active ones, like register_to_db."""
+        incoming = {
+            "points_per_eur": rate.get("points_per_eur", 0.0),
+            "cashback_pct": rate.get("cashback_pct", 0.0),
+            "points_absolute": rate.get("points_absolute", None),
+            "cashback_absolute": rate.get("cashback_absolute", None),
+            "rate_type": rate.get("rate_type", "shop"),
+            "rate_note": rate.get("rate_note", None),
+        }
+        # Oldest id first; rows added by this run are appended, so lookups see
+        # them exactly like sequential ingest did.
+        candidates = self._rates.setdefault((shop_id, program_id), [])
+        self._touched.add((shop_id, program_id))
+
+        existing = next((r for r in candidates if r["category_id"] == category_id), None)
+        if existing is None and rate.get("rate_type") in FALLBACK_RATE_TYPES and candidates:
+            fallback = max(
+                enumerate(candidates), key=lambda entry: (entry[1]["valid_from"], entry[0])
+            )[1]
+            if fallback["rate_type"] != rate.get("rate_type") or fallback["rate_note"] != rate.get(
+                "rate_note"
+            ):
+                existing = fallback
+                if category_id is None:
+                    category_id = fallback["category_id"]
+
+        if existing is not None and not _rate_changed(existing, incoming):
+            result.rates_unchanged += 1
+            return
+
+        if existing is not None:
+            candidates.remove(existing)
+            if existing.get("id") is not None:
+                self._expired_ids.append(existing["id"])
+            else:
+                # Superseded before it was written.
+                existing["valid_to"] = now
+            result.rates_expired += 1
+
+        new_rate = {
+            "shop_id": shop_id,
+            "program_id": program_id,
+            "category_id": category_id,
+            "valid_from": now,
+            "valid_to": None,
+            **incoming,
+        }
+        self._new_rows.append(new_rate)
+        candidates.append(new_rate)
+        result.rates_created += 1
+
+    def flush(self, now) -> None:
+        """Write queued expirations and new rates with one statement each."""
+        if self._expired_ids:
+            db.session.execute(
+                update(ShopProgramRate)
+                .where(ShopProgramRate.id.in_(self._expired_ids))
+                .values(valid_to=now)
+            )
+            self._expired_ids = []
+        if self._new_rows:
+            ids = db.session.scalars(
+                insert(ShopProgramRate).returning(ShopProgramRate.id, sort_by_parameter_order=True),
+                self._new_rows,
+            ).all()
+            for row, rate_id in zip(self._new_rows, ids, strict=True):
+                row["id"] = rate_id
+            self._new_rows = []
+
+    def mark_committed(self) -> None:
+        """Keep the changes of the batch whose transaction just committed."""
+        self._touched.clear()
+
+    def discard_pending(self) -> None:
+        """Forget the pairs of a rolled back batch; their next use reads them again."""
+        for pair in self._touched:
+            self._rates.pop(pair, None)
+        self._stale |= self._touched
+        self._touched = set()
+        self._expired_ids = []
+        self._new_rows = []
+
+
+def _apply_rates(
+    items: list[dict],
+    shop_ids: list[int | None],
+    program_ids: dict[str, int],
+    category_ids: dict[str, int],
+    active_rates: ActiveRates,
+    now,
+    result: IngestResult,
+) -> None:
+    """Version the batch's rates against the active rate map and write the changes."""
+    entries = [
+        (shop_id, program_ids[rate["program"]], rate)
+        for item, shop_id in zip(items, shop_ids, strict=True)
+        if shop_id is not None
+        for rate in item["rates"]
+    ]
+    if not entries:
+        return
+    active_rates.load_pairs({(shop_id, program_id) for shop_id, program_id, _ in entries})
+    for shop_id, program_id, rate in entries:
+        category_id = category_ids.get(rate.get("category")) if rate.get("category") else None
+        active_rates.apply(shop_id, program_id, category_id, rate, now, result)
+    active_rates.flush(now)
+
+
+def ingest_shop_batch(
+    shops: list[dict],
+    *,
+    source: str | None = None,
+    active_rates: ActiveRates | None = None,
+    lookups: IngestLookups | None = None,
+    force: bool = False,
+    run_id: str | None = None,
+    batch_number: int | None = None,
+) -> IngestResult:
+    """Persist a batch of scraped shops (BaseScraper.fetch format) in one transaction.
+
+    Shops whose payload is unchanged since their last ingest (same hash for
+    the same source and source_id) are skipped unless `force` is set.
+
+    With a `run_id` the (shop, program) pairs of the batch, including those of
+    skipped unchanged shops, are recorded for the run's stale-rate expiry (see
+    spo.services.scrape_runs). With a `batch_number` as well, a batch the run
+    already delivered is not ingested again and only counts as a duplicate.
+
+    Pass `active_rates` and `lookups` to share the active rate map and the
+    program/category ids between all batches of a run (see ingest_program_run);
+    otherwise they are loaded for this batch only.
+    """
+    result = IngestResult()
+    start = time.perf_counter()
+    with count_statements(result):
+        try:
+            _ingest_batch(
+                shops,
+                result,
+                source=source,
+                active_rates=active_rates if active_rates is not None else ActiveRates(),
+                lookups=lookups if lookups is not None else IngestLookups(),
+                force=force,
+                run_id=run_id,
+                batch_number=batch_number,
+            )
+        finally:
+            result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+def _ingest_batch(
+    shops: list[dict],
+    result: IngestResult,
+    *,
+    source: str | None,
+    active_rates: ActiveRates,
+    lookups: IngestLookups,
+    force: bool,
+    run_id: str | None,
+    batch_number: int | None,
+) -> None:
+    items = []
     for shop_data in shops:
         if source and "source" not in shop_data:
             shop_data["source"] = source
-        scraper.register_to_db(shop_data)
-        count += 1
-    return count
+        source_id = shop_data.get("source_id")
+        items.append(
+            {
+                "name": shop_data["name"],
+                "source": shop_data.get("source") or DEFAULT_INGEST_SOURCE,
+                "source_id": str(source_id) if source_id is not None else None,
+                "rates": shop_data.get("rates", []),
+            }
+        )
+    tracked = run_id is not None and batch_number is not None
+    if not items and not tracked:
+        return
+
+    now = utcnow()
+    try:
+        if tracked and not claim_batch(run_id, batch_number, len(items), now):
+            db.session.rollback()
+            result.duplicates = 1
+            return
+        result.shops = len(items)
+        result.batches = 1 if items else 0
+        all_items = items
+        phase = time.perf_counter()
+        items = _changed_items(items, force, result) if items else []
+        if run_id is not None:
+            changed = {id(item) for item in items}
+            unchanged = [item for item in all_items if id(item) not in changed]
+            record_seen(run_id, _unchanged_pairs(unchanged, lookups))
+        if not items:
+            result.dedup_seconds = time.perf_counter() - phase
+            db.session.commit()
+            return
+        mains = _resolve_shop_mains(items)
+        for idx, (item, main) in enumerate(zip(items, mains, strict=True)):
+            if (main.status or "").lower() != "active":
+                logger.warning(
+                    "Skipping rates for non-active shop_main=%s status=%s source=%s",
+                    main.canonical_name,
+                    main.status,
+                    item["source"],
+                )
+                mains[idx] = None
+        _ensure_variants(items, mains)
+        shops_by_main = _resolve_shops(items, mains)
+        result.dedup_seconds = time.perf_counter() - phase
+
+        phase = time.perf_counter()
+
+        all_rates = [
+            rate for item, main in zip(items, mains, strict=True) if main for rate in item["rates"]
+        ]
+        # Like repeated ensure_program calls, the last point value given for a program wins
+        point_values = {rate["program"]: rate.get("point_value_eur", 0.0) for rate in all_rates}
+        program_ids = lookups.program_ids(point_values)
+        category_ids = lookups.category_ids(rate.get("category") for rate in all_rates)
+        shop_ids = [shops_by_main[main.id] if main else None for main in mains]
+        _apply_rates(items, shop_ids, program_ids, category_ids, active_rates, now, result)
+        result.rate_seconds = time.perf_counter() - phase
+        _store_payload_hashes(items, mains, now)
+        if run_id is not None:
+            record_seen(
+                run_id,
+                (
+                    (shop_id, program_ids[rate["program"]])
+                    for item, shop_id in zip(items, shop_ids, strict=True)
+                    if shop_id is not None
+                    for rate in item["rates"]
+                ),
+            )
+
+        db.session.commit()
+        active_rates.mark_committed()
+    except Exception:
+        db.session.rollback()
+        active_rates.discard_pending()
+        lookups.clear()
+        raise
+
+    result.skipped = sum(1 for main in mains if main is None)
+
+
+def ingest_program_run(
+    shops: Iterable[dict],
+    *,
+    source: str | None = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    force: bool = False,
+    result: IngestResult | None = None,
+    run_id: str | None = None,
+    on_error: Callable[[Any, Exception], None] | None = None,
+) -> IngestResult:
+    """Ingest a complete scrape of one or more programs in batches.
+
+    `shops` is consumed lazily, `batch_size` shops at a time. The active rates
+    of every program are read once, when the program first appears, and
+    diffed in memory; each batch then only writes its expirations and inserts.
+    Counts are added to `result` batch by batch, so a caller that passes one
+    still sees what was committed when a later batch fails.
+
+    With a `run_id` the batches are numbered 1, 2, ... for the run, so sending
+    the same run again skips the batches that were already committed. The
+    caller completes the run (scrape_runs.finish_run) once all of it is in.
+
+    Without a run_id, `on_error` isolates failing shops: a batch that fails is
+    ingested again one shop per transaction, on the same active rate map and
+    lookups, and `on_error(shop, exc)` is called for every shop that still
+    fails instead of aborting the run.
+    """
+    if on_error is not None and run_id is not None:
+        raise ValueError("on_error cannot be combined with a tracked run_id")
+    total = result if result is not None else IngestResult()
+    lookups = IngestLookups()
+    active_rates = ActiveRates()
+    shops = iter(shops)
+    batch_number = 0
+    # Statements, commits and time outside the batches (program loads, reading input)
+    outside = IngestResult()
+    start = time.perf_counter()
+
+    def ingest(batch: list[dict], number: int | None) -> None:
+        program_names = {rate["program"] for shop in batch for rate in shop.get("rates", [])}
+        active_rates.load_programs(lookups.find_program_ids(program_names).values())
+        batch_result = ingest_shop_batch(
+            batch,
+            source=source,
+            active_rates=active_rates,
+            lookups=lookups,
+            force=force,
+            run_id=run_id,
+            batch_number=number,
+        )
+        total.add(batch_result)
+        outside.wall_seconds -= batch_result.wall_seconds
+
+    try:
+        with count_statements(outside):
+            while batch := list(islice(shops, batch_size)):
+                batch_number += 1
+                if on_error is None:
+                    ingest(batch, batch_number if run_id is not None else None)
+                    continue
+                try:
+                    ingest(batch, None)
+                except Exception:  # noqa: BLE001
+                    for shop in batch:
+                        try:
+                            ingest([shop], None)
+                        except Exception as e:  # noqa: BLE001
+                            on_error(shop, e)
+    finally:
+        outside.wall_seconds += time.perf_counter() - start
+        total.wall_seconds += outside.wall_seconds
+        total.statements += outside.statements
+        total.commits += outside.commits
+    return total
+
+
+def ingest_scrape_results(
+    shops: Iterable[dict], *, source: str | None = None, batch_size: int = INGEST_BATCH_SIZE
+) -> int:
+    """Persist scraped shop data; returns the number of shops processed.
+
+    `shops` may be a generator such as BaseScraper.iter_shops(); it is consumed
+    and committed `batch_size` shops at a time.
+    """
+    return ingest_program_run(shops, source=source, batch_size=batch_size).shops
@@ -7,6 +7,7 @@ from rq.job import Job
 from spo.services.scrape_queue_config import get_redis_connection
 
 DEFAULT_QUEUE_NAME = "scraper"
+DEFAULT_INGEST_QUEUE_NAME = "ingest"
 
 
 def enqueue_scrape_job(program: str, *, requested_by: str | None = None) -> str:
@@ -57,6 +58,20 @@ def enqueue_coupon_import_job(payload: dict, *, requested_by: str | None = None)
     return job.id
 
 
+def enqueue_ingest_batch(handle: str) -> str:
+    """Enqueue the ingest of a batch stored by async_ingest; the handle is the job id."""
+    queue_name = os.environ.get("SCRAPER_INGEST_QUEUE_NAME", DEFAULT_INGEST_QUEUE_NAME)
+    redis_conn = get_redis_connection()
+
+    job: Job = Queue(queue_name, connection=redis_conn).enqueue(
+        "spo.services.async_ingest.run_ingest_batch",
+        handle=handle,
+        job_id=handle,
+        job_timeout=int(os.environ.get("SCRAPER_INGEST_JOB_TIMEOUT", "600")),
+    )
+    return job.id
+
+
 def get_rq_job_status(job_id: str) -> dict | None:
     """Fetch basic status information for an RQ job by id.
 
@@ -0,0 +1,307 @@
+"""Tracking of scrape runs that are posted in numbered batches.
+
+Workers send every batch of a run with its run_id and batch_info
+(batch_number, plus total_batches or total_shops at least on the last batch;
+workers that send while still crawling only know the totals at the end).
+Ingest records each batch in scrape_run_batches in the same transaction that
+writes its rates, so a batch that is retried after a timeout, or re-sent
+when a crashed run is resumed, is recognised and skipped. The (shop, program) pairs a run reports,
+including shops skipped because their payload is unchanged, are collected in
+scrape_run_shops.
+
+Once every batch of a run has arrived the run is completed. Only a full run
+(batch_info "full_run": true, sent by scrape jobs that crawl a whole
+program) then expires stale rates: active rates of the run's programs for
+shops the run did not report are expired with one UPDATE, and the payload
+hashes of those shops are dropped in the same transaction. Partial runs such
+as imports, and runs that never complete, expire nothing. Runs that stay
+incomplete without a new batch for SCRAPER_RUN_TTL seconds are abandoned and
+pruned, with their batches and reported shops, when a new run starts.
+"""
+
+import os
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, exists, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from spo.extensions import db
+from spo.models import (
+    ScrapePayloadHash,
+    ScrapeRun,
+    ScrapeRunBatch,
+    ScrapeRunShop,
+    Shop,
+    ShopMain,
+    ShopProgramRate,
+    ShopVariant,
+    utcnow,
+)
+from spo.services.ingest_lookups import insert_ignoring_conflicts
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+DEFAULT_RUN_TTL = 172800
+
+
+def _positive_int(value) -> int | None:
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def batch_number_of(batch_info) -> int | None:
+    """The batch_number of a worker's batch_info, or None if it has none."""
+    if not isinstance(batch_info, dict):
+        return None
+    return _positive_int(batch_info.get("batch_number"))
+
+
+def register_run(run_id: str, source: str, batch_info=None) -> None:
+    """Create the run if it is new and record the totals and full_run flag of `batch_info`.
+
+    The first batch of a run also prunes abandoned runs. Does not commit; the
+    rows become part of the caller's transaction.
+    """
+    if batch_number_of(batch_info) == 1:
+        prune_abandoned_runs()
+    full_run = isinstance(batch_info, dict) and batch_info.get("full_run") is True
+    insert_ignoring_conflicts(
+        ScrapeRun,
+        [
+            {
+                "run_id": run_id,
+                "source": source,
+                "status": RUN_RUNNING,
+                "full_run": full_run,
+                "created_at": utcnow(),
+            }
+        ],
+        ["run_id"],
+    )
+    if isinstance(batch_info, dict):
+        totals = {
+            key: value
+            for key in ("total_batches", "total_shops")
+            if (value := _positive_int(batch_info.get(key))) is not None
+        }
+        if full_run:
+            totals["full_run"] = True
+        if totals:
+            db.session.execute(update(ScrapeRun).where(ScrapeRun.run_id == run_id).values(**totals))
+
+
+def _run_ttl() -> int:
+    return int(os.environ.get("SCRAPER_RUN_TTL", str(DEFAULT_RUN_TTL)))
+
+
+def prune_abandoned_runs(now=None) -> int:
+    """Delete running runs without a batch for SCRAPER_RUN_TTL seconds.
+
+    Such runs never complete, so their batches and reported shops are deleted
+    with them. Does not commit. Returns the number of pruned runs.
+    """
+    cutoff = (now or utcnow()) - timedelta(seconds=_run_ttl())
+    recent_batch = exists().where(
+        ScrapeRunBatch.run_id == ScrapeRun.run_id, ScrapeRunBatch.received_at >= cutoff
+    )
+    run_ids = (
+        db.session.execute(
+            select(ScrapeRun.run_id).where(
+                ScrapeRun.status == RUN_RUNNING, ScrapeRun.created_at < cutoff, ~recent_batch
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if run_ids:
+        for model in (ScrapeRunShop, ScrapeRunBatch, ScrapeRun):
+            db.session.execute(
+                delete(model)
+                .where(model.run_id.in_(run_ids))
+                .execution_options(synchronize_session=False)
+            )
+    return len(run_ids)
+
+
+def claim_batch(run_id: str, batch_number: int, shop_count: int, now) -> bool:
+    """Record a batch as received; False if it was received before."""
+    already_received = db.session.execute(
+        select(
+            exists().where(
+                ScrapeRunBatch.run_id == run_id, ScrapeRunBatch.batch_number == batch_number
+            )
+        )
+    ).scalar()
+    if already_received:
+        return False
+    try:
+        # A concurrent retry of the same batch blocks on the unique index and fails here
+        with db.session.begin_nested():
+            db.session.add(
+                ScrapeRunBatch(
+                    run_id=run_id, batch_number=batch_number, shop_count=shop_count, received_at=now
+                )
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def record_seen(run_id: str, pairs) -> None:
+    """Record (shop_id, program_id) pairs reported by a run."""
+    insert_ignoring_conflicts(
+        ScrapeRunShop,
+        [
+            {"run_id": run_id, "shop_id": shop_id, "program_id": program_id}
+            for shop_id, program_id in sorted(set(pairs))
+        ],
+        ["run_id", "shop_id", "program_id"],
+    )
+
+
+def _stale_rate_conditions(run_id: str) -> list:
+    """Active rates of the run's programs for active shops the run did not report."""
+    run_programs = select(ScrapeRunShop.program_id).where(ScrapeRunShop.run_id == run_id)
+    active_shops = (
+        select(Shop.id)
+        .join(ShopMain, Shop.shop_main_id == ShopMain.id)
+        .where(func.lower(ShopMain.status) == "active")
+    )
+    reported = exists().where(
+        and_(
+            ScrapeRunShop.run_id == run_id,
+            ScrapeRunShop.shop_id == ShopProgramRate.shop_id,
+            ScrapeRunShop.program_id == ShopProgramRate.program_id,
+        )
+    )
+    return [
+        ShopProgramRate.valid_to.is_(None),
+        ShopProgramRate.program_id.in_(run_programs),
+        ShopProgramRate.shop_id.in_(active_shops),
+        ~reported,
+    ]
+
+
+def expire_stale_rates(run_id: str, now) -> int:
+    """Expire active rates of the run's programs for active shops the run did not report.
+
+    The payload hashes of those shops' variants are deleted as well, so a shop
+    that returns in a later run with the same payload is ingested again rather
+    than skipped as unchanged.
+    """
+    conditions = _stale_rate_conditions(run_id)
+    stale_variant = (
+        select(ShopVariant.id)
+        .join(Shop, Shop.shop_main_id == ShopVariant.shop_main_id)
+        .join(ShopProgramRate, ShopProgramRate.shop_id == Shop.id)
+        .where(
+            ShopVariant.source == ScrapePayloadHash.source,
+            ShopVariant.source_id == ScrapePayloadHash.source_id,
+            *conditions,
+        )
+        .exists()
+    )
+    db.session.execute(
+        delete(ScrapePayloadHash).where(stale_variant).execution_options(synchronize_session=False)
+    )
+    stmt = (
+        update(ShopProgramRate)
+        .where(*conditions)
+        .values(valid_to=now)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).rowcount
+
+
+def complete_run_if_done(run_id: str) -> int | None:
+    """Complete the run once all of its batches arrived and expire its stale rates.
+
+    Returns the number of expired rates, or None if the run is unknown, still
+    missing batches or was completed before.
+    """
+    run = db.session.execute(
+        select(ScrapeRun).where(ScrapeRun.run_id == run_id)
+    ).scalar_one_or_none()
+    if run is None or run.status != RUN_RUNNING:
+        return None
+    received, shops = db.session.execute(
+        select(
+            func.count(ScrapeRunBatch.id), func.coalesce(func.sum(ScrapeRunBatch.shop_count), 0)
+        ).where(ScrapeRunBatch.run_id == run_id)
+    ).one()
+    if run.total_batches is not None:
+        done = received >= run.total_batches
+    else:
+        done = run.total_shops is not None and shops >= run.total_shops
+    if not done:
+        return None
+    return finish_run(run_id)
+
+
+def finish_run(run_id: str) -> int | None:
+    """Complete a run regardless of its totals, expiring stale rates if it is a full run.
+
+    Only one caller wins the status change, so concurrent last batches expire
+    stale rates once. Returns the number of expired rates (0 for partial
+    runs), or None if the run was already completed.
+    """
+    now = utcnow()
+    claimed = db.session.execute(
+        update(ScrapeRun)
+        .where(ScrapeRun.run_id == run_id, ScrapeRun.status == RUN_RUNNING)
+        .values(status=RUN_COMPLETED, completed_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return None
+    try:
+        full_run = db.session.execute(
+            select(ScrapeRun.full_run).where(ScrapeRun.run_id == run_id)
+        ).scalar()
+        expired = expire_stale_rates(run_id, now) if full_run else 0
+        db.session.execute(
+            update(ScrapeRun)
+            .where(ScrapeRun.run_id == run_id)
+            .values(rates_expired=expired)
+            .execution_options(synchronize_session=False)
+        )
+        # The pairs are only needed until the run is complete
+        db.session.execute(ScrapeRunShop.__table__.delete().where(ScrapeRunShop.run_id == run_id))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return expired
+
+
+def get_run_summary(run_id: str) -> dict | None:
+    """Progress of a tracked run, or None if the run is unknown."""
+    run = db.session.execute(
+        select(ScrapeRun).where(ScrapeRun.run_id == run_id)
+    ).scalar_one_or_none()
+    if run is None:
+        return None
+    batch_numbers = (
+        db.session.execute(
+            select(ScrapeRunBatch.batch_number)
+            .where(ScrapeRunBatch.run_id == run_id)
+            .order_by(ScrapeRunBatch.batch_number)
+        )
+        .scalars()
+        .all()
+    )
+    return {
+        "run_id": run.run_id,
+        "source": run.source,
+        "status": run.status,
+        "total_batches": run.total_batches,
+        "total_shops": run.total_shops,
+        "received_batches": batch_numbers,
+        "rates_expired": run.rates_expired,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+    }
@@ -3,9 +3,53 @@ from flask import current_app
 import scrapers.example_scraper as exs_scraper
 from spo.extensions import db
 from spo.models import ScrapeLog, Shop
+from spo.services.ingest_metrics import record_ingest_metrics
+from spo.services.scrape_ingest import ingest_program_run
 from spo.services.scrape_queue import enqueue_scrape_job
 
 
+def _shop_label(shop) -> str:
+    if isinstance(shop, dict):
+        return str(shop.get("name") or shop.get("source_id"))
+    return repr(shop)
+
+
+def _ingest_full_scrape(job, data: list[dict], source: str):
+    """Diff a complete program scrape against its active rates and report the counts.
+
+    Used by the scrapers that run in-process (LetyShops, &Charge): the
+    program's active rates are loaded once for the whole scrape. Remote
+    scrapers post batches to /api/scrape-results instead, where each batch is
+    diffed against the active rates of its own shops. A shop that fails is
+    rolled back on its own and reported; the rest is ingested.
+    """
+    failed = []
+
+    def report(shop, error: Exception) -> None:
+        failed.append(shop)
+        job.add_message(f"Fehler beim Registrieren ({_shop_label(shop)}): {error}")
+
+    result = ingest_program_run(data, source=source, on_error=report)
+    if failed:
+        job.add_message(f"{len(failed)} Shops konnten nicht registriert werden")
+    job.add_message(
+        f"Raten: {result.rates_created} neu, {result.rates_expired} abgelaufen, "
+        f"{result.rates_unchanged} unverändert"
+    )
+    # Committed together with the caller's ScrapeLog entry
+    record_ingest_metrics(result, scope="run", source=source)
+    return result
+
+
+def _rate_summary(result) -> str:
+    if result is None:
+        return ""
+    return (
+        f" (rates created={result.rates_created}, expired={result.rates_expired}, "
+        f"unchanged={result.rates_unchanged})"
+    )
+
+
 def scrape_example(job):
     with current_app.app_context():
         job.add_message("Starte Example-Scraper...")
@@ -139,25 +183,32 @@ def scrape_letyshops(job):
 
         # `fetch()` returns a list of shop dicts for this scraper; handle both list and single-dict returns.
         added = 0
-        if isinstance(data, list):
+        if isinstance(data, dict):
+            data = [data]
+        if isinstance(data, list) and data:
+            normalized = []
             for item in data:
                 try:
                     # normalize/dedupe rates before registering
                     item["rates"] = _normalize_rates(item.get("rates", []))
-                    scraper.register_to_db(item)
-                except Exception as e:
-                    job.add_message(f"Fehler beim Registrieren: {e}")
-            after_shops = Shop.query.count()
-            added = after_shops - before_shops
-        elif isinstance(data, dict):
-            scraper.register_to_db(data)
+                except Exception as e:  # noqa: BLE001
+                    job.add_message(f"Fehler beim Registrieren ({_shop_label(item)}): {e}")
+                    continue
+                normalized.append(item)
+            data = normalized
+            result = _ingest_full_scrape(job, data, scraper.__class__.__name__)
             after_shops = Shop.query.count()
             added = after_shops - before_shops
         else:
+            result = None
             job.add_message("Keine Daten zum Registrieren gefunden")
 
         job.add_message(f"Fertig: {added} Shops hinzugefügt")
-        db.session.add(ScrapeLog(message=f"LetyShops scraper finished, added {added} shops"))
+        db.session.add(
+            ScrapeLog(
+                message=f"LetyShops scraper finished, added {added} shops{_rate_summary(result)}"
+            )
+        )
         db.session.commit()
 
         job.set_progress(100, 100)
@@ -185,23 +236,22 @@ def scrape_and_charge(job):
         job.set_progress(60, 100)
 
         added = 0
-        if isinstance(data, list):
-            for item in data:
-                try:
-                    scraper.register_to_db(item)
-                except Exception as e:
-                    job.add_message(f"Fehler beim Registrieren: {e}")
-            after_shops = Shop.query.count()
-            added = after_shops - before_shops
-        elif isinstance(data, dict):
-            scraper.register_to_db(data)
+        if isinstance(data, dict):
+            data = [data]
+        if isinstance(data, list) and data:
+            result = _ingest_full_scrape(job, data, scraper.__class__.__name__)
             after_shops = Shop.query.count()
             added = after_shops - before_shops
         else:
+            result = None
             job.add_message("Keine Daten zum Registrieren gefunden")
 
         job.add_message(f"Fertig: {added} Shops hinzugefügt")
-        db.session.add(ScrapeLog(message=f"AndCharge scraper finished, added {added} shops"))
+        db.session.add(
+            ScrapeLog(
+                message=f"AndCharge scraper finished, added {added} shops{_rate_summary(result)}"
+            )
+        )
         db.session.commit()
 
         job.set_progress(100, 100)
@@ -1,4 +1,6 @@
 import os
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from typing import Any
 
 import requests
@@ -28,61 +30,113 @@ def _get_api_token() -> str | None:
     return os.environ.get("SCRAPER_API_TOKEN")
 
 
-def _post_results(payload: dict[str, Any]) -> None:
-    api_base = _get_api_base_url().rstrip("/")
-    url = f"{api_base}/api/scrape-results"
-    headers = {"Content-Type": "application/json"}
+def _api_headers(content_type: str) -> dict[str, str]:
     token = _get_api_token()
     if not token:
         raise RuntimeError("SCRAPER_API_TOKEN is not set")
-    headers["X-Scraper-Token"] = token
+    return {"Content-Type": content_type, "X-Scraper-Token": token}
+
+
+def _post_results(payload: dict[str, Any]) -> None:
+    api_base = _get_api_base_url().rstrip("/")
+    url = f"{api_base}/api/scrape-results"
+    headers = _api_headers("application/json")
     timeout = int(os.environ.get("SCRAPER_API_TIMEOUT", "120"))
     resp = requests.post(url, json=payload, headers=headers, timeout=timeout)
     resp.raise_for_status()
 
 
+def _with_source(shops: Iterable[dict], source: str) -> Iterator[dict]:
+    """Add `source` to each shop dict that has none, as the shops go by."""
+    for item in shops:
+        if isinstance(item, dict) and "source" not in item:
+            item["source"] = source
+        yield item
+
+
+class _Counter:
+    """Pass items through while counting them."""
+
+    def __init__(self, items: Iterable):
+        self.items = items
+        self.count = 0
+
+    def __iter__(self):
+        for item in self.items:
+            self.count += 1
+            yield item
+
+
+def _iter_batches(shops: Iterable[dict], batch_size: int) -> Iterator[tuple[list[dict], bool]]:
+    """Yield (batch, is_last) pairs, reading one batch ahead to know which is last."""
+    shops = iter(shops)
+    batch = list(islice(shops, batch_size))
+    while batch:
+        following = list(islice(shops, batch_size))
+        yield batch, not following
+        batch = following
+
+
+def _send_batches(
+    program: str,
+    shops: Iterable[dict],
+    run_id: str | None,
+    requested_by: str | None,
+    full_run: bool,
+) -> dict:
+    """Post shops in SCRAPER_BATCH_SIZE batches as they fill, one short request each.
+
+    Only the current and the next batch are held in memory. The totals of the
+    run are not known before the input ends, so they are sent with the last
+    batch; ingest completes the run once all batches up to it are in. Only a
+    `full_run` (a crawl of the whole program) expires the rates of shops it
+    did not send when it completes.
+    """
+    counter = _Counter(shops)
+    # Send results in batches to avoid timeouts
+    batch_size = int(os.environ.get("SCRAPER_BATCH_SIZE", "50"))
+    batch_count = 0
+    for batch, is_last in _iter_batches(counter, batch_size):
+        batch_count += 1
+        batch_info = {
+            "batch_number": batch_count,
+            "batch_size": len(batch),
+            "full_run": full_run,
+        }
+        if is_last:
+            batch_info["total_shops"] = counter.count
+            batch_info["total_batches"] = batch_count
+        _post_results(
+            {
+                "run_id": run_id,
+                "program": program,
+                "requested_by": requested_by,
+                "shops": batch,
+                "batch_info": batch_info,
+            }
+        )
+
+    return {"count": counter.count, "batches": batch_count}
+
+
 def run_scrape_job(program: str, run_id: str | None = None, requested_by: str | None = None):
-    """Run scraper for program and send results back to API in batches."""
+    """Run scraper for program and send its shops to the API while it is crawling."""
     program_key = program.lower().strip()
     scraper_cls = SCRAPER_MAP.get(program_key)
     if not scraper_cls:
         raise ValueError(f"Unsupported program: {program}")
 
     scraper = scraper_cls()
-    if not hasattr(scraper, "fetch"):
-        raise ValueError(f"Scraper does not support fetch(): {program}")
-
-    data = scraper.fetch() or []
+    if not hasattr(scraper, "iter_shops"):
+        raise ValueError(f"Scraper does not support iter_shops(): {program}")
 
     # Add source to each shop if missing
-    source_name = scraper.__class__.__name__
-    for item in data:
-        if "source" not in item:
-            item["source"] = source_name
-
-    # Send results in batches to avoid timeouts
-    batch_size = int(os.environ.get("SCRAPER_BATCH_SIZE", "50"))
-    total_shops = len(data)
-    batch_count = 0
-
-    for i in range(0, total_shops, batch_size):
-        batch = data[i : i + batch_size]
-        batch_count += 1
-
-        payload = {
-            "run_id": run_id,
-            "program": program_key,
-            "requested_by": requested_by,
-            "shops": batch,
-            "batch_info": {
-                "batch_number": batch_count,
-                "batch_size": len(batch),
-                "total_shops": total_shops,
-            },
-        }
-        _post_results(payload)
-
-    return {"count": total_shops, "batches": batch_count}
+    shops = _with_source(scraper.iter_shops(), scraper.__class__.__name__)
+    # A crawl can take hours: post batches as they fill rather than holding
+    # one request (and an API worker) open for the whole crawl
+    result = _send_batches(program_key, shops, run_id, requested_by, full_run=True)
+    result["http"] = scraper.http_stats()
+    return result
 
 
 def run_import_job(
@@ -102,33 +156,11 @@ def run_import_job(
     if not isinstance(shops, list):
         raise ValueError("import_payload.shops must be a list")
 
-    # Ensure source is present on all shops
-    for item in shops:
-        if isinstance(item, dict) and "source" not in item:
-            item["source"] = source
-
-    batch_size = int(os.environ.get("SCRAPER_BATCH_SIZE", "50"))
-    total_shops = len(shops)
-    batch_count = 0
-
-    for i in range(0, total_shops, batch_size):
-        batch = shops[i : i + batch_size]
-        batch_count += 1
-
-        payload = {
-            "run_id": run_id,
-            "program": program.lower(),
-            "requested_by": requested_by,
-            "shops": batch,
-            "batch_info": {
-                "batch_number": batch_count,
-                "batch_size": len(batch),
-                "total_shops": total_shops,
-            },
-        }
-        _post_results(payload)
-
-    return {"count": total_shops, "batches": batch_count}
+    # Ensure source is present on all shops. An import may cover only part of a
+    # program, so it must not expire the rates of shops it does not contain
+    return _send_batches(
+        program.lower(), _with_source(shops, source), run_id, requested_by, full_run=False
+    )
 
 
 def run_coupon_import_job(
@@ -180,11 +212,7 @@ def run_coupon_import_job(
 
         api_base = _get_api_base_url().rstrip("/")
         url = f"{api_base}/api/coupon-import"
-        headers = {"Content-Type": "application/json"}
-        token = _get_api_token()
-        if not token:
-            raise RuntimeError("SCRAPER_API_TOKEN is not set")
-        headers["X-Scraper-Token"] = token
+        headers = _api_headers("application/json")
         timeout = int(os.environ.get("SCRAPER_API_TIMEOUT", "120"))
         resp = requests.post(url, json=payload, headers=headers, timeout=timeout)
         resp.raise_for_status()
@@ -8,6 +8,9 @@ from spo.models import (
     Coupon,
     Proposal,
     ProposalAuditTrail,
+    ScrapeRun,
+    ScrapeRunBatch,
+    ScrapeRunShop,
     Shop,
     ShopMain,
     ShopMergeProposal,
@@ -135,6 +138,11 @@ def test_clear_shops_with_all_foreign_keys(client, admin_user):
     )
     db.session.add(coupon)
 
+    # 12. Create an unfinished scrape run (ScrapeRunShop references Shop)
+    db.session.add(ScrapeRun(run_id="open-run", source="test", status="running"))
+    db.session.add(ScrapeRunBatch(run_id="open-run", batch_number=1, shop_count=1))
+    db.session.add(ScrapeRunShop(run_id="open-run", shop_id=shop.id, program_id=program.id))
+
     db.session.commit()
 
     # Verify data exists
@@ -147,6 +155,7 @@ def test_clear_shops_with_all_foreign_keys(client, admin_user):
     assert ShopMetadataProposal.query.count() == 1
     assert ShopMergeProposal.query.count() == 1
     assert Coupon.query.count() == 1
+    assert ScrapeRunShop.query.count() == 1
 
     # Call clear_shops endpoint
     response = client.post("/admin/clear_shops", headers={"Accept": "application/json"})
@@ -166,6 +175,9 @@ def test_clear_shops_with_all_foreign_keys(client, admin_user):
     assert ShopMetadataProposal.query.count() == 0
     assert ShopMergeProposal.query.count() == 0
     assert Coupon.query.count() == 0
+    assert ScrapeRun.query.count() == 0
+    assert ScrapeRunBatch.query.count() == 0
+    assert ScrapeRunShop.query.count() == 0
 
     # BonusProgram should remain (not deleted)
     assert BonusProgram.query.count() == 1
@@ -28,8 +28,10 @@ def test_parse_sample_partner():
 def test_fetch_makes_requests(monkeypatch):
     calls = []
 
-    def fake_get(url, params=None, timeout=None):
+    def fake_request(method, url, params=None, timeout=None):
         class R:
+            status_code = 200
+
             def raise_for_status(self):
                 return None
 
@@ -39,8 +41,8 @@ def test_fetch_makes_requests(monkeypatch):
         calls.append((url, params))
         return R()
 
-    monkeypatch.setattr("requests.get", fake_get)
     s = AndChargeScraper()
+    monkeypatch.setattr(s.http.session, "request", fake_request)
     res = s.fetch()
     assert isinstance(res, list)
     assert len(res) >= 1
@@ -0,0 +1,117 @@
+import uuid
+
+from sqlalchemy import event
+
+from spo.extensions import db
+from spo.models import BonusProgram, Coupon, Shop, ShopMain, ShopVariant
+
+
+def _create_shop(name: str, variant: str | None = None) -> int:
+    shop_main = ShopMain(canonical_name=name, canonical_name_lower=name.lower(), status="active")
+    shop_main.id = str(uuid.uuid4())
+    db.session.add(shop_main)
+    if variant:
+        db.session.add(ShopVariant(shop_main_id=shop_main.id, source="Test", source_name=variant))
+    shop = Shop(name=name, shop_main_id=shop_main.id)
+    db.session.add(shop)
+    db.session.commit()
+    return shop.id
+
+
+def _post(client, coupons, program="Payback"):
+    payload = {"coupons": coupons, "run_id": "c1"}
+    if program:
+        payload["program"] = program
+    return client.post("/api/coupon-import", json=payload, headers={"X-Scraper-Token": "secret"})
+
+
+def _active(shop_id):
+    return {
+        coupon.name: coupon.value
+        for coupon in Coupon.query.filter_by(shop_id=shop_id, status="active").all()
+    }
+
+
+def test_coupon_import_resolves_merchants_and_supersedes_coupons(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    with app.app_context():
+        db.session.add(BonusProgram(name="Payback", point_value_eur=0.01))
+        db.session.commit()
+        zalando = _create_shop("Zalando", variant="Zalando DE")
+        otto = _create_shop("OTTO")
+
+    response = _post(
+        client,
+        [
+            {"merchant": "  zalando ", "title": "10% Rabatt", "value": 10},
+            {"merchant": "zalando de", "title": "Gratis Versand", "value": 5},
+            {"merchant": "Otto", "title": "5 EUR", "value": "5"},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.get_json()["ingested"] == 3
+
+    response = _post(
+        client,
+        [
+            {"merchant": "Zalando", "title": "10% Rabatt", "value": 15},
+            {"shop_id": otto, "title": "5 EUR", "value": 6},
+            {"shop_id": otto, "title": "5 EUR", "value": 7},
+        ],
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert _active(zalando) == {"10% Rabatt": 15, "Gratis Versand": 5}
+        # The last coupon of a (shop, name) pair in a batch is the active one
+        assert _active(otto) == {"5 EUR": 7}
+        assert Coupon.query.filter_by(status="inactive").count() == 3
+
+
+def test_coupon_import_keeps_programs_apart_and_reports_missing_shops(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    with app.app_context():
+        db.session.add(BonusProgram(name="Payback", point_value_eur=0.01))
+        db.session.commit()
+        shop_id = _create_shop("Lidl")
+
+    assert _post(client, [{"merchant": "Lidl", "title": "Deal"}]).status_code == 200
+    assert _post(client, [{"merchant": "Lidl", "title": "Deal"}], program=None).status_code == 200
+
+    response = _post(client, [{"merchant": "Lidl", "title": "Deal"}, {"merchant": "Nowhere"}])
+    assert response.status_code == 400
+    assert response.get_json()["missing_shops"] == ["Nowhere"]
+
+    with app.app_context():
+        assert Coupon.query.filter_by(shop_id=shop_id, status="active").count() == 2
+
+
+def test_coupon_import_statement_count_does_not_grow_with_batch(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    with app.app_context():
+        db.session.add(BonusProgram(name="Payback", point_value_eur=0.01))
+        db.session.commit()
+        names = [f"Shop {idx}" for idx in range(30)]
+        for name in names:
+            _create_shop(name)
+
+    def count_statements(coupons):
+        statements = []
+        with app.app_context():
+            engine = db.engine
+
+        def before_execute(*args):
+            statements.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", before_execute)
+        try:
+            assert _post(client, coupons).status_code == 200
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+        return len(statements)
+
+    # The first import builds the merchant map; later ones only check that it is fresh
+    count_statements([{"merchant": names[0], "title": "Warm"}])
+    small = count_statements([{"merchant": name, "title": "A"} for name in names[:3]])
+    large = count_statements([{"merchant": name, "title": "A"} for name in names])
+    assert large == small
@@ -2,6 +2,7 @@
 Tests for fuzzy matching normalization and confidence scoring.
 """
 
+from spo.services import dedup
 from spo.services.dedup import fuzzy_match_score
 
 
@@ -24,3 +25,30 @@ def test_generic_tokens_removed():
 
 def test_noise_punctuation_whitespace():
     assert fuzzy_match_score("media-markt", "  media  markt  ") >= 98.0
+
+
+def test_parallel_pair_scoring_matches_sequential(monkeypatch):
+    names = [dedup.normalize_shop_name(n) for n in ["Media Markt", "mediamarkt.de", "Saturn"]]
+    names += [f"shop {i} online" for i in range(40)]
+    pairs = [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+    sequential = dedup._score_candidate_pairs(names, pairs, 90.0)
+
+    monkeypatch.setattr(dedup, "DEDUP_CHUNK_SIZE", 50)
+    monkeypatch.setattr(dedup, "DEDUP_PARALLEL_MIN_PAIRS", 0)
+    progress = []
+    parallel = dedup._score_candidate_pairs(
+        names, pairs, 90.0, workers=2, progress=lambda done, total: progress.append(total)
+    )
+
+    assert parallel == sequential
+    assert (0, 1, 100.0) in parallel
+    assert len(progress) == len(range(0, len(pairs), 50))
+
+
+def test_score_cutoff_rejects_low_pairs_and_keeps_exact_scores():
+    full = fuzzy_match_score("Douglas", "Douglas Parfümerie Shop")
+    assert fuzzy_match_score("Douglas", "Douglas Parfümerie Shop", score_cutoff=full) == full
+    assert fuzzy_match_score("Douglas", "Douglas Parfümerie Shop", score_cutoff=full + 0.1) == 0.0
+    # Length bound alone rules this pair out
+    assert fuzzy_match_score("Otto", "Ottonova Krankenversicherung", score_cutoff=70.0) == 0.0
+    assert fuzzy_match_score("MediaMarkt", "Media Markt", score_cutoff=99.0) == 100.0
@@ -0,0 +1,129 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers.http_cache import ResponseCache
+from scrapers.http_client import HttpClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Serves /page/<n> with an ETag and answers matching If-None-Match with 304."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("If-None-Match")))
+        body = server.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"{hash(body) & 0xFFFFFFFF:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.pages = {"/page/1": b"<p>one</p>", "/page/2": b"<p>two</p>" * 50}
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_revalidates_and_reuses_parsed_result(stub_server, tmp_path):
+    server, base = stub_server
+    parsed = []
+
+    def parse(html):
+        parsed.append(html)
+        return {"text": html}
+
+    def crawl():
+        client = HttpClient(cache=ResponseCache(tmp_path))
+        resp = client.get(f"{base}/page/1")
+        resp.raise_for_status()
+        return client, resp, client.parse(resp, parse)
+
+    client, resp, result = crawl()
+    assert not resp.from_cache
+    assert result == {"text": "<p>one</p>"}
+
+    # A later run revalidates, gets a 304 and does not parse again
+    client, resp, result = crawl()
+    assert resp.from_cache and resp.status_code == 200
+    assert resp.text == "<p>one</p>"
+    assert result == {"text": "<p>one</p>"}
+    assert len(parsed) == 1
+    assert server.requests[1][1] == resp.headers["ETag"]
+    stats = client.stats()["total"]
+    assert (stats["not_modified"], stats["parse_reused"]) == (1, 1)
+
+    # A changed page is downloaded and parsed again
+    server.pages["/page/1"] = b"<p>uno</p>"
+    client, resp, result = crawl()
+    assert not resp.from_cache
+    assert result == {"text": "<p>uno</p>"}
+    assert len(parsed) == 2
+
+
+def test_max_age_serves_without_request(stub_server, tmp_path):
+    server, base = stub_server
+    client = HttpClient(cache=ResponseCache(tmp_path, max_age=3600))
+
+    assert client.get(f"{base}/page/1").text == "<p>one</p>"
+    resp = client.get(f"{base}/page/1")
+
+    assert resp.from_cache and resp.text == "<p>one</p>"
+    assert len(server.requests) == 1
+    assert client.stats()["total"]["cache_hits"] == 1
+
+
+def test_evicts_least_recently_used_entries(stub_server, tmp_path):
+    server, base = stub_server
+    cache = ResponseCache(tmp_path, max_bytes=600)
+    client = HttpClient(cache=cache)
+
+    client.get(f"{base}/page/1")
+    client.get(f"{base}/page/2")  # 500 bytes: both still fit
+    assert len(list(tmp_path.glob("*.body"))) == 2
+
+    server.pages["/page/3"] = b"<p>three</p>" * 20  # 240 bytes
+    client.get(f"{base}/page/3")
+
+    # Least recently used entries go first until the bodies fit again
+    bodies = sorted(path.stat().st_size for path in tmp_path.glob("*.body"))
+    assert bodies == [240]
+    assert client.get(f"{base}/page/1").from_cache is False
+
+
+def test_store_scans_directory_only_when_over_budget(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, max_bytes=1000)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+    for i in range(5):
+        cache.store(f"key{i}", f"https://example.test/{i}", b"x" * 150, {}, None)
+    assert len(scans) == 1  # the initial count only
+
+    cache.store("key5", "https://example.test/5", b"x" * 300, {}, None)
+    assert len(scans) == 2
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.body")) <= 900
+    assert cache._total_bytes == sum(path.stat().st_size for path in tmp_path.glob("*.body"))
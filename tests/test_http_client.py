@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from scrapers.http_client import HttpClient
+
+
+def _response(status_code, body=b"ok", headers=None):
+    return Mock(status_code=status_code, content=body, headers=headers or {})
+
+
+def test_retries_retryable_statuses_with_backoff(monkeypatch):
+    sleeps = []
+    client = HttpClient(max_retries=3, backoff=1.0, sleep=sleeps.append)
+    responses = [
+        _response(503),
+        _response(429, headers={"Retry-After": "7"}),
+        _response(200, b"done"),
+    ]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs["timeout"]))
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+
+    resp = client.get("https://shop.example/page")
+
+    assert resp.content == b"done"
+    assert calls == [("GET", "https://shop.example/page", 15)] * 3
+    # Full jitter below the exponential cap, then the server's Retry-After
+    assert 0 <= sleeps[0] <= 1.0
+    assert sleeps[1] == 7.0
+
+    stats = client.stats()
+    assert stats["hosts"]["shop.example"]["requests"] == 3
+    assert stats["total"]["retries"] == 2
+    assert stats["total"]["bytes"] == len(b"ok") * 2 + len(b"done")
+    assert stats["total"]["avg_latency_ms"] is not None
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    client = HttpClient(max_retries=2, sleep=lambda delay: None)
+
+    monkeypatch.setattr(client.session, "request", lambda *args, **kwargs: _response(502))
+    assert client.get("https://shop.example/").status_code == 502
+
+    def refuse(*args, **kwargs):
+        raise requests.ConnectionError("refused")
+
+    monkeypatch.setattr(client.session, "request", refuse)
+    with pytest.raises(requests.ConnectionError):
+        client.get("https://shop.example/")
+
+    total = client.stats()["total"]
+    assert total["requests"] == 6
+    assert total["retries"] == 4
+    assert total["failures"] == 1
+
+
+def test_caps_requests_in_flight_per_host(monkeypatch):
+    client = HttpClient(max_per_host=2)
+    lock = threading.Lock()
+    in_flight = {"a.example": 0, "b.example": 0}
+    peak = {"a.example": 0, "b.example": 0}
+
+    def slow_request(method, url, **kwargs):
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.02)
+        with lock:
+            in_flight[host] -= 1
+        return _response(200)
+
+    monkeypatch.setattr(client.session, "request", slow_request)
+    threads = [
+        threading.Thread(target=client.get, args=(f"https://{host}/{idx}",))
+        for idx in range(6)
+        for host in ("a.example", "b.example")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {"a.example": 2, "b.example": 2}
@@ -34,3 +34,66 @@ def test_parse_shops_from_html_basic():
 
     amazon = next(s for s in shops if s["source_id"] == "amazon-de")
     assert amazon["rates"] and amazon["rates"][0]["cashback_pct"] == 0.75
+
+
+def test_fetch_crawls_concurrently_in_listing_order(monkeypatch):
+    from unittest.mock import Mock
+
+    def listing(*slugs):
+        return "".join(f'<a href="/de/shops/{slug}"><h3>{slug}</h3>1 %</a>' for slug in slugs)
+
+    pages = {
+        "https://letyshops.com/de/shops?page=1": listing("alpha", "beta"),
+        "https://letyshops.com/de/shops?page=2": listing("gamma"),
+        "https://letyshops.com/de/shops/beta": (
+            "<table><tr><td>Schuhe</td><td>3 %</td></tr></table>"
+        ),
+    }
+    requested = []
+
+    def fake_request(method, url, **kwargs):
+        requested.append(url)
+        if url in pages:
+            return Mock(status_code=200, text=pages[url])
+        if "?page=" in url:
+            return Mock(status_code=404, text="")
+        return Mock(status_code=200, text="<p>no rates</p>")
+
+    scraper = LetyshopsScraper(workers=4, prefetch=3)
+    monkeypatch.setattr(scraper.http.session, "request", fake_request)
+
+    shops = scraper.fetch()
+
+    assert [shop["source_id"] for shop in shops] == ["alpha", "beta", "gamma"]
+    assert shops[0]["rates"][0]["cashback_pct"] == 1.0
+    assert shops[1]["rates"] == [
+        {
+            "program": "LetyShops",
+            "points_per_eur": 0.0,
+            "cashback_pct": 3.0,
+            "point_value_eur": 0.0,
+            "category": "Schuhe",
+        }
+    ]
+    # Every detail page is fetched once through the shared session
+    assert sorted(url for url in requested if "?page=" not in url) == [
+        "https://letyshops.com/de/shops/alpha",
+        "https://letyshops.com/de/shops/beta",
+        "https://letyshops.com/de/shops/gamma",
+    ]
+
+
+def test_fetch_stops_at_page_cap(monkeypatch):
+    from unittest.mock import Mock
+
+    scraper = LetyshopsScraper(workers=2, prefetch=2)
+    scraper.MAX_PAGES = 3
+    monkeypatch.setattr(scraper, "fetch_shop_detail", lambda source_id: [])
+
+    def fake_request(method, url, **kwargs):
+        page = url.rsplit("=", 1)[-1]
+        return Mock(status_code=200, text=f'<a href="/de/shops/shop-{page}"><h3>S{page}</h3></a>')
+
+    monkeypatch.setattr(scraper.http.session, "request", fake_request)
+
+    assert [shop["source_id"] for shop in scraper.fetch()] == ["shop-1", "shop-2", "shop-3"]
@@ -0,0 +1,94 @@
+import uuid
+
+from sqlalchemy import insert
+
+from spo.extensions import db
+from spo.models import Shop, ShopMain, ShopVariant
+from spo.services.merchant_resolver import merchant_resolver
+
+
+def _create_shop(name: str, shop_name: str | None = None, status: str = "active") -> int:
+    shop_main = ShopMain(canonical_name=name, canonical_name_lower=name.lower(), status=status)
+    shop_main.id = str(uuid.uuid4())
+    db.session.add(shop_main)
+    shop = Shop(name=shop_name or name, shop_main_id=shop_main.id)
+    db.session.add(shop)
+    db.session.commit()
+    return shop.id
+
+
+def test_resolve_many_applies_name_precedence(app):
+    with app.app_context():
+        legacy = _create_shop("Legacy Main", shop_name="Alpha")
+        alpha = _create_shop("Alpha")
+        beta = _create_shop("Beta")
+        db.session.add(
+            ShopVariant(
+                shop_main_id=db.session.get(Shop, beta).shop_main_id,
+                source="Test",
+                source_name="Beta  Online",
+            )
+        )
+        db.session.commit()
+
+        resolved = merchant_resolver.resolve_many(
+            ["alpha", " ALPHA ", "beta online", "Legacy Main", "Unknown", ""]
+        )
+
+        # A canonical name beats the Shop name of another shop
+        assert resolved == {
+            "alpha": alpha,
+            " ALPHA ": alpha,
+            "beta online": beta,
+            "Legacy Main": legacy,
+        }
+
+
+def test_shop_writes_invalidate_the_map(app):
+    with app.app_context():
+        assert merchant_resolver.resolve("Gamma") is None
+
+        gamma = _create_shop("Gamma")
+        assert merchant_resolver.resolve("Gamma") == gamma
+
+        # Bulk statements bypass the unit of work but are caught as well
+        db.session.execute(
+            insert(ShopVariant),
+            [
+                {
+                    "shop_main_id": db.session.get(Shop, gamma).shop_main_id,
+                    "source": "Test",
+                    "source_name": "Gamma Store",
+                }
+            ],
+        )
+        db.session.commit()
+        assert merchant_resolver.resolve("gamma store") == gamma
+
+        legacy = db.session.get(Shop, gamma)
+        legacy.name = "Gamma Legacy"
+        db.session.get(ShopMain, legacy.shop_main_id).canonical_name_lower = "gamma renamed"
+        db.session.commit()
+        assert merchant_resolver.resolve("gamma renamed") == gamma
+
+
+def test_suggestions_and_shop_names(app):
+    with app.app_context():
+        delta = _create_shop("Delta Sport")
+        _create_shop("Delta Mode")
+        _create_shop("Delta Hidden", status="merged")
+        db.session.add(
+            ShopVariant(
+                shop_main_id=db.session.get(Shop, delta).shop_main_id,
+                source="Test",
+                source_name="Epsilon Outlet",
+            )
+        )
+        db.session.commit()
+
+        suggestions = merchant_resolver.suggestions_many(["delta", "outlet", "zeta"], limit=1)
+
+        assert suggestions["delta"] == [{"id": delta + 1, "name": "Delta Mode"}]
+        assert suggestions["outlet"] == [{"id": delta, "name": "Delta Sport"}]
+        assert suggestions["zeta"] == []
+        assert merchant_resolver.shop_names([delta, 999]) == {delta: "Delta Sport"}
@@ -126,3 +126,68 @@ def test_admin_toggle_scheduled_job(app, client, session):
         client.post(f"/admin/scheduled_jobs/{job_id}/toggle", follow_redirects=True)
         job = db.session.get(ScheduledJob, job_id)
         assert job.enabled is True
+
+
+def test_scheduled_job_params_passed_to_job_function(app, session, monkeypatch):
+    """Test job_params are forwarded as keyword arguments to the job function."""
+    from spo.models import ScheduledJobRun
+    from spo.services import scheduler
+
+    with app.app_context():
+        job = ScheduledJob(
+            job_name="dedup_params",
+            job_type="deduplication",
+            cron_expression="0 2 * * *",
+            job_params={"workers": 4},
+        )
+        session.add(job)
+        session.commit()
+        run = ScheduledJobRun(scheduled_job_id=job.id, status="queued")
+        session.add(run)
+        session.commit()
+
+        received = {}
+        monkeypatch.setattr("spo.create_app", lambda **kwargs: app)
+        scheduler._run_scheduled_job(
+            None, job.id, run.id, lambda job_wrapper, **kwargs: received.update(kwargs)
+        )
+
+        assert received == {"workers": 4}
+        db.session.refresh(run)
+        assert run.status == "success"
+
+
+def test_scheduled_job_params_filtered_by_signature(app, session, monkeypatch):
+    """Test jobs only receive the configured parameters they declare."""
+    from spo.models import ScheduledJobRun
+    from spo.services import scheduler
+
+    with app.app_context():
+        job = ScheduledJob(
+            job_name="scrape_params",
+            job_type="scrape_example",
+            cron_expression="0 2 * * *",
+            job_params={"workers": 4},
+        )
+        session.add(job)
+        session.commit()
+        run = ScheduledJobRun(scheduled_job_id=job.id, status="queued")
+        session.add(run)
+        session.commit()
+
+        calls = []
+        monkeypatch.setattr("spo.create_app", lambda **kwargs: app)
+        scheduler._run_scheduled_job(None, job.id, run.id, lambda job_wrapper: calls.append(1))
+
+        assert calls == [1]
+        db.session.refresh(run)
+        assert run.status == "success"
+
+
+def test_unsupported_job_params(app):
+    """Test parameters are checked against the registered job function."""
+    from spo.services.scheduler import unsupported_job_params
+
+    assert unsupported_job_params("deduplication", {"workers": 2}) == []
+    assert unsupported_job_params("scrape_example", {"workers": 2}) == ["workers"]
+    assert unsupported_job_params("unknown", {"workers": 2}) == []
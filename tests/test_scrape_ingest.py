@@ -0,0 +1,754 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from scrapers.base import BaseScraper
+from spo.extensions import db
+from spo.models import (
+    BonusProgram,
+    IngestMetric,
+    ScrapeLog,
+    ScrapeRun,
+    ScrapeRunBatch,
+    ScrapeRunShop,
+    Shop,
+    ShopCategory,
+    ShopMain,
+    ShopProgramRate,
+    ShopVariant,
+    utcnow,
+)
+from spo.services import async_ingest
+from spo.services.scrape_ingest import ActiveRates, ingest_program_run, ingest_shop_batch
+
+
+class DummyScraper(BaseScraper):
+    def fetch(self):
+        return []
+
+
+def _batches():
+    first = [
+        {
+            "name": "Alpha Shop",
+            "source_id": "a1",
+            "rates": [
+                {"program": "Payback", "points_per_eur": 1.0, "point_value_eur": 0.005},
+                {"program": "Shoop", "cashback_pct": 2.0, "category": "Mode"},
+            ],
+        },
+        {
+            "name": "Beta Markt",
+            "source_id": 2,
+            "rates": [{"program": "Payback", "points_per_eur": 3.0, "rate_type": "contract"}],
+        },
+        # Same shop spelled differently in the same batch
+        {"name": "Alpha-Shop", "source_id": "a2", "rates": []},
+    ]
+    second = [
+        {
+            "name": "Alpha Shop",
+            "source_id": "a1",
+            "rates": [
+                {"program": "Payback", "points_per_eur": 2.0, "point_value_eur": 0.006},
+                {"program": "Shoop", "cashback_pct": 2.0, "category": "Mode"},
+            ],
+        },
+        {
+            "name": "Beta Markt",
+            "source_id": 2,
+            "rates": [
+                {
+                    "program": "Payback",
+                    "points_per_eur": 3.0,
+                    "rate_type": "shop",
+                    "category": "Technik",
+                },
+                # Later entry of the same batch supersedes the one above
+                {"program": "Payback", "points_per_eur": 4.0, "category": "Technik"},
+            ],
+        },
+        {"name": "Gamma Reisen", "rates": [{"program": "MilesAndMore", "points_per_eur": 1}]},
+    ]
+    return first, second
+
+
+def _snapshot():
+    shop_names = {shop.id: shop.name for shop in Shop.query.all()}
+    programs = {p.id: (p.name, p.point_value_eur) for p in BonusProgram.query.all()}
+    categories = {c.id: c.name for c in ShopCategory.query.all()}
+    rates = sorted(
+        (
+            (
+                shop_names[r.shop_id],
+                programs[r.program_id][0],
+                categories.get(r.category_id),
+                r.points_per_eur,
+                r.cashback_pct,
+                r.rate_type,
+                r.valid_to is None,
+            )
+            for r in ShopProgramRate.query.all()
+        ),
+        key=repr,
+    )
+    variants = sorted(
+        (
+            (v.main_shop.canonical_name, v.source, v.source_id, v.source_name)
+            for v in ShopVariant.query.all()
+        ),
+        key=repr,
+    )
+    return {
+        "mains": sorted(m.canonical_name for m in ShopMain.query.all()),
+        "shops": sorted(shop_names.values()),
+        "programs": sorted(programs.values()),
+        "rates": rates,
+        "variants": variants,
+    }
+
+
+def test_batch_ingest_matches_register_to_db(app):
+    with app.app_context():
+        scraper = DummyScraper()
+        for batch in _batches():
+            for data in batch:
+                scraper.register_to_db({**data, "source": "Shoop"})
+        expected = _snapshot()
+
+        db.drop_all()
+        db.create_all()
+        results = [ingest_shop_batch(batch, source="Shoop") for batch in _batches()]
+        assert _snapshot() == expected
+
+        assert results[0].rates_created == 3
+        assert results[1].rates_created == 4
+        assert results[1].rates_expired == 3
+        assert results[1].rates_unchanged == 1
+
+
+def test_batch_ingest_commits_once_and_is_repeatable(app):
+    with app.app_context():
+        first, _ = _batches()
+        ingest_shop_batch(first, source="Shoop")
+
+        commits = []
+        listener = lambda session: commits.append(session)  # noqa: E731
+        event.listen(db.session(), "after_commit", listener)
+        try:
+            result = ingest_shop_batch(first, source="Shoop", force=True)
+        finally:
+            event.remove(db.session(), "after_commit", listener)
+
+        assert len(commits) == 1
+        assert result.rates_unchanged == 3
+        assert result.rates_created == 0
+        assert ShopVariant.query.count() == 3
+        assert ShopProgramRate.query.filter_by(valid_to=None).count() == 3
+
+
+def test_batch_ingest_skips_non_active_shop(app):
+    with app.app_context():
+        ingest_shop_batch([{"name": "Delta Store", "rates": []}], source="Payback")
+        main = ShopMain.query.one()
+        main.status = "merged"
+        db.session.commit()
+
+        result = ingest_shop_batch(
+            [{"name": "Delta Store", "rates": [{"program": "Payback", "points_per_eur": 1}]}],
+            source="Payback",
+        )
+
+        assert result.skipped == 1
+        assert ShopProgramRate.query.count() == 0
+
+
+def test_program_run_diffs_against_all_active_rates(app):
+    with app.app_context():
+        shops = [
+            {
+                "name": f"Shop {name}",
+                "source_id": name,
+                "rates": [{"program": "Payback", "points_per_eur": 1.0}],
+            }
+            for name in ("Eins", "Zwei", "Drei")
+        ]
+        first = ingest_program_run(shops, source="Payback", batch_size=2)
+        assert (first.shops, first.rates_created, first.rates_expired) == (3, 3, 0)
+
+        shops[0]["rates"][0]["points_per_eur"] = 3.0
+        shops[1]["rates"][0]["points_per_eur"] = 5.0
+        # A later batch of the same run supersedes a rate written by an earlier one
+        shops.append(
+            {
+                "name": "Shop Eins",
+                "source_id": "Eins",
+                "rates": [{"program": "Payback", "points_per_eur": 2.0}],
+            }
+        )
+        second = ingest_program_run(shops, source="Payback", batch_size=2)
+
+        assert (second.hash_hits, second.hash_misses) == (1, 3)
+        assert second.rates_unchanged == 0
+        assert second.rates_expired == 3
+        assert second.rates_created == 3
+        active = {r.points_per_eur for r in ShopProgramRate.query.filter_by(valid_to=None).all()}
+        assert active == {1.0, 2.0, 5.0}
+        assert ShopProgramRate.query.count() == 6
+
+
+def test_lookups_resolve_once_per_run(app):
+    with app.app_context():
+        scraper = DummyScraper()
+        for name in ("Epsilon", "Zeta"):
+            scraper.register_to_db(
+                {
+                    "name": name,
+                    "source": "Payback",
+                    "rates": [
+                        {"program": "Payback", "points_per_eur": 1, "category": "Mode"},
+                        {"program": "Payback", "points_per_eur": 2, "category": "Technik"},
+                    ],
+                }
+            )
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            assert scraper.lookups.program_id("Payback", 0.0) == BonusProgram.query.one().id
+            assert set(scraper.lookups.category_ids(["Mode", "Technik"])) == {"Mode", "Technik"}
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        assert not [sql for sql in statements if "FROM shop_categories" in sql]
+        assert ShopCategory.query.count() == 2
+        assert scraper.lookups.find_program_ids(["payback", "Unknown"]) == {
+            "payback": BonusProgram.query.one().id
+        }
+
+
+def test_unchanged_payloads_are_skipped_unless_forced(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    shops = [
+        {
+            "name": "Eta Moden",
+            "source_id": "eta",
+            "rates": [{"program": "Payback", "points_per_eur": 1}],
+        },
+        {
+            "name": "Theta Wein",
+            "source_id": "theta",
+            "rates": [{"program": "Payback", "points_per_eur": 2}],
+        },
+    ]
+
+    def post(payload_shops, **extra):
+        response = client.post(
+            "/api/scrape-results",
+            json={"program": "payback", "run_id": "r1", "shops": payload_shops, **extra},
+            headers={"X-Scraper-Token": "secret"},
+        )
+        assert response.status_code == 200
+        return response.get_json()
+
+    assert post(shops)["hash"] == {"hits": 0, "misses": 2}
+
+    changed = [shops[0], {**shops[1], "rates": [{"program": "Payback", "points_per_eur": 3}]}]
+    body = post(changed)
+    assert body["hash"] == {"hits": 1, "misses": 1}
+    assert body["rates"] == {"created": 1, "expired": 1, "unchanged": 0}
+
+    body = post(changed, force=True)
+    assert body["hash"] == {"hits": 0, "misses": 2}
+    assert body["rates"]["unchanged"] == 2
+
+    with app.app_context():
+        log = ScrapeLog.query.order_by(ScrapeLog.id.desc()).first()
+        assert "hash hits=0 misses=2, forced" in log.message
+
+
+def _active_payback_shops():
+    return {
+        name
+        for (name,) in db.session.query(Shop.name)
+        .join(ShopProgramRate, ShopProgramRate.shop_id == Shop.id)
+        .join(BonusProgram, BonusProgram.id == ShopProgramRate.program_id)
+        .filter(BonusProgram.name == "Payback", ShopProgramRate.valid_to.is_(None))
+    }
+
+
+def test_tracked_run_skips_retried_batches_and_expires_missing_shops(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+
+    def shop(name, points):
+        return {
+            "name": name,
+            "source_id": name.lower(),
+            "rates": [{"program": "Payback", "points_per_eur": points}],
+        }
+
+    def post(shops, **extra):
+        response = client.post(
+            "/api/scrape-results",
+            json={"program": "payback", "shops": shops, **extra},
+            headers={"X-Scraper-Token": "secret"},
+        )
+        assert response.status_code == 200
+        return response.get_json()
+
+    post([shop("Kilo", 1), shop("Lima", 1), shop("Mike", 1)])
+
+    def batch(number, shops):
+        return post(
+            shops,
+            run_id="run-17",
+            batch_info={
+                "batch_number": number,
+                "batch_size": 1,
+                "total_batches": 2,
+                "full_run": True,
+            },
+        )
+
+    # Kilo is unchanged and skipped by its hash, but still counts as reported
+    first = batch(1, [shop("Kilo", 1)])
+    assert first["hash"] == {"hits": 1, "misses": 0}
+    assert first["run"]["status"] == "running"
+
+    retry = batch(1, [shop("Kilo", 1)])
+    assert retry["duplicate_batches"] == 1
+    assert retry["ingested"] == 0
+    with app.app_context():
+        assert _active_payback_shops() == {"Kilo", "Lima", "Mike"}
+
+    last = batch(2, [shop("Lima", 2)])
+    assert last["rates"] == {"created": 1, "expired": 1, "unchanged": 0}
+    assert last["run"]["status"] == "completed"
+    assert last["run"]["received_batches"] == [1, 2]
+    assert last["run"]["rates_expired"] == 1
+    with app.app_context():
+        assert _active_payback_shops() == {"Kilo", "Lima"}
+        assert (
+            "stale rates expired=1" in ScrapeLog.query.order_by(ScrapeLog.id.desc()).first().message
+        )
+
+    # A late retry of a completed run changes nothing
+    assert batch(2, [shop("Lima", 3)])["duplicate_batches"] == 1
+    with app.app_context():
+        assert ShopProgramRate.query.filter_by(valid_to=None).count() == 2
+
+
+def test_first_batch_of_a_run_prunes_abandoned_runs(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    monkeypatch.setenv("SCRAPER_RUN_TTL", "3600")
+
+    def post(run_id, number, name):
+        response = client.post(
+            "/api/scrape-results",
+            json={
+                "program": "payback",
+                "run_id": run_id,
+                "shops": [{"name": name, "rates": [{"program": "Payback", "points_per_eur": 1}]}],
+                "batch_info": {"batch_number": number, "total_batches": 3, "full_run": True},
+            },
+            headers={"X-Scraper-Token": "secret"},
+        )
+        assert response.status_code == 200
+
+    post("stalled", 1, "Tango")
+    post("slow", 1, "Uniform")
+    with app.app_context():
+        two_hours_ago = utcnow() - timedelta(hours=2)
+        ScrapeRun.query.update({"created_at": two_hours_ago})
+        ScrapeRunBatch.query.update({"received_at": two_hours_ago})
+        db.session.commit()
+    # Still sending batches, so not abandoned
+    post("slow", 2, "Victor")
+
+    post("fresh", 1, "Whiskey")
+
+    with app.app_context():
+        assert {run.run_id for run in ScrapeRun.query} == {"slow", "fresh"}
+        assert {row.run_id for row in ScrapeRunBatch.query} == {"slow", "fresh"}
+        assert {row.run_id for row in ScrapeRunShop.query} == {"slow", "fresh"}
+
+
+def test_shop_returning_after_expiry_is_ingested_again(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    shops = [
+        {
+            "name": name,
+            "source_id": name.lower(),
+            "rates": [{"program": "Payback", "points_per_eur": 1}],
+        }
+        for name in ("November", "Oscar")
+    ]
+
+    def run(run_id, run_shops):
+        response = client.post(
+            "/api/scrape-results",
+            json={
+                "program": "payback",
+                "shops": run_shops,
+                "run_id": run_id,
+                "batch_info": {
+                    "batch_number": 1,
+                    "batch_size": 2,
+                    "total_batches": 1,
+                    "full_run": True,
+                },
+            },
+            headers={"X-Scraper-Token": "secret"},
+        )
+        assert response.status_code == 200
+        return response.get_json()
+
+    run("run-a", shops)
+    assert run("run-b", shops[:1])["run"]["rates_expired"] == 1
+
+    # Oscar's payload is unchanged, but its rate was expired, so it is not a hash hit
+    body = run("run-c", shops)
+    assert body["hash"] == {"hits": 1, "misses": 1}
+    assert body["rates"]["created"] == 1
+    with app.app_context():
+        assert _active_payback_shops() == {"November", "Oscar"}
+
+
+def test_ingest_metrics_are_recorded_per_batch_and_run(app, logged_in_admin, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    client = logged_in_admin
+    for number in (1, 2):
+        response = client.post(
+            "/api/scrape-results",
+            json={
+                "program": "payback",
+                "run_id": "run-20",
+                "shops": [
+                    {
+                        "name": f"Metric Shop {number}",
+                        "rates": [{"program": "Payback", "points_per_eur": number}],
+                    }
+                ],
+                "batch_info": {"batch_number": number, "total_batches": 2},
+            },
+            headers={"X-Scraper-Token": "secret"},
+        )
+        body = response.get_json()
+        assert body["sql"]["commits"] == 1
+        assert body["sql"]["statements"] > 0
+        assert body["timing"]["wall_seconds"] >= (
+            body["timing"]["dedup_seconds"] + body["timing"]["rate_seconds"]
+        )
+
+    with app.app_context():
+        metrics = IngestMetric.query.order_by(IngestMetric.batch_number).all()
+        assert [(m.scope, m.batch_number, m.rates_created) for m in metrics] == [
+            ("batch", 1, 1),
+            ("batch", 2, 1),
+        ]
+
+    summary = client.get("/admin/ingest_metrics?run_id=run-20").get_json()
+    assert [metric["batch_number"] for metric in summary["metrics"]] == [2, 1]
+    (run,) = summary["runs"]
+    assert run["run_id"] == "run-20"
+    assert run["batches"] == 2
+    assert run["shops"] == 2
+    assert run["rates_created"] == 2
+    assert run["commits"] == 2
+    assert run["statements"] == sum(metric["statements"] for metric in summary["metrics"])
+
+
+def test_program_run_counts_statements_once(app):
+    shops = [
+        {"name": f"Counted Shop {idx}", "rates": [{"program": "Payback", "points_per_eur": 1}]}
+        for idx in range(3)
+    ]
+    statements = []
+
+    def listener(*args):
+        statements.append(args[2])
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            result = ingest_program_run(shops, source="payback", batch_size=2)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert result.batches == 2
+    assert result.commits == 2
+    assert result.statements == len(statements)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def rpush(self, key, value):
+        self.store.setdefault(key, []).append(value)
+
+    def lrange(self, key, start, end):
+        return list(self.store.get(key, []))
+
+    def expire(self, key, ttl):
+        pass
+
+
+def test_async_ingest_returns_handle_and_reports_status(app, client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    fake_redis = _FakeRedis()
+    enqueued = []
+    monkeypatch.setattr(async_ingest, "get_redis_connection", lambda: fake_redis)
+    monkeypatch.setattr(async_ingest, "enqueue_ingest_batch", enqueued.append)
+    headers = {"X-Scraper-Token": "secret"}
+    shops = [{"name": "Kappa Sport", "rates": [{"program": "Payback", "points_per_eur": 2}]}]
+
+    response = client.post(
+        "/api/scrape-results",
+        json={
+            "program": "payback",
+            "run_id": "run-9",
+            "shops": shops,
+            "async": True,
+            "batch_info": {"batch_number": 1},
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 202
+    handle = response.get_json()["handle"]
+    assert enqueued == [handle]
+    assert client.get(f"/api/scrape-results/status/{handle}", headers=headers).json["status"] == (
+        "queued"
+    )
+    with app.app_context():
+        assert ShopMain.query.count() == 0
+        async_ingest.process_ingest_batch(handle)
+        assert ShopMain.query.one().canonical_name == "Kappa Sport"
+
+    status = client.get(f"/api/scrape-results/status/{handle}", headers=headers).get_json()
+    assert status["status"] == "completed"
+    assert status["result"]["rates_created"] == 1
+    run = client.get("/api/scrape-results/runs/run-9", headers=headers).get_json()
+    assert run["counts"] == {"completed": 1}
+    assert run["batches"][0]["batch_number"] == 1
+
+
+def test_async_ingest_rejects_invalid_batch(client, monkeypatch):
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    response = client.post(
+        "/api/scrape-results",
+        json={"program": "payback", "shops": [{"rates": []}], "async": True},
+        headers={"X-Scraper-Token": "secret"},
+    )
+    assert response.status_code == 400
+
+
+def test_scrape_job_sends_batches_while_scraper_is_crawling(app, client, monkeypatch):
+    from spo import worker_tasks
+
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    monkeypatch.setenv("SCRAPER_BATCH_SIZE", "2")
+    yielded = []
+    posted = []
+
+    class CrawlingScraper(BaseScraper):
+        def fetch(self):
+            return list(self.iter_shops())
+
+        def iter_shops(self):
+            for idx in range(5):
+                shop = {
+                    "name": f"Crawl {idx}",
+                    "source_id": str(idx),
+                    "rates": [{"program": "Payback", "points_per_eur": 1.0}],
+                }
+                yielded.append(shop["name"])
+                yield shop
+
+    def post_results(payload):
+        posted.append((len(yielded), payload["batch_info"]))
+        response = client.post(
+            "/api/scrape-results", json=payload, headers={"X-Scraper-Token": "secret"}
+        )
+        assert response.status_code == 200
+
+    monkeypatch.setitem(worker_tasks.SCRAPER_MAP, "crawler", CrawlingScraper)
+    monkeypatch.setattr(worker_tasks, "_post_results", post_results)
+
+    result = worker_tasks.run_scrape_job("crawler", run_id="crawl-1")
+
+    assert (result["count"], result["batches"]) == (5, 3)
+    # Each batch goes out once the next one is read, long before the crawl ends
+    assert [shops_read for shops_read, _ in posted] == [4, 5, 5]
+    # Totals are only known, and sent, with the last batch
+    assert [info.get("total_batches") for _, info in posted] == [None, None, 3]
+    assert posted[-1][1]["total_shops"] == 5
+    assert all(info["full_run"] for _, info in posted)
+    with app.app_context():
+        assert Shop.query.count() == 5
+        assert ScrapeLog.query.filter(ScrapeLog.message.like("Scrape run completed%")).count() == 1
+
+
+def test_ingest_scrape_results_consumes_generator_in_batches(app):
+    from spo.services.scrape_ingest import ingest_scrape_results
+
+    consumed = []
+
+    def shops():
+        for idx in range(5):
+            consumed.append(idx)
+            yield {
+                "name": f"Lazy {idx}",
+                "rates": [{"program": "Payback", "points_per_eur": 1.0}],
+            }
+
+    commits = []
+
+    def count_commit(session):
+        commits.append(len(consumed))
+
+    with app.app_context():
+        event.listen(db.session, "after_commit", count_commit)
+        try:
+            assert ingest_scrape_results(shops(), source="Lazy", batch_size=2) == 5
+        finally:
+            event.remove(db.session, "after_commit", count_commit)
+        assert Shop.query.count() == 5
+
+    # Each batch is committed before the next shops are read
+    assert commits[:3] == [2, 4, 5]
+
+
+def test_full_scrape_isolates_malformed_shops(app, monkeypatch):
+    import scrapers.and_charge_scraper as ac_scraper
+    from spo.services import scrapers
+
+    shops = [
+        {"name": f"Charge Shop {idx}", "rates": [{"program": "AndCharge", "points_per_eur": idx}]}
+        for idx in range(1, 6)
+    ]
+    # Fails when its rate is written, after the whole batch was diffed
+    shops[1]["rates"] = [{"program": "AndCharge", "points_per_eur": {"not": "a number"}}]
+    monkeypatch.setattr(ac_scraper.AndChargeScraper, "fetch", lambda self: shops)
+    program_loads = []
+    load = ActiveRates._load
+
+    def counting_load(self, query, pairs=None):
+        if pairs is None:
+            program_loads.append(query)
+        return load(self, query, pairs)
+
+    monkeypatch.setattr(ActiveRates, "_load", counting_load)
+
+    class Job:
+        messages = []
+
+        def add_message(self, message):
+            self.messages.append(message)
+
+        def set_progress(self, current, total):
+            pass
+
+    job = Job()
+    with app.app_context():
+        db.session.add(BonusProgram(name="AndCharge", point_value_eur=0.01))
+        db.session.commit()
+        assert scrapers.scrape_and_charge(job) == {"added": 4}
+        active = {
+            name
+            for (name,) in db.session.query(Shop.name)
+            .join(ShopProgramRate, ShopProgramRate.shop_id == Shop.id)
+            .filter(ShopProgramRate.valid_to.is_(None))
+        }
+    assert active == {"Charge Shop 1", "Charge Shop 3", "Charge Shop 4", "Charge Shop 5"}
+    errors = [message for message in job.messages if message.startswith("Fehler")]
+    assert len(errors) == 1 and "Charge Shop 2" in errors[0]
+    # The shops of the failed batch are retried on the rates loaded for it
+    assert len(program_loads) == 1
+
+    # Rates the failed batch had diffed are read again before the retry
+    for shop in shops[2:] + shops[:1]:
+        shop["rates"][0]["points_per_eur"] += 10
+    with app.app_context():
+        scrapers.scrape_and_charge(job)
+        assert ShopProgramRate.query.filter_by(valid_to=None).count() == 4
+        assert ShopProgramRate.query.filter(ShopProgramRate.valid_to.isnot(None)).count() == 4
+
+
+def test_import_job_posts_batches(monkeypatch):
+    from spo import worker_tasks
+
+    posted = []
+    monkeypatch.setattr(worker_tasks, "_post_results", posted.append)
+
+    result = worker_tasks.run_import_job(
+        {"program": "Shoop", "shops": [{"name": "Import Shop", "rates": []}]}
+    )
+
+    assert (result["count"], result["batches"]) == (1, 1)
+    assert posted[0]["batch_info"]["total_shops"] == 1
+    assert posted[0]["batch_info"]["full_run"] is False
+
+
+def test_import_after_full_run_keeps_rates_of_other_shops(app, client, monkeypatch):
+    from spo import worker_tasks
+
+    monkeypatch.setenv("SCRAPER_API_TOKEN", "secret")
+    monkeypatch.setenv("SCRAPER_BATCH_SIZE", "2")
+
+    def post_results(payload):
+        response = client.post(
+            "/api/scrape-results", json=payload, headers={"X-Scraper-Token": "secret"}
+        )
+        assert response.status_code == 200
+        return response.get_json()
+
+    shops = [
+        {
+            "name": name,
+            "source_id": name.lower(),
+            "rates": [{"program": "Payback", "points_per_eur": 1}],
+        }
+        for name in ("Papa", "Quebec", "Romeo", "Sierra")
+    ]
+    for number, batch in enumerate((shops[:2], shops[2:]), start=1):
+        post_results(
+            {
+                "program": "payback",
+                "run_id": "full-1",
+                "shops": batch,
+                "batch_info": {
+                    "batch_number": number,
+                    "total_batches": 2,
+                    "total_shops": 4,
+                    "full_run": True,
+                },
+            }
+        )
+
+    responses = []
+    monkeypatch.setattr(
+        worker_tasks, "_post_results", lambda payload: responses.append(post_results(payload))
+    )
+    imported = {**shops[0], "rates": [{"program": "Payback", "points_per_eur": 3}]}
+    worker_tasks.run_import_job({"program": "payback", "shops": [imported]}, run_id="import-1")
+
+    # The import run completes, but only the imported shop's rate changes
+    (body,) = responses
+    assert body["run"]["status"] == "completed"
+    assert body["run"]["rates_expired"] == 0
+    with app.app_context():
+        assert _active_payback_shops() == {"Papa", "Quebec", "Romeo", "Sierra"}
+        assert ShopProgramRate.query.filter_by(valid_to=None).count() == 4
+        assert ScrapeRunShop.query.count() == 0
@@ -1,7 +1,17 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import event
+
 from spo.extensions import db
 from spo.models import BonusProgram, Shop, ShopMain, ShopVariant, User
 from spo.services.bonus_programs import ensure_program
-from spo.services.dedup import find_duplicate_shops, get_or_create_shop_main, run_deduplication
+from spo.services.dedup import (
+    find_duplicate_shops,
+    find_shop_by_similarity,
+    get_or_create_shop_main,
+    pg_trgm_available,
+    run_deduplication,
+)
 from spo.services.notifications import (
     create_notification,
     get_unread_count,
@@ -38,6 +48,155 @@ def test_dedup_merges_case_insensitive(app, session):
         assert {v.source for v in variants} == {"source_a", "source_b"}
 
 
+def test_shop_name_index_tracks_creates_renames_and_external_writes(app, session):
+    import uuid
+
+    with app.app_context():
+        main, created, _ = get_or_create_shop_main("Zalando", "source_a", "z-1")
+        assert created is True
+
+        match, score = find_shop_by_similarity("zalando.de")
+        assert match is not None and match.id == main.id
+        assert score == 100.0
+
+        # Rename through the ORM updates the index incrementally
+        main.canonical_name = "Lounge by Zalando"
+        main.canonical_name_lower = "lounge by zalando"
+        db.session.commit()
+        match, score = find_shop_by_similarity("Lounge by Zalando")
+        assert match is not None and match.id == main.id and score == 100.0
+
+        # Rows written outside the ORM are picked up via the signature check
+        other_id = str(uuid.uuid4())
+        db.session.execute(
+            ShopMain.__table__.insert().values(
+                id=other_id,
+                canonical_name="Otto",
+                canonical_name_lower="otto",
+                status="active",
+                created_at=datetime.now(UTC),
+                updated_at=datetime.now(UTC),
+            )
+        )
+        db.session.commit()
+        match, score = find_shop_by_similarity("otto")
+        assert match is not None and match.id == other_id
+
+
+def test_shop_name_index_matches_full_scan(app, session):
+    import random
+    import uuid
+
+    from spo.services.dedup import _normalize_shop_name, fuzzy_match_normalized, shop_name_index
+
+    rng = random.Random(7)
+    words = ["shop", "mode", "sport", "haus", "markt", "online", "technik", "garten", "otto"]
+    words += ["zalando", "lidl", "tchibo", "bonprix", "ikea", "mediamarkt", "saturn"]
+
+    def name():
+        picked = rng.sample(words, rng.randint(1, 3))
+        if rng.random() < 0.4:
+            idx = rng.randrange(len(picked))
+            word = picked[idx]
+            pos = rng.randrange(len(word))
+            picked[idx] = word[:pos] + rng.choice("aeiouxyz") + word[pos + 1 :]
+        return " ".join(picked)
+
+    with app.app_context():
+        for canonical in {name() for _ in range(300)}:
+            db.session.add(
+                ShopMain(
+                    id=str(uuid.uuid4()),
+                    canonical_name=canonical,
+                    canonical_name_lower=canonical.lower(),
+                    status="active",
+                )
+            )
+        db.session.commit()
+        shop_name_index.rebuild()
+        entries = sorted(shop_name_index._entries.items(), key=lambda item: item[1][0])
+
+        for query in [name() for _ in range(150)] + ["xq", "amazon marketplace"]:
+            normalized = _normalize_shop_name(query)
+            expected = (None, 0.0)
+            for shop_id, (_, stored) in entries:
+                score = fuzzy_match_normalized(normalized, stored)
+                if score > expected[1]:
+                    expected = (shop_id, score)
+            assert shop_name_index.best_match(query) == expected, query
+
+
+def _pg_trgm_similarity(a, b):
+    """Python stand-in for pg_trgm's similarity() (padded per-word trigrams)."""
+    import re
+
+    def trigrams(text):
+        grams = set()
+        for word in re.findall(r"[0-9a-z]+", (text or "").lower()):
+            padded = f"  {word} "
+            grams |= {padded[i : i + 3] for i in range(len(padded) - 2)}
+        return grams
+
+    left, right = trigrams(a), trigrams(b)
+    union = len(left | right)
+    return len(left & right) / union if union else 0.0
+
+
+def test_trigram_candidates_find_every_merge_of_a_full_scan(app, session, request):
+    import random
+    import uuid
+
+    from spo.services.dedup import (
+        _normalize_shop_name,
+        _trigram_best_match,
+        fuzzy_match_normalized,
+    )
+
+    rng = random.Random(11)
+    words = ["shop", "mode", "sport", "haus", "markt", "online", "technik", "garten", "otto"]
+    words += ["zalando", "lidl", "tchibo", "bonprix", "ikea", "media", "saturn", "versand"]
+
+    def name():
+        return " ".join(rng.sample(words, rng.randint(1, 4)))
+
+    def register_similarity(dbapi_connection, connection_record):
+        dbapi_connection.create_function("similarity", 2, _pg_trgm_similarity)
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "connect", register_similarity)
+        engine.dispose()
+        request.addfinalizer(lambda: event.remove(engine, "connect", register_similarity))
+        corpus = {name() for _ in range(300)}
+        corpus |= {"saturn", "otto mode versand garten technik haus markt sport lidl"}
+        for canonical in corpus:
+            db.session.add(
+                ShopMain(
+                    id=str(uuid.uuid4()),
+                    canonical_name=canonical,
+                    canonical_name_lower=canonical.lower(),
+                    status="active",
+                )
+            )
+        db.session.commit()
+        entries = ShopMain.query.order_by(ShopMain.created_at, ShopMain.id).all()
+
+        # Compact-key and substring matches with little trigram similarity
+        queries = [name() for _ in range(150)] + ["s a t u r n", "mode versand"]
+        for query in queries:
+            normalized = _normalize_shop_name(query)
+            expected = (None, 0.0)
+            for shop in entries:
+                score = fuzzy_match_normalized(normalized, shop.canonical_name_normalized)
+                if score > expected[1]:
+                    expected = (shop.id, score)
+            best_id, best_score = _trigram_best_match(query)
+            if expected[1] >= 98.0:
+                assert (best_id, best_score) == expected, query
+            else:
+                assert best_score <= expected[1], query
+
+
 def test_notifications_create_and_mark_read(app, session):
     with app.app_context():
         user = _create_user(session)
@@ -196,3 +355,93 @@ def test_run_deduplication(app, session):
         all_variants = ShopVariant.query.all()
         assert len(all_variants) == 2
         assert all(v.shop_main_id == active_shops[0].id for v in all_variants)
+
+
+def test_run_deduplication_merges_clusters_into_oldest(app, session):
+    """All shops of a duplicate cluster merge into the oldest one with rates consolidated."""
+    from spo.models import ShopProgramRate
+
+    with app.app_context():
+        program = ensure_program("ClusterProgram", point_value_eur=0.01)
+        mains = [
+            ShopMain(
+                id=f"cluster-{idx}",
+                canonical_name=name,
+                canonical_name_lower=name.lower(),
+                created_at=datetime(2024, 1, 1 + idx, tzinfo=UTC),
+            )
+            for idx, name in enumerate(["Media Markt Online", "MediaMarkt", "mediamarkt.de"])
+        ]
+        db.session.add_all(mains)
+        db.session.flush()
+        shops = [Shop(name=m.canonical_name, shop_main_id=m.id) for m in mains]
+        db.session.add_all(shops)
+        db.session.flush()
+        db.session.add_all(
+            [
+                ShopVariant(shop_main_id=m.id, source=f"src{i}", source_name=m.canonical_name)
+                for i, m in enumerate(mains)
+            ]
+            + [
+                ShopProgramRate(shop_id=s.id, program_id=program.id, points_per_eur=1)
+                for s in shops
+            ]
+        )
+        db.session.commit()
+        shop_ids = [s.id for s in shops]
+
+        result = run_deduplication(merge_batch_size=1)
+
+        assert result["clusters"] == 1
+        assert result["merged_count"] == 2
+        assert result["errors"] == []
+        merged = ShopMain.query.filter_by(status="merged").all()
+        assert {m.merged_into_id for m in merged} == {"cluster-0"}
+        assert {v.shop_main_id for v in ShopVariant.query.all()} == {"cluster-0"}
+        assert {s.shop_main_id for s in Shop.query.all()} == {"cluster-0"}
+        rates = ShopProgramRate.query.filter(ShopProgramRate.shop_id.in_(shop_ids)).all()
+        assert {r.shop_id for r in rates} == {shop_ids[0]}
+
+
+def test_similarity_search_falls_back_to_python_without_postgres(app, session, monkeypatch):
+    """SQLite runs always use the in-process index, whatever DEDUP_BACKEND says."""
+    with app.app_context():
+        monkeypatch.setenv("DEDUP_BACKEND", "auto")
+        assert pg_trgm_available() is False
+
+        shop, created, _ = get_or_create_shop_main("Zalando", "payback", "z-1")
+        assert created is True
+        match, score = find_shop_by_similarity("zalando.de")
+        assert match is not None and match.id == shop.id
+        assert score == 100.0
+
+
+def test_run_deduplication_is_incremental_after_first_run(app, session):
+    """Later runs only compare shops changed since the stored watermark."""
+    from spo.models import DedupWatermark
+
+    with app.app_context():
+        db.session.add_all(
+            [
+                ShopMain(id="wm-1", canonical_name="Otto", canonical_name_lower="otto"),
+                ShopMain(id="wm-2", canonical_name="Zalando", canonical_name_lower="zalando"),
+            ]
+        )
+        db.session.commit()
+
+        first = run_deduplication()
+        assert first["full_scan"] is True
+        assert DedupWatermark.query.one().watermark is not None
+
+        db.session.add(
+            ShopMain(id="wm-3", canonical_name="zalando.de", canonical_name_lower="zalando.de")
+        )
+        db.session.commit()
+
+        second = run_deduplication()
+        assert second["full_scan"] is False
+        assert second["merged_count"] == 1
+        assert db.session.get(ShopMain, "wm-3").merged_into_id == "wm-2"
+
+        assert run_deduplication()["duplicates_found"] == 0
+        assert run_deduplication(full_rescan=True)["full_scan"] is True
@@ -57,8 +57,10 @@ def test_shoop_scraper_category_deduplication(shoop_scraper):
 def test_shoop_scraper_handles_api_failure(monkeypatch, shoop_scraper):
     """Test that API failure is handled gracefully and logs error."""
 
-    def fake_requests_get(*args, **kwargs):
+    def fake_request(*args, **kwargs):
         class FakeResp:
+            status_code = 400
+
             def raise_for_status(self):
                 raise Exception("API error")
 
@@ -67,8 +69,6 @@ def test_shoop_scraper_handles_api_failure(monkeypatch, shoop_scraper):
 
         return FakeResp()
 
-    import requests
-
-    monkeypatch.setattr(requests, "get", fake_requests_get)
+    monkeypatch.setattr(shoop_scraper.http.session, "request", fake_request)
     # Should not raise, just return empty list
     assert shoop_scraper.fetch_all_merchants_api() == []
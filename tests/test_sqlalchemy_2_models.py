@@ -133,6 +133,26 @@ class TestShopMainModel:
             assert len(found_shop.variants) == 1
             assert found_shop.variants[0].source_name == "Test Payback"
 
+    def test_shop_main_normalized_names_follow_source_columns(self, app):
+        """Test stored normalized names are kept in sync with the raw names."""
+        with app.app_context():
+            shop = ShopMain(
+                id="mm-main",
+                canonical_name="www.MediaMarkt.de",
+                canonical_name_lower="www.mediamarkt.de",
+            )
+            db.session.add(shop)
+            db.session.commit()
+            assert shop.canonical_name_normalized == "mediamarkt"
+
+            shop.canonical_name = "Saturn Online Shop"
+            variant = ShopVariant(shop_main_id=shop.id, source="payback", source_name="SATURN.de")
+            db.session.add(variant)
+            db.session.commit()
+
+            assert shop.canonical_name_normalized == "saturn"
+            assert variant.source_name_normalized == "saturn"
+
 
 class TestShopModel:
     """Test Shop model with SQLAlchemy 2.0 syntax."""
@@ -12,8 +12,8 @@ class TestTopCashbackScraper:
 
     @pytest.fixture
     def scraper(self):
-        """Create a TopCashbackScraper instance for testing."""
-        return TopCashbackScraper()
+        """Create a TopCashbackScraper instance for testing (no request pacing)."""
+        return TopCashbackScraper(requests_per_second=0)
 
     def test_extract_cashback_percentage_simple(self, scraper):
         """Test extraction of simple percentage values."""
@@ -70,7 +70,7 @@ class TestTopCashbackScraper:
         url = scraper._extract_shop_url(div)
         assert url is None
 
-    @patch("scrapers.topcashback_scraper.requests.Session.get")
+    @patch("scrapers.http_client.requests.Session.request")
     def test_fetch_successful(self, mock_get, scraper):
         """Test successful fetch of partner list with per-category rates."""
         # Mock homepage HTML with a category link
@@ -132,7 +132,7 @@ class TestTopCashbackScraper:
         ebay = next(r for r in results if r["name"] == "eBay")
         assert "rates" in ebay
 
-    @patch("scrapers.topcashback_scraper.requests.Session.get")
+    @patch("scrapers.http_client.requests.Session.request")
     def test_fetch_network_error(self, mock_get, scraper):
         """Test fetch with network error."""
         import requests
@@ -142,7 +142,7 @@ class TestTopCashbackScraper:
         results = scraper.fetch()
         assert results == []
 
-    @patch("scrapers.topcashback_scraper.requests.Session.get")
+    @patch("scrapers.http_client.requests.Session.request")
     def test_fetch_malformed_html(self, mock_get, scraper):
         """Test fetch with malformed HTML."""
         mock_html = "<html><body>Invalid structure</body></html>"
@@ -155,7 +155,7 @@ class TestTopCashbackScraper:
         results = scraper.fetch()
         assert results == []
 
-    @patch("scrapers.topcashback_scraper.requests.Session.get")
+    @patch("scrapers.http_client.requests.Session.request")
     def test_fetch_deduplication(self, mock_get, scraper):
         """Test that duplicate shop names are deduplicated."""
         homepage_html = """
@@ -199,7 +199,7 @@ class TestTopCashbackScraper:
         assert len(results) == 1
         assert results[0]["name"] == "Amazon"
 
-    @patch("scrapers.topcashback_scraper.requests.Session.get")
+    @patch("scrapers.http_client.requests.Session.request")
     def test_fetch_rate_defaults(self, mock_get, scraper):
         """Test that rate defaults are set correctly."""
         homepage_html = """
@@ -242,6 +242,73 @@ class TestTopCashbackScraper:
         assert rate["points_per_eur"] == 0.0  # TopCashback uses cashback, not points
         assert rate["point_value_eur"] == 0.0
 
+    def test_fetch_requests_each_merchant_once(self):
+        """Merchants listed in several categories are fetched once, output order is stable."""
+        pages = {
+            "https://www.topcashback.de": (
+                '<a href="/kategorie/mode/">Mode</a><a href="/kategorie/technik/">Technik</a>'
+            ),
+            "https://www.topcashback.de/kategorie/mode/?page=1": """
+                <a class="category-panel" href="/shop/zalando">
+                    <span class="search-merchant-name">Zalando</span>
+                    <span class="category-cashback-rate">4%</span>
+                </a>
+                <a class="category-panel" href="/shop/otto">
+                    <span class="search-merchant-name">OTTO</span>
+                    <span class="category-cashback-rate">3%</span>
+                </a>
+            """,
+            "https://www.topcashback.de/kategorie/technik/?page=1": """
+                <a class="category-panel" href="/shop/otto">
+                    <span class="search-merchant-name">OTTO</span>
+                    <span class="category-cashback-rate">3%</span>
+                </a>
+            """,
+            "https://www.topcashback.de/shop/otto": """
+                <div class="merch-rate-card">
+                    <span class="merch-cat__sub-cat">Möbel (Neukunden)</span>
+                    <span class="merch-cat__rate">6%</span>
+                </div>
+            """,
+        }
+        requested = []
+
+        def fake_request(method, url, **kwargs):
+            requested.append(url)
+            return Mock(status_code=200, text=pages.get(url, "<html></html>"))
+
+        scraper = TopCashbackScraper(workers=3, requests_per_second=0)
+        with patch.object(scraper.http.session, "request", side_effect=fake_request):
+            results = scraper.fetch()
+
+        assert sorted(requested).count("https://www.topcashback.de/shop/otto") == 1
+        assert [shop["name"] for shop in results] == ["Zalando", "OTTO"]
+        otto = results[1]
+        # Rates are still contributed per category listing, as in the sequential crawl
+        assert [(r["category"], r["cashback_pct"]) for r in otto["rates"]] == [
+            ("Möbel", 6.0),
+            ("Möbel", 6.0),
+        ]
+        assert results[0]["rates"][0]["category"] == "mode"
+        assert results[0]["rates"][0]["cashback_pct"] == 4.0
+
+    def test_rate_limiter_spaces_requests_per_host(self):
+        """Requests to one host are spaced by the interval; other hosts are independent."""
+        from scrapers.rate_limit import HostRateLimiter
+
+        now = [100.0]
+        sleeps = []
+        limiter = HostRateLimiter(4, clock=lambda: now[0], sleep=sleeps.append)
+
+        delays = [limiter.wait(f"https://www.topcashback.de/shop/{idx}") for idx in range(3)]
+        assert delays == [0.0, 0.25, 0.5]
+        assert limiter.wait("https://example.com/") == 0.0
+
+        now[0] += 10
+        assert limiter.wait("https://www.topcashback.de/") == 0.0
+        assert sleeps == [0.25, 0.5]
+        assert HostRateLimiter(0).wait("https://www.topcashback.de/") == 0.0
+
 
 class TestTopCashbackIntegration:
     """Integration tests with database (requires app context)."""
@@ -2,9 +2,11 @@
 Test admin endpoint to rescore ShopVariant confidence scores.
 """
 
+from job_queue import Job, job_queue
 from spo import create_app
 from spo.extensions import db
 from spo.models import Shop, ShopMain, ShopVariant
+from spo.services.dedup import rescore_variants
 
 
 def test_admin_rescore_variants(client, admin_user):
@@ -48,12 +50,21 @@ def test_admin_rescore_variants(client, admin_user):
         follow_redirects=True,
     )
 
-    # Call rescore endpoint
+    # Call rescore endpoint; it only enqueues a background job
     resp = client.post("/admin/variants/rescore", headers={"Accept": "application/json"})
     assert resp.status_code == 200
     data = resp.get_json()
     assert data["success"] is True
-    assert data["updated"] >= 1
+    queued = job_queue.get_job(data["job_id"])
+    assert queued is not None and queued.func is rescore_variants
+
+    # Run the job inline, as the job queue worker would
+    job = Job("rescore-test", rescore_variants)
+    with app.app_context():
+        result = rescore_variants(job)
+    assert result["updated"] >= 1
+    assert result["total"] == 2
+    assert job.progress == 100
 
     # Verify updated scores are higher and normalized
     with app.app_context():